@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the transfer write path: CPU time per GB downloaded.
+
+Serves a file from a local HTTP server in a separate process and downloads it
+with the old write path (iter_content with the fixed chunk_size, the file
+growing with every write) and the current one (reads into a reused buffer with
+an adaptive read size, into a preallocated part file). Only the CPU time of
+the downloading process is counted.
+
+Usage:
+    python benchmark_transfer.py --size-mb 1024 --runs 3
+"""
+
+import argparse
+import http.server
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import requests
+
+from iearth_downloader.core.downloader import PartFileWriter
+from iearth_downloader.system.const import sys_config
+from iearth_downloader.utils.chunking import ChunkSizer, read_chunks
+
+BLOCK = os.urandom(1024 * 1024)
+
+
+def serve(port: int, size: int) -> None:
+    """Serve size bytes of random data on every GET request."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            remaining = size
+            while remaining > 0:
+                block = BLOCK[: min(len(BLOCK), remaining)]
+                self.wfile.write(block)
+                remaining -= len(block)
+
+    http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def cpu_time() -> float:
+    """User plus system CPU time of this process."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def write_fixed_chunks(response, path: str, size: int) -> None:
+    """The write path before: a new bytes object per fixed-size chunk, file grown by appends."""
+    with open(path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=sys_config.chunk_size):
+            if chunk:
+                f.write(chunk)
+
+
+def write_reused_buffer(response, path: str, size: int) -> None:
+    """The write path now: reused buffer, adaptive read size, preallocated part file."""
+    sizer = ChunkSizer(sys_config.chunk_size, sys_config.max_chunk_size_kb * 1024, size)
+    with PartFileWriter(path, 0, size, sys_config.preallocate_min_mb * 1024 * 1024) as f:
+        for chunk in read_chunks(response, sizer):
+            f.write(chunk)
+
+
+def measure(url: str, write, path: str, size: int) -> tuple:
+    """Download url once with the given write path; returns (CPU seconds, wall seconds)."""
+    session = requests.Session()
+    start_cpu = cpu_time()
+    start_wall = time.monotonic()
+    with session.get(url, stream=True) as response:
+        response.raise_for_status()
+        write(response, path, size)
+    elapsed = (cpu_time() - start_cpu, time.monotonic() - start_wall)
+    if os.path.getsize(path) != size:
+        raise RuntimeError(f"Downloaded {os.path.getsize(path)} bytes, expected {size}")
+    os.remove(path)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transfer write path benchmark")
+    parser.add_argument("--size-mb", type=int, default=1024, help="Size of the served file in MB")
+    parser.add_argument("--runs", type=int, default=3, help="Downloads per write path, the best is reported")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the local HTTP server")
+    parser.add_argument("--dir", type=str, default=None, help="Directory to write into (default: a temporary directory)")
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    server = multiprocessing.Process(target=serve, args=(args.port, size), daemon=True)
+    server.start()
+    time.sleep(0.5)
+    url = f"http://127.0.0.1:{args.port}/"
+
+    print(f"Downloading {args.size_mb} MB, best of {args.runs} runs")
+    print(f"{'write path':<44}{'CPU s/GB':>10}{'MB/s':>10}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        path = os.path.join(directory, "benchmark.bin.part")
+        for name, write in (
+            (f"before: iter_content({sys_config.chunk_size})", write_fixed_chunks),
+            ("after: reused buffer, adaptive, preallocated", write_reused_buffer),
+        ):
+            results = [measure(url, write, path, size) for _ in range(args.runs)]
+            cpu, wall = min(results)
+            gigabytes = size / 1024**3
+            print(f"{name:<44}{cpu / gigabytes:>10.2f}{size / 1024**2 / wall:>10.0f}")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Asyncio download engine, an alternative to the thread-per-worker DownloadProcessor.
+
+Keeps the producer/consumer shape of DownloadProcessor: the catalog producer
+runs in a helper thread and feeds a bounded asyncio.Queue that is drained by
+coroutine workers sharing one aiohttp session, so hundreds of transfers can
+be in flight on a single core.
+"""
+
+import asyncio
+import os
+import time
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency, only needed for --engine async
+    aiohttp = None
+
+from iearth_downloader.core.async_downloader import AsyncDownloader
+from iearth_downloader.core.download_processor import DownloadProcessor
+from iearth_downloader.core.downloader import THROTTLE_STATUS_CODES
+from iearth_downloader.core.retry import RetryScheduler
+from iearth_downloader.utils import auth, http_client
+
+
+class AsyncDownloadProcessor(DownloadProcessor):
+    """Coordinates the download process with asyncio coroutines instead of threads."""
+
+    # Seconds a worker above the adaptive concurrency limit waits before checking again
+    CONCURRENCY_POLL_INTERVAL = 0.2
+
+    def __init__(self, custom_download_path: str = None, config_overrides: dict = None):
+        """
+        Initialize the asyncio download processor.
+
+        Accepts the same arguments as DownloadProcessor. 'max_threads' is used as
+        the number of concurrent transfer coroutines.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "The async engine requires aiohttp. "
+                "Install it with: pip install 'iearth-downloader[async]'"
+            )
+        super().__init__(
+            custom_download_path=custom_download_path,
+            config_overrides=config_overrides,
+        )
+        self.async_downloader = AsyncDownloader(
+            resource_id=self.resource_id,
+            url_cache=self.url_cache,
+            downloader=self.downloader,
+            signed_url_min_ttl=self.signed_url_min_ttl,
+        )
+
+    async def _download_with_token_refresh(self, worker_id: int, session, task) -> bool:
+        """
+        Download a task, refreshing the token once if the API rejects it.
+        The refresh runs in a thread and is shared with all other workers.
+        """
+        for _ in range(2):
+            try:
+                return await self.async_downloader.download_file(
+                    session,
+                    task.fullpath,
+                    task.filename,
+                    task.local_path,
+                    task.size,
+                    resource_id=task.resource_id,
+                )
+            except auth.AuthenticationError as ex:
+                print(
+                    f"Worker {worker_id}: Token rejected ({ex}), waiting for token refresh..."
+                )
+                if not await asyncio.to_thread(auth.refresh_token, ex.token):
+                    return False
+        return False
+
+    async def _download_worker_async(self, worker_id: int, session, download_queue):
+        """Worker coroutine for the asyncio engine."""
+
+        while True:
+            while self.concurrency is not None and not self.concurrency.is_active(
+                worker_id
+            ):
+                await asyncio.sleep(self.CONCURRENCY_POLL_INTERVAL)
+            task = await download_queue.get()
+
+            if task is None:
+                download_queue.task_done()
+                break
+
+            try:
+                print(f"Worker {worker_id}: Starting download for {task.filename}")
+                transfer_downloader = self.async_downloader.downloader
+                started = time.monotonic()
+                downloaded = await self._download_with_token_refresh(
+                    worker_id, session, task
+                )
+                status_code, error = (
+                    (None, None)
+                    if downloaded
+                    else transfer_downloader.pop_failure(
+                        os.path.join(task.local_path, task.filename)
+                    )
+                )
+                # Only this transfer's own response counts as throttling
+                self._record_transfer(
+                    task, started, downloaded, status_code in THROTTLE_STATUS_CODES
+                )
+                if downloaded:
+                    self._record_success(task)
+                else:
+                    self._record_failure(task, error, status_code)
+            except Exception as ex:
+                self._record_unexpected_error(task, ex)
+            finally:
+                download_queue.task_done()
+
+    def _produce(self, loop, download_queue, tasks) -> int:
+        """Run the catalog producer in a helper thread, feeding the asyncio queue."""
+        tasks_added_to_queue = 0
+        for task in tasks:
+            self._task_started()
+            # Blocks the producer thread while the bounded queue is full
+            asyncio.run_coroutine_threadsafe(download_queue.put(task), loop).result()
+            tasks_added_to_queue += 1
+        return tasks_added_to_queue
+
+    async def _run_async(self, tasks) -> int:
+        """Run producer and worker coroutines until all tasks are processed."""
+        download_queue = asyncio.Queue(maxsize=self.max_threads * 2)
+        connector = aiohttp.TCPConnector(limit=self.max_threads)
+        connect_timeout, read_timeout = http_client.get_timeouts()
+        timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        loop = asyncio.get_running_loop()
+        # Retries are handed back from the scheduler thread onto the event loop
+        self.retry_scheduler = RetryScheduler(
+            lambda task: asyncio.run_coroutine_threadsafe(
+                download_queue.put(task), loop
+            ).result()
+        )
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            workers = [
+                asyncio.create_task(
+                    self._download_worker_async(worker_id, session, download_queue)
+                )
+                for worker_id in range(1, self.max_threads + 1)
+            ]
+
+            tasks_added_to_queue = await asyncio.to_thread(
+                self._produce, loop, download_queue, tasks
+            )
+            print(
+                f"Producer: All {tasks_added_to_queue} download tasks have been added to the queue."
+            )
+
+            print("Producer: Waiting for all tasks to complete or exhaust their retries...")
+            await asyncio.to_thread(self._wait_for_outstanding_tasks)
+            self.retry_scheduler.stop()
+
+            if self.concurrency is not None:
+                self.concurrency.stop()
+            print(
+                f"Producer: Sending {self.max_threads} sentinel values to stop worker coroutines..."
+            )
+            for _ in range(self.max_threads):
+                await download_queue.put(None)
+
+            print(
+                "Producer: Waiting for all tasks in queue to be processed (including sentinels)..."
+            )
+            await download_queue.join()
+            print("Producer: All tasks in queue have been processed.")
+
+            await asyncio.gather(*workers)
+            print("Producer: All worker coroutines have terminated.")
+
+        return tasks_added_to_queue
+
+    def _run_download_engine(self, tasks) -> int:
+        """
+        Run the asyncio download engine.
+
+        Args:
+            tasks: Iterable of DownloadTask to download
+
+        Returns:
+            int: Number of tasks added to the queue
+        """
+        return asyncio.run(self._run_async(tasks))
@@ -0,0 +1,226 @@
+"""
+Asynchronous download module for the asyncio download engine.
+"""
+
+import asyncio
+import os
+
+from iearth_downloader.core.downloader import (
+    Downloader,
+    PartFileWriter,
+    get_part_path,
+    is_download_complete,
+    parse_content_total,
+    parse_expected_size,
+    prepare_resume_offset,
+    raise_for_auth_failure,
+)
+from iearth_downloader.system.const import sys_config
+from iearth_downloader.utils import auth, checksum, rate_limit
+from iearth_downloader.utils.signed_url import signed_url_expiry
+
+
+class AsyncDownloader:
+    """Handles file downloading on an aiohttp session for the asyncio engine."""
+
+    def __init__(
+        self,
+        resource_id: int = None,
+        url_cache=None,
+        downloader=None,
+        signed_url_min_ttl: float = None,
+    ):
+        """
+        Initialize the AsyncDownloader.
+
+        Args:
+            resource_id: Optional resource ID to use. If None, uses the default from config.
+            url_cache: Optional SignedUrlCache shared with the processor
+            downloader: Optional Downloader to share settings and statistics with
+            signed_url_min_ttl: Seconds a cached signed URL must remain valid to be reused.
+                If None, uses the value from system.ini.
+        """
+        # Reuse the request building of the thread-based downloader
+        self.downloader = downloader or Downloader(
+            resource_id=resource_id, url_cache=url_cache
+        )
+        self.resource_id = self.downloader.resource_id
+        self.url_cache = url_cache
+        if signed_url_min_ttl is None:
+            signed_url_min_ttl = sys_config.signed_url_min_ttl
+        self.signed_url_min_ttl = signed_url_min_ttl
+
+    async def resolve_signed_url(
+        self, session, fullpath: str, token: str, resource_id: int = None
+    ) -> str:
+        """Get a signed URL for an object from the cache or the download API."""
+        if self.url_cache is not None:
+            cached = self.url_cache.get(fullpath, self.signed_url_min_ttl)
+            if cached is not None:
+                return cached[0]
+
+        hedger = self.downloader.url_hedger
+        if hedger is not None:
+            signed_url = await hedger.run_async(
+                lambda: self._request_signed_url(session, fullpath, token, resource_id)
+            )
+        else:
+            signed_url = await self._request_signed_url(
+                session, fullpath, token, resource_id
+            )
+
+        if self.url_cache is not None:
+            self.url_cache.put(
+                fullpath,
+                signed_url,
+                signed_url_expiry(signed_url, self.downloader.signed_url_default_ttl),
+            )
+        return signed_url
+
+    async def _request_signed_url(
+        self, session, fullpath: str, token: str, resource_id: int = None
+    ) -> str:
+        """Request a signed URL for an object from the download API."""
+        payload, headers = self.downloader.build_signed_url_request(
+            fullpath, token, resource_id
+        )
+        delay = rate_limit.reserve_request(rate_limit.DOWNLOAD_API)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with session.post(
+            sys_config.download_api, json=payload, headers=headers
+        ) as response:
+            try:
+                data = await response.json(content_type=None)
+            except ValueError:
+                data = None
+            raise_for_auth_failure(response.status, data, token)
+        return self.downloader.rewrite_signed_url(data["signedUrl"], fullpath)
+
+    async def _open_transfer(self, session, signed_url: str, headers):
+        """Send a transfer request, hedged until its response headers arrive."""
+        hedger = self.downloader.transfer_hedger
+        if hedger is None:
+            return await session.get(signed_url, headers=headers)
+        return await hedger.run_async(
+            lambda: session.get(signed_url, headers=headers),
+            discard=lambda response: response.release(),
+        )
+
+    async def download_file(
+        self,
+        session,
+        fullpath: str,
+        filename: str,
+        local_path: str,
+        size=None,
+        resource_id: int = None,
+    ) -> bool:
+        """
+        Download a file using the given aiohttp session and save it in the specified local path.
+        Uses the token obtained from auth.py for authorization.
+        Resumes '.part' files the same way as Downloader.download_file.
+        resource_id selects the resource of the object, the downloader's resource if None.
+        """
+        current_token = auth.get_token()
+        if not current_token:
+            return False
+
+        local_file_path = os.path.join(local_path, filename)
+        try:
+            os.makedirs(local_path, exist_ok=True)
+            expected_size = parse_expected_size(size)
+            if is_download_complete(local_file_path, expected_size):
+                print(f"File already exists and is complete: {local_file_path}")
+                return True
+
+            part_path = get_part_path(local_file_path)
+            offset = prepare_resume_offset(local_file_path, part_path, expected_size)
+            if expected_size is not None and offset == expected_size:
+                return await asyncio.to_thread(
+                    self.downloader.finalize_download,
+                    part_path,
+                    local_file_path,
+                    expected_size,
+                )
+
+            signed_url = await self.resolve_signed_url(
+                session, fullpath, current_token, resource_id
+            )
+
+            range_headers = {"Range": f"bytes={offset}-"} if offset else {}
+            async with await self._open_transfer(session, signed_url, range_headers) as r:
+                self.downloader.record_response_status(r.status)
+                if r.status in (401, 403) and self.url_cache is not None:
+                    self.url_cache.discard_url(signed_url)
+                if r.status == 416:
+                    total_size = parse_content_total(r.headers, offset, 416)
+                    if total_size == offset:
+                        return await asyncio.to_thread(
+                            self.downloader.finalize_download,
+                            part_path,
+                            local_file_path,
+                            total_size,
+                        )
+                    os.remove(part_path)
+                    print(f"Discarded invalid partial download: {part_path}")
+                    return False
+                r.raise_for_status()
+
+                hasher = checksum.new_hasher()
+                if offset and r.status != 206:
+                    print(f"Server ignored range request, restarting: {filename}")
+                    offset = 0
+                elif offset:
+                    print(f"Resuming {filename} from byte {offset}")
+                    # Hashing the kept bytes reads the file, so keep it off the event loop
+                    await asyncio.to_thread(
+                        checksum.update_from_file, hasher, part_path, offset
+                    )
+                total_size = expected_size or parse_content_total(
+                    r.headers, offset, r.status
+                )
+
+                watchdog = self.downloader.new_watchdog()
+                sizer = self.downloader.new_chunk_sizer(
+                    total_size - offset if total_size else None
+                )
+                with PartFileWriter(
+                    part_path, offset, total_size, self.downloader.preallocate_min_size
+                ) as f:
+                    while True:
+                        chunk = await r.content.read(sizer.size)
+                        if not chunk:
+                            break
+                        sizer.update(len(chunk))
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        delay = rate_limit.reserve_bytes(len(chunk))
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        watchdog.update(len(chunk), delay)
+
+            # Finalizing may hash the whole file, which would block the other transfers
+            if not await asyncio.to_thread(
+                self.downloader.finalize_download,
+                part_path,
+                local_file_path,
+                total_size,
+                hasher,
+                r.headers,
+            ):
+                return False
+
+            print(f"Successfully downloaded: {local_file_path}")
+            return True
+
+        except auth.AuthenticationError:
+            # Let the worker refresh the token and retry
+            raise
+        except Exception as ex:
+            print(f"Error downloading file {filename}: {ex}")
+            self.downloader.record_stall(ex)
+            self.downloader.record_failure(
+                local_file_path, getattr(ex, "status", None), f"{type(ex).__name__}: {ex}"
+            )
+            return False
@@ -0,0 +1,253 @@
+"""
+Batch download module running several resources through one download engine.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional
+
+import toml
+
+from iearth_downloader.core.download_processor import (
+    DownloadProcessor,
+    create_download_processor,
+    get_download_path,
+)
+from iearth_downloader.core.task import DownloadTask
+
+# Subdirectory of the download path holding the files of one resource in a batch run
+RESOURCE_DIR_PATTERN = "resource_{}"
+
+
+@dataclass
+class BatchJob:
+    """One resource of a batch run, optionally limited to a catalog sub-path or path selectors."""
+
+    resource_id: int
+    target_sub_path: Optional[str] = None
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+
+
+def parse_resource_ids(value: str) -> List[BatchJob]:
+    """
+    Parse a comma-separated list of resource IDs, e.g. "9,13,26".
+
+    Raises:
+        ValueError: If an entry is not an integer
+    """
+    jobs = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            jobs.append(BatchJob(int(part)))
+        except ValueError:
+            raise ValueError(f"Invalid resource ID: '{part}'") from None
+    return jobs
+
+
+def load_job_file(file_path: str) -> List[BatchJob]:
+    """
+    Load the resources of a batch run from a TOML job file.
+
+    Each [[jobs]] table needs a resource_id and may set a target_sub_path and
+    include/exclude lists of path selectors (see core.path_index):
+
+        [[jobs]]
+        resource_id = 9
+        target_sub_path = "MODISwater2001-2022/2008"
+        exclude = ["re:v0[5-9]$"]
+
+    Raises:
+        ValueError: If the file has no jobs or a job has no resource_id
+    """
+    data = toml.load(file_path)
+    jobs = []
+    for entry in data.get("jobs", []):
+        if "resource_id" not in entry:
+            raise ValueError(f"Job without resource_id in {file_path}: {entry}")
+        jobs.append(
+            BatchJob(
+                int(entry["resource_id"]),
+                entry.get("target_sub_path"),
+                list(entry.get("include", [])),
+                list(entry.get("exclude", [])),
+            )
+        )
+    if not jobs:
+        raise ValueError(f"No [[jobs]] found in {file_path}")
+    return jobs
+
+
+def job_overrides(job: BatchJob, config_overrides: Optional[dict]) -> dict:
+    """
+    Get the config overrides of one job: the shared overrides with the job's
+    resource and sub-path, and its path selectors added to the shared ones.
+    """
+    overrides = dict(config_overrides or {}, resource_id=job.resource_id)
+    if job.target_sub_path is not None:
+        overrides["target_sub_path"] = job.target_sub_path
+    if job.include:
+        overrides["include_paths"] = [*overrides.get("include_paths", []), *job.include]
+    if job.exclude:
+        overrides["exclude_paths"] = [*overrides.get("exclude_paths", []), *job.exclude]
+    return overrides
+
+
+def interleave(iterators: Iterable[Iterator[DownloadTask]]) -> Iterator[DownloadTask]:
+    """Yield from several iterators in turn, so every resource keeps the workers busy."""
+    active = list(iterators)
+    while active:
+        remaining = []
+        for iterator in active:
+            for item in iterator:
+                yield item
+                remaining.append(iterator)
+                break
+        active = remaining
+
+
+class BatchDownloadProcessor:
+    """
+    Coordinates the download of several resources with one set of workers.
+
+    Every resource gets a DownloadProcessor of its own, with its catalog, state
+    database, dead-letter file and a download directory named after the
+    resource. The processor of the first resource runs the download engine for
+    the tasks of all resources, so workers, pooled connections, rate limits,
+    file-list request slots, the enumeration pool and the token are shared;
+    results are recorded in the state of the task's resource.
+    """
+
+    def __init__(
+        self,
+        jobs: List[BatchJob],
+        custom_download_path: str = None,
+        config_overrides: dict = None,
+    ):
+        """
+        Initialize the batch processor.
+
+        Args:
+            jobs: Resources to download; repeated resource IDs are run once
+            custom_download_path: Optional download path, each resource gets a subdirectory
+            config_overrides: Optional dictionary to override config values for all resources
+        """
+        base_path = custom_download_path or get_download_path()
+        self.processors: List[DownloadProcessor] = []
+        seen = set()
+        for job in jobs:
+            if job.resource_id in seen:
+                continue
+            seen.add(job.resource_id)
+            overrides = job_overrides(job, config_overrides)
+            resource_path = os.path.join(
+                base_path, RESOURCE_DIR_PATTERN.format(job.resource_id)
+            )
+            if not self.processors:
+                # The first processor runs the engine for the selected download engine
+                processor = create_download_processor(resource_path, overrides)
+            else:
+                processor = DownloadProcessor(
+                    resource_path, overrides, batch_engine=self.processors[0]
+                )
+            self.processors.append(processor)
+
+        self.engine_processor = self.processors[0]
+        self.engine_processor.batch_members = {
+            processor.resource_id: processor for processor in self.processors[1:]
+        }
+        print(
+            f"Batch run of {len(self.processors)} resources: "
+            f"{', '.join(str(p.resource_id) for p in self.processors)}"
+        )
+
+    def run_full_process(self) -> None:
+        """
+        Fetch the catalog of every resource, then download all of them in one engine run.
+        """
+        print("Starting batch data processing and download...")
+
+        task_streams = []
+        for processor in self.processors:
+            print(f"\n=== Resource {processor.resource_id}: Fetching catalog data ===")
+            if not processor.catalog_manager.fetch_catalog_data():
+                print(
+                    f"Failed to fetch catalog data of resource {processor.resource_id}. Skipping."
+                )
+                continue
+            tasks = processor.prepare_download_tasks()
+            if tasks is not None:
+                task_streams.append(tasks)
+
+        if not task_streams:
+            print("No resource has a usable catalog. Exiting.")
+            return
+
+        print("\n=== Downloading files of all resources ===")
+        try:
+            self.engine_processor._download_and_report(interleave(task_streams))
+        finally:
+            self.engine_processor.shutdown_enumeration_pool()
+
+    def run_dead_letter(self) -> None:
+        """Download the tasks recorded in the dead-letter files of all resources."""
+        tasks = []
+        for processor in self.processors:
+            tasks.extend(processor.take_dead_letter_tasks())
+        if not tasks:
+            return
+        self.engine_processor._download_and_report(tasks)
+        for processor in self.processors:
+            processor.dead_letter.complete_rerun()
+
+    def run_merge_shards(self, shard_dirs: Optional[List[str]] = None) -> None:
+        """
+        Combine the shard state of every resource.
+
+        Args:
+            shard_dirs: Further download directories of shards with separate storage;
+                each holds the same resource_<id> subdirectories as the download path
+        """
+        for processor in self.processors:
+            print(f"\n=== Resource {processor.resource_id} ===")
+            resource_dir = os.path.basename(processor.download_base_path)
+            processor.run_merge_shards(
+                [os.path.join(path, resource_dir) for path in shard_dirs or []]
+            )
+
+    def run_verify(self, rehash: bool = False) -> None:
+        """Verify the local files of every resource against its catalog."""
+        try:
+            for processor in self.processors:
+                print(f"\n=== Resource {processor.resource_id} ===")
+                processor.run_verify(rehash)
+        finally:
+            self.engine_processor.shutdown_enumeration_pool()
+
+
+def create_batch_processor(
+    jobs: List[BatchJob],
+    custom_download_path: str = None,
+    config_overrides: dict = None,
+):
+    """
+    Create the processor for the given jobs: a batch processor for several resources,
+    or a plain download processor if there is only one.
+
+    Args:
+        jobs: Resources to download
+        custom_download_path: Optional custom download path to override config
+        config_overrides: Optional dictionary to override config values
+
+    Returns:
+        BatchDownloadProcessor, DownloadProcessor or AsyncDownloadProcessor instance
+    """
+    resource_ids = {job.resource_id for job in jobs}
+    if len(resource_ids) > 1:
+        return BatchDownloadProcessor(jobs, custom_download_path, config_overrides)
+    return create_download_processor(
+        custom_download_path, job_overrides(jobs[0], config_overrides)
+    )
@@ -3,52 +3,173 @@ Catalog management module for handling catalog data operations.
 """
 
 import json
+import os
+import shutil
+import time
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set
 from iearth_downloader.config.config import RESOURCE_ID
+from iearth_downloader.core.catalog_store import (
+    CompactCatalog,
+    paths_to_tree,
+    write_compact_catalog,
+)
+from iearth_downloader.core.path_index import PathIndex
 from iearth_downloader.system.const import sys_config
+from iearth_downloader.utils import http_client
+from iearth_downloader.utils.memory import current_rss_mb
+
+
+def _path_prefixes(paths: Iterable[str]) -> Set[str]:
+    """Get every ancestor path (including the path itself) of the given paths."""
+    prefixes = set()
+    for path in paths:
+        parts = path.split("/")
+        for depth in range(1, len(parts) + 1):
+            prefixes.add("/".join(parts[:depth]))
+    return prefixes
+
+
+def _changed_subtrees(changed_paths: List[str], other_prefixes: Set[str]) -> Dict[str, int]:
+    """
+    Collapse changed leaf paths into the largest subtrees that exist on one side only.
+
+    Args:
+        changed_paths: Leaf paths that were added (or removed)
+        other_prefixes: Every prefix of the catalog on the other side of the diff
+
+    Returns:
+        Dict mapping each changed subtree root to its number of changed leaves
+    """
+    subtrees: Dict[str, int] = {}
+    for path in changed_paths:
+        parts = path.split("/")
+        root = path
+        for depth in range(1, len(parts) + 1):
+            prefix = "/".join(parts[:depth])
+            if prefix not in other_prefixes:
+                root = prefix
+                break
+        subtrees[root] = subtrees.get(root, 0) + 1
+    return subtrees
+
+
+def diff_catalog_paths(old_paths: List[str], new_paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    Diff two flattened catalogs.
+
+    The new paths are streamed: only the old paths, their prefixes and the added
+    paths are kept in memory, never the whole new catalog.
+
+    Args:
+        old_paths: Leaf paths of the previous catalog snapshot
+        new_paths: Leaf paths of the current catalog, consumed once, e.g. a generator
+
+    Returns:
+        Dict with 'added' and 'removed' leaf paths (in catalog order) and
+        'added_subtrees' / 'removed_subtrees' mapping the roots of new or removed
+        subtrees to their leaf counts
+    """
+    old_set = set(old_paths)
+    old_prefixes = _path_prefixes(old_paths)
+    # Old paths not seen yet among the new ones, and old prefixes that the new catalog has too
+    unseen = set(old_set)
+    kept_prefixes: Set[str] = set()
+    added = []
+    for p in new_paths:
+        if p in old_set:
+            unseen.discard(p)
+        else:
+            added.append(p)
+        parts = p.split("/")
+        for depth in range(len(parts), 0, -1):
+            prefix = "/".join(parts[:depth])
+            if prefix in kept_prefixes:
+                break
+            if prefix in old_prefixes:
+                kept_prefixes.add(prefix)
+    removed = [p for p in old_paths if p in unseen]
+    return {
+        "added": added,
+        "removed": removed,
+        "added_subtrees": _changed_subtrees(added, old_prefixes),
+        # Every prefix of a removed path is an old prefix, so the old prefixes that
+        # are also in the new catalog decide where a removed subtree starts
+        "removed_subtrees": _changed_subtrees(removed, kept_prefixes),
+    }
 
 
 class CatalogManager:
-    """Manages catalog data operations including fetching and processing."""
+    """
+    Manages catalog data operations including fetching and processing.
 
-    def __init__(self, catalog_file_path: str, resource_id: int = None):
+    With a compact catalog file the catalog is kept as a memory-mapped tree
+    (see core.catalog_store) and the JSON catalog file is only written on
+    request; without one the catalog is kept in the JSON file.
+    """
+
+    def __init__(
+        self,
+        catalog_file_path: str,
+        resource_id: int = None,
+        diff_file_path: Optional[str] = None,
+        compact_file_path: Optional[str] = None,
+        export_json: bool = False,
+        sync: bool = False,
+    ):
         self.catalog_data = {}
         self.catalog_file = catalog_file_path
         self.resource_id = resource_id if resource_id is not None else RESOURCE_ID
+        # Where the diff against the previous catalog snapshot is written
+        self.diff_file = diff_file_path
+        self.catalog_diff: Optional[Dict[str, Any]] = None
+        # Compact catalog file, and whether to also write the JSON catalog file
+        self.compact_file = compact_file_path
+        self.export_json = export_json
+        self._catalog: Optional[CompactCatalog] = None
+        # In sync mode the fetched catalog is diffed against the catalog of the
+        # last completed sync run, kept in the sync base file until the next one completes
+        self.sync = sync
+        # Prefix trie over the loaded paths, built on first use
+        self._index: Optional[PathIndex] = None
 
     def flatten_catalog_paths(
         self, catalog_data: List[Dict[str, Any]], parent_path: str = ""
-    ) -> List[str]:
+    ) -> Iterator[str]:
         """
-        Recursively flatten the catalog structure to generate paths.
+        Flatten the catalog structure, yielding the leaf paths in catalog order.
+
+        The tree is walked with an explicit stack of child iterators, so each
+        path is built once, paths are available as soon as they are reached and
+        deep trees do not hit the recursion limit.
 
         Args:
             catalog_data: List of catalog items with potential children
             parent_path: Current path prefix
 
-        Returns:
-            List of flattened paths
+        Yields:
+            Flattened paths
         """
-        paths = []
-
-        for item in catalog_data:
-            current_path = (
-                f"{parent_path}/{item['label']}" if parent_path else item["label"]
-            )
+        stack = [(iter(catalog_data), parent_path)]
+        while stack:
+            items, prefix = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+                continue
+            current_path = f"{prefix}/{item['label']}" if prefix else item["label"]
 
             if "children" in item and item["children"]:
-                # Recursively process children
-                paths.extend(self.flatten_catalog_paths(item["children"], current_path))
+                # Descend into the children before the next sibling
+                stack.append((iter(item["children"]), current_path))
             else:
-                # This is a leaf node, add the path
-                paths.append(current_path)
-
-        return paths
+                # This is a leaf node, yield the path
+                yield current_path
 
     def fetch_catalog_data(self) -> bool:
         """
-        Fetch catalog data from API and save to JSON file.
+        Fetch catalog data from API and save it to the compact catalog file,
+        and to the JSON file if requested or if no compact file is used.
 
         Returns:
             bool: True if successful, False otherwise
@@ -57,33 +178,58 @@ class CatalogManager:
 
         try:
             print("Fetching catalog data from API...")
-            response = requests.get(url)
+            response = http_client.get_session().get(url)
             response.raise_for_status()
 
             # Parse the JSON response
             data = response.json()
+            # Release the response body, only the parsed tree is needed from here on
+            del response
 
             # Extract catalog, table, and type
             catalog = data.get("catalog", [])
             table = data.get("table", "")
             data_type = data.get("type", "")
+            del data
 
-            # Flatten the catalog to generate paths
             print("Processing catalog structure...")
-            paths = self.flatten_catalog_paths(catalog)
+            if self.sync:
+                self._keep_sync_base()
+            if self.compact_file:
+                # Diff against the previous snapshot before it is overwritten; the
+                # flattened paths are streamed into the diff, not collected in a list,
+                # and are not flattened at all if there is no previous snapshot
+                self._diff_against_snapshot(self.flatten_catalog_paths(catalog))
+                self.close()
+                path_count = write_compact_catalog(self.compact_file, catalog, table, data_type)
+                # The tree is no longer needed, paths are read from the compact file
+                del catalog
+                print(
+                    f"Successfully wrote {path_count} paths to {self.compact_file} "
+                    f"({os.path.getsize(self.compact_file) / 1024:.1f} KB)"
+                )
+                self._open_compact()
+                if self.export_json:
+                    self._catalog.export_json(self.catalog_file)
+                    print(f"Exported the catalog as JSON to {self.catalog_file}")
+            else:
+                # Flatten the catalog to generate paths
+                paths = list(self.flatten_catalog_paths(catalog))
+                self._diff_against_snapshot(paths)
 
-            # Create the output structure
-            output = {"path": paths, "table": table, "type": data_type}
+                # Create the output structure
+                output = {"path": paths, "table": table, "type": data_type}
 
-            # Write to catalog.json
-            with open(self.catalog_file, "w", encoding="utf-8") as f:
-                json.dump(output, f, indent=2, ensure_ascii=False)
+                # Write to catalog.json
+                with open(self.catalog_file, "w", encoding="utf-8") as f:
+                    json.dump(output, f, indent=2, ensure_ascii=False)
 
-            print(f"Successfully wrote {len(paths)} paths to {self.catalog_file}")
+                print(f"Successfully wrote {len(paths)} paths to {self.catalog_file}")
+                self.catalog_data = output
             print(f"Table: {table}")
             print(f"Type: {data_type}")
 
-            self.catalog_data = output
+            self._index = None
             return True
 
         except requests.exceptions.RequestException as e:
@@ -96,18 +242,199 @@ class CatalogManager:
             print(f"Unexpected error: {e}")
             return False
 
+    @property
+    def snapshot_file(self) -> str:
+        """The saved catalog the next fetch is diffed against."""
+        return self.compact_file or self.catalog_file
+
+    @property
+    def sync_base_file(self) -> str:
+        """Copy of the catalog of the last completed sync run, e.g. catalog_id_9.sync_base.bin."""
+        root, ext = os.path.splitext(self.snapshot_file)
+        return f"{root}.sync_base{ext}"
+
+    def _keep_sync_base(self) -> None:
+        """
+        Keep the saved catalog as the sync base before it is overwritten, unless a
+        sync base remains from a sync run that did not complete: the paths added
+        since that base are then enumerated again.
+        """
+        if os.path.exists(self.sync_base_file):
+            print(
+                f"Sync: the previous sync run did not complete, diffing against "
+                f"{self.sync_base_file}"
+            )
+        else:
+            if self.compact_file and not os.path.exists(self.compact_file) and os.path.exists(
+                self.catalog_file
+            ):
+                self._convert_json_catalog()
+            if os.path.exists(self.snapshot_file):
+                shutil.copyfile(self.snapshot_file, self.sync_base_file)
+
+    def complete_sync(self) -> None:
+        """Advance the sync base to the fetched catalog after a completed sync run."""
+        if os.path.exists(self.sync_base_file):
+            os.remove(self.sync_base_file)
+
+    def _read_snapshot_paths(self) -> Optional[List[str]]:
+        """
+        Read the paths of the saved catalog (the sync base in sync mode), or None if
+        there is no saved catalog.
+        """
+        snapshot_file = self.snapshot_file
+        if self.sync and os.path.exists(self.sync_base_file):
+            snapshot_file = self.sync_base_file
+        if not os.path.exists(snapshot_file):
+            if self.compact_file and os.path.exists(self.catalog_file):
+                # Catalog saved as JSON by an older version
+                snapshot_file = self.catalog_file
+            else:
+                return None
+        if snapshot_file != self.catalog_file:
+            try:
+                snapshot = CompactCatalog(snapshot_file)
+            except (OSError, ValueError) as e:
+                print(f"Could not read previous catalog snapshot {snapshot_file}: {e}")
+                return []
+            try:
+                return snapshot.paths
+            finally:
+                snapshot.close()
+        try:
+            with open(snapshot_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("path", [])
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not read previous catalog snapshot {snapshot_file}: {e}")
+            return []
+
+    def _diff_against_snapshot(self, paths: Iterable[str]) -> None:
+        """
+        Diff the fetched paths against the previous catalog file and report the changes.
+
+        Without a previous snapshot every path is new: the paths are not read at all
+        and the diff only records that all of them were added, so a first run does
+        not hold the catalog's paths in memory.
+
+        Args:
+            paths: Fetched leaf paths in catalog order, consumed once
+        """
+        previous_paths = self._read_snapshot_paths()
+        if previous_paths is None:
+            print("No previous catalog snapshot found, all paths are new.")
+            self.catalog_diff = {
+                "all_added": True,
+                "added": [],
+                "removed": [],
+                "added_subtrees": {},
+                "removed_subtrees": {},
+            }
+        else:
+            self.catalog_diff = diff_catalog_paths(previous_paths, paths)
+            self.catalog_diff["all_added"] = False
+            self._report_diff()
+        if self.diff_file:
+            with open(self.diff_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    dict(self.catalog_diff, fetched_at=time.time()),
+                    f,
+                    indent=2,
+                    ensure_ascii=False,
+                )
+
+    def _report_diff(self) -> None:
+        """Print the number of added and removed paths and the changed subtrees."""
+        added = self.catalog_diff["added"]
+        removed = self.catalog_diff["removed"]
+        print(f"Catalog changes: {len(added)} paths added, {len(removed)} paths removed")
+        for root, count in self.catalog_diff["added_subtrees"].items():
+            print(f"  + {root} ({count} paths)")
+        for root, count in self.catalog_diff["removed_subtrees"].items():
+            print(f"  - {root} ({count} paths)")
+
+    def all_paths_added(self) -> bool:
+        """Check whether the fetched catalog had no previous snapshot, so every path is new."""
+        return self.catalog_diff is not None and self.catalog_diff["all_added"]
+
+    def get_added_paths(self) -> Optional[List[str]]:
+        """
+        Get the paths added since the previous snapshot, or None if no diff was computed.
+        Empty if all paths were added, see all_paths_added().
+        """
+        if self.catalog_diff is None:
+            return None
+        return self.catalog_diff["added"]
+
+    def get_removed_paths(self) -> List[str]:
+        """Get the paths removed since the previous snapshot."""
+        if self.catalog_diff is None:
+            return []
+        return self.catalog_diff["removed"]
+
+    def _open_compact(self) -> None:
+        """Open the compact catalog file and describe the loaded catalog in catalog_data."""
+        self._catalog = CompactCatalog(self.compact_file)
+        self.catalog_data = {"table": self._catalog.table, "type": self._catalog.data_type}
+
+    def _convert_json_catalog(self) -> None:
+        """Write the compact catalog file from a catalog saved as JSON by an older version."""
+        with open(self.catalog_file, "r", encoding="utf-8") as f:
+            catalog_data = json.load(f)
+        write_compact_catalog(
+            self.compact_file,
+            paths_to_tree(catalog_data.get("path", [])),
+            catalog_data.get("table", ""),
+            catalog_data.get("type", ""),
+        )
+        print(f"Converted {self.catalog_file} to the compact catalog file {self.compact_file}")
+
     def load_catalog_data(self) -> Dict[str, Any]:
         """
-        Load catalog data from catalog.json file.
+        Load catalog data from the compact catalog file, or from catalog.json
+        if no compact catalog file is used.
+
+        The compact file is memory-mapped, so loading does not read the paths;
+        they are read when selected. Load time and resident memory are reported.
 
         Returns:
-            Dictionary containing catalog data with paths, table, and type
+            Dictionary containing catalog data with table and type (and paths, from JSON)
         """
+        if not self.compact_file:
+            return self._load_json_catalog()
+
+        start = time.perf_counter()
+        try:
+            if not os.path.exists(self.compact_file) and os.path.exists(self.catalog_file):
+                self._convert_json_catalog()
+            self.close()
+            self._open_compact()
+        except FileNotFoundError:
+            print(
+                f"Error: {self.compact_file} file not found. Please run fetch_catalog_data() first."
+            )
+            return {}
+        except json.JSONDecodeError as e:
+            print(f"Error parsing {self.catalog_file}: {e}")
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Error reading {self.compact_file}: {e}")
+            return {}
+        self._index = None
+        print(
+            f"Loaded catalog {self.compact_file}: {len(self._catalog)} paths, "
+            f"{os.path.getsize(self.compact_file) / 1024:.1f} KB, "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms, RSS {current_rss_mb():.1f} MB"
+        )
+        return self.catalog_data
+
+    def _load_json_catalog(self) -> Dict[str, Any]:
+        """Load the whole catalog from catalog.json."""
+        start = time.perf_counter()
         try:
             with open(self.catalog_file, "r", encoding="utf-8") as f:
                 catalog_data = json.load(f)
             self.catalog_data = catalog_data
-            return catalog_data
+            self._index = None
         except FileNotFoundError:
             print(
                 f"Error: {self.catalog_file} file not found. Please run fetch_catalog_data() first."
@@ -116,11 +443,52 @@ class CatalogManager:
         except json.JSONDecodeError as e:
             print(f"Error parsing {self.catalog_file}: {e}")
             return {}
+        print(
+            f"Loaded catalog {self.catalog_file}: {len(self.get_paths())} paths, "
+            f"{os.path.getsize(self.catalog_file) / 1024:.1f} KB, "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms, RSS {current_rss_mb():.1f} MB"
+        )
+        return catalog_data
+
+    def close(self) -> None:
+        """Close the compact catalog file, if open."""
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+            self._index = None
 
     def get_paths(self) -> List[str]:
-        """Get the list of paths from loaded catalog data."""
+        """Get the list of paths from loaded catalog data. Reads the whole compact catalog."""
+        if self._catalog is not None:
+            return self._catalog.paths
         return self.catalog_data.get("path", [])
 
+    def iter_paths(self) -> Iterator[str]:
+        """
+        Yield the paths of the loaded catalog data in catalog order; a compact
+        catalog is read as the paths are consumed, not all at once.
+        """
+        if self._catalog is not None:
+            return self._catalog.iter_paths()
+        return iter(self.catalog_data.get("path", []))
+
+    def get_path_count(self) -> int:
+        """Get the number of paths in the loaded catalog data."""
+        if self._catalog is not None:
+            return len(self._catalog)
+        return len(self.catalog_data.get("path", []))
+
+    def get_index(self) -> PathIndex:
+        """
+        Get the prefix trie over the paths of the loaded catalog data; a compact
+        catalog is itself the trie and is matched without reading unselected subtrees.
+        """
+        if self._catalog is not None:
+            return self._catalog
+        if self._index is None:
+            self._index = PathIndex(self.get_paths())
+        return self._index
+
     def get_table(self) -> str:
         """Get the table name from loaded catalog data."""
         return self.catalog_data.get("table", "")
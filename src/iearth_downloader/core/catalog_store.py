@@ -0,0 +1,322 @@
+"""
+Compact catalog storage: the catalog tree in a memory-mapped binary file.
+
+Layout (little-endian):
+
+    header   magic, node, path and label counts, offsets of the sections
+    nodes    one record of three uint32 per node, in depth-first preorder:
+             label number, parent node, end of the subtree (high bit set if
+             the node ends a catalog path)
+    labels   uint32 offset of every distinct label in names, plus the end offset
+    names    the distinct labels in UTF-8, concatenated
+    meta     JSON object with the table and type of the catalog
+
+A shared path prefix is stored once as a chain of nodes, and a label repeated
+in many directories (such as a tile name under every year) is stored once.
+Because nodes are in preorder, the subtree of a node is the contiguous record
+range [node, end), which lets a subtree be read without touching the rest of
+the file. Node 0 is the root and has no label.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from iearth_downloader.core.path_index import PathIndex, normalize_path
+
+MAGIC = b"IECATv1\0"
+HEADER = struct.Struct("<8sIIIQQQQ")
+# Fields of a node record
+NODE_FIELDS = 3
+LABEL, PARENT, END = range(NODE_FIELDS)
+# Bit of the END field marking a node that ends a catalog path
+FLAG_PATH = 0x80000000
+END_MASK = FLAG_PATH - 1
+NO_PARENT = 0xFFFFFFFF
+# Decoded labels kept in memory by an open catalog
+MAX_CACHED_LABELS = 65536
+
+
+def paths_to_tree(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Rebuild a catalog tree of {"label", "children"} items from flattened paths,
+    e.g. to convert a catalog saved in the old JSON format.
+    """
+    root: Dict[str, Any] = {}
+    for path in paths:
+        node = root
+        for component in normalize_path(path).split("/"):
+            node = node.setdefault(component, {})
+    tree: List[Dict[str, Any]] = []
+    stack = [(root, tree)]
+    while stack:
+        node, items = stack.pop()
+        for label, children in node.items():
+            item: Dict[str, Any] = {"label": label, "children": []}
+            items.append(item)
+            stack.append((children, item["children"]))
+    return tree
+
+
+def write_compact_catalog(
+    file_path: str, catalog: List[Dict[str, Any]], table: str, data_type: str
+) -> int:
+    """
+    Write a catalog tree, as returned by the catalog API, to a compact catalog file.
+
+    The file is written next to the target and renamed into place, so readers
+    never see a partial file.
+
+    Args:
+        file_path: Path of the compact catalog file
+        catalog: List of {"label", "children"} items
+        table: Table name of the catalog
+        data_type: Data type of the catalog
+
+    Returns:
+        int: Number of catalog paths (leaves) written
+    """
+    nodes = array("I", [0, NO_PARENT, 0])
+    label_ids: Dict[str, int] = {}
+    label_offsets = array("I", [0])
+    names = bytearray()
+    path_count = 0
+    # Walk the tree in preorder without recursion; a node's end is known
+    # once all of its children have been written
+    stack = [(iter(catalog), 0)]
+    while stack:
+        items, parent = stack[-1]
+        item = next(items, None)
+        if item is None:
+            stack.pop()
+            nodes[parent * NODE_FIELDS + END] |= len(nodes) // NODE_FIELDS
+            continue
+        node = len(nodes) // NODE_FIELDS
+        label = str(item["label"])
+        label_id = label_ids.get(label)
+        if label_id is None:
+            label_id = label_ids[label] = len(label_ids)
+            names += label.encode("utf-8")
+            label_offsets.append(len(names))
+        children = item.get("children")
+        if children:
+            nodes.extend((label_id, parent, 0))
+            stack.append((iter(children), node))
+        else:
+            nodes.extend((label_id, parent, FLAG_PATH | (node + 1)))
+            path_count += 1
+    if len(nodes) // NODE_FIELDS > END_MASK:
+        raise ValueError("Catalog has too many nodes for the compact catalog format")
+
+    if sys.byteorder != "little":
+        nodes.byteswap()
+        label_offsets.byteswap()
+    meta = json.dumps({"table": table, "type": data_type}, ensure_ascii=False).encode("utf-8")
+    # The uint32 arrays come first, aligned for memoryview.cast
+    nodes_offset = HEADER.size + (-HEADER.size % 4)
+    labels_offset = nodes_offset + len(nodes) * nodes.itemsize
+    names_offset = labels_offset + len(label_offsets) * label_offsets.itemsize
+    meta_offset = names_offset + len(names)
+
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                len(nodes) // NODE_FIELDS,
+                path_count,
+                len(label_ids),
+                labels_offset,
+                names_offset,
+                meta_offset,
+                len(meta),
+            )
+        )
+        f.write(b"\0" * (nodes_offset - HEADER.size))
+        f.write(nodes.tobytes())
+        f.write(label_offsets.tobytes())
+        f.write(names)
+        f.write(meta)
+    os.replace(temp_path, file_path)
+    return path_count
+
+
+class CompactCatalog(PathIndex):
+    """
+    Read-only view of a compact catalog file.
+
+    The file is memory-mapped, so opening it reads only the header and the
+    pages actually visited are loaded: selecting a subtree reads its node
+    records and labels, not the whole catalog. Selections work as for
+    PathIndex, with node numbers as path keys.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Open a compact catalog file.
+
+        Raises:
+            ValueError: If the file is not a compact catalog
+            OSError: If the file cannot be read
+        """
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty catalog file: {file_path}") from None
+        if self._mm.size() < HEADER.size or self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a compact catalog file: {file_path}")
+        (
+            _,
+            self.node_count,
+            self.path_count,
+            label_count,
+            labels_offset,
+            self._names_offset,
+            meta_offset,
+            meta_length,
+        ) = HEADER.unpack_from(self._mm)
+        nodes_offset = HEADER.size + (-HEADER.size % 4)
+        self._view: Optional[memoryview] = None
+        self._arrays: List[memoryview] = []
+        self._nodes = self._uint32_array(nodes_offset, self.node_count * NODE_FIELDS)
+        self._label_offsets = self._uint32_array(labels_offset, label_count + 1)
+        # Decoded labels by label number, bounded by MAX_CACHED_LABELS
+        self._names: Dict[int, str] = {}
+        meta = json.loads(self._mm[meta_offset : meta_offset + meta_length].decode("utf-8"))
+        self.table: str = meta.get("table", "")
+        self.data_type: str = meta.get("type", "")
+        self._root = 0
+
+    def _uint32_array(self, offset: int, count: int):
+        """View count uint32 values of the file, without copying them on little-endian hosts."""
+        if sys.byteorder == "little":
+            if self._view is None:
+                self._view = memoryview(self._mm)
+            values = self._view[offset : offset + count * 4].cast("I")
+            self._arrays.append(values)
+            return values
+        values = array("I", self._mm[offset : offset + count * 4])
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return self.path_count
+
+    @property
+    def paths(self) -> List[str]:
+        """All paths, in catalog order. Reads the whole file."""
+        return list(self.iter_paths())
+
+    def iter_paths(self, node: int = 0) -> Iterator[str]:
+        """
+        Yield the paths in the subtree of a node in catalog order, reading only that subtree.
+
+        Args:
+            node: Node number, the root (all paths) by default
+        """
+        nodes = self._nodes
+        prefix = self._path(node) if node else ""
+        if node and nodes[node * NODE_FIELDS + END] & FLAG_PATH:
+            yield prefix
+        # Stack of (end, path) of the ancestors of the current record
+        stack: List[Tuple[int, str]] = [(nodes[node * NODE_FIELDS + END] & END_MASK, prefix)]
+        for current in range(node + 1, stack[0][0]):
+            while current >= stack[-1][0]:
+                stack.pop()
+            parent_path = stack[-1][1]
+            name = self._name(current)
+            path = f"{parent_path}/{name}" if parent_path else name
+            end = nodes[current * NODE_FIELDS + END]
+            if end & FLAG_PATH:
+                yield path
+            end &= END_MASK
+            if end > current + 1:
+                stack.append((end, path))
+
+    def find(self, path: str) -> Optional[int]:
+        """Get the node number of a path or directory, or None if it is not in the catalog."""
+        node = self._root
+        for component in normalize_path(path).split("/"):
+            if not component:
+                continue
+            node = self._child(node, component)
+            if node is None:
+                return None
+        return node
+
+    def export_json(self, json_file: str) -> int:
+        """
+        Write the catalog in the JSON format of catalog_id_{id}.json, streaming the paths.
+
+        Returns:
+            int: Number of paths written
+        """
+        count = 0
+        with open(json_file, "w", encoding="utf-8") as f:
+            f.write('{\n  "path": [')
+            for path in self.iter_paths():
+                f.write(("\n    " if count == 0 else ",\n    ") + json.dumps(path, ensure_ascii=False))
+                count += 1
+            f.write("\n  ],\n" if count else "],\n")
+            f.write(f'  "table": {json.dumps(self.table, ensure_ascii=False)},\n')
+            f.write(f'  "type": {json.dumps(self.data_type, ensure_ascii=False)}\n}}')
+        return count
+
+    def close(self) -> None:
+        """Release the memory map and close the file."""
+        if getattr(self, "_view", None) is not None:
+            for values in self._arrays:
+                values.release()
+            self._view.release()
+            self._view = None
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def _name(self, node: int) -> str:
+        label = self._nodes[node * NODE_FIELDS + LABEL]
+        name = self._names.get(label)
+        if name is None:
+            start = self._names_offset + self._label_offsets[label]
+            end = self._names_offset + self._label_offsets[label + 1]
+            name = self._mm[start:end].decode("utf-8")
+            if len(self._names) >= MAX_CACHED_LABELS:
+                self._names.clear()
+            self._names[label] = name
+        return name
+
+    def _child(self, node: int, name: str) -> Optional[int]:
+        for child_name, child in self._children(node):
+            if child_name == name:
+                return child
+        return None
+
+    def _children(self, node: int) -> Iterator[Tuple[str, int]]:
+        nodes = self._nodes
+        end = nodes[node * NODE_FIELDS + END] & END_MASK
+        child = node + 1
+        while child < end:
+            yield self._name(child), child
+            child = nodes[child * NODE_FIELDS + END] & END_MASK
+
+    def _leaves(self, node: int) -> Iterator[int]:
+        nodes = self._nodes
+        for current in range(node, nodes[node * NODE_FIELDS + END] & END_MASK):
+            if nodes[current * NODE_FIELDS + END] & FLAG_PATH:
+                yield current
+
+    def _path(self, key: int) -> str:
+        components = []
+        node = key
+        while node != 0:
+            components.append(self._name(node))
+            node = self._nodes[node * NODE_FIELDS + PARENT]
+        return "/".join(reversed(components))
@@ -0,0 +1,161 @@
+"""
+Adaptive concurrency module adjusting the number of active transfers at run time.
+"""
+
+import threading
+import time
+from typing import Optional
+
+# Transfers are compared by latency per this many bytes; smaller files count as one unit,
+# as their latency is mostly the request overhead
+LATENCY_UNIT_BYTES = 1024 * 1024
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD controller for the number of concurrent transfers.
+
+    The engine starts max_limit workers, numbered from 1; only workers whose
+    number is within the current limit take new tasks. Workers report every
+    transfer, and once per adjustment interval the controller compares the
+    window with what it has seen before:
+
+    - throttling responses (HTTP 429/503) halve the limit at once
+    - an error rate above error_threshold or a mean latency per MB above
+      latency_tolerance times the best window so far cuts the limit by 25%
+    - otherwise the limit grows by one
+
+    Decreases are followed by a cooldown of one interval so a burst of failures
+    from transfers started before the cut does not cut the limit again.
+    """
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        initial_limit: Optional[int] = None,
+        adjust_interval: float = 5.0,
+        error_threshold: float = 0.1,
+        latency_tolerance: float = 2.0,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            min_limit: Lowest number of active transfers
+            max_limit: Highest number of active transfers (number of workers started)
+            initial_limit: Starting limit, halfway between the bounds if None
+            adjust_interval: Seconds between adjustments
+            error_threshold: Fraction of failed transfers in a window that counts as overload
+            latency_tolerance: Factor over the best window latency that counts as overload
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        if initial_limit is None:
+            initial_limit = (self.min_limit + self.max_limit) // 2
+        self.limit = max(self.min_limit, min(initial_limit, self.max_limit))
+        self.adjust_interval = adjust_interval
+        self.error_threshold = error_threshold
+        self.latency_tolerance = latency_tolerance
+        self.changes = 0
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._best_latency: Optional[float] = None
+        self._cooldown_until = 0.0
+        self._reset_window(time.monotonic())
+
+    def _reset_window(self, now: float) -> None:
+        """Start a new measurement window."""
+        self._window_start = now
+        self._completed = 0
+        self._failed = 0
+        self._latency_total = 0.0
+        self._latency_units = 0.0
+        self._bytes = 0
+
+    def is_active(self, worker_id: int) -> bool:
+        """Check whether a worker may take a new task under the current limit."""
+        return self._stopped or worker_id <= self.limit
+
+    def wait_for_slot(self, worker_id: int) -> None:
+        """Block a worker thread while its number is above the current limit."""
+        with self._condition:
+            while not self.is_active(worker_id):
+                self._condition.wait()
+
+    def stop(self) -> None:
+        """Release all waiting workers so they can drain the queue and exit."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def record(self, latency: float, nbytes: int, ok: bool, throttled: bool = False) -> None:
+        """
+        Report a finished transfer and adjust the limit if the window is over.
+
+        Args:
+            latency: Seconds the transfer took
+            nbytes: Bytes transferred, used to compare latencies of files of different sizes
+            ok: Whether the transfer succeeded
+            throttled: Whether the server answered this transfer with a throttling status
+        """
+        with self._condition:
+            now = time.monotonic()
+            if throttled:
+                if now >= self._cooldown_until:
+                    self._set_limit(self.limit // 2, "throttled by server", now)
+                return
+
+            self._completed += 1
+            if ok:
+                self._latency_total += latency
+                self._latency_units += max(1.0, nbytes / LATENCY_UNIT_BYTES)
+                self._bytes += nbytes
+            else:
+                self._failed += 1
+
+            elapsed = now - self._window_start
+            if elapsed < self.adjust_interval or now < self._cooldown_until:
+                return
+            self._adjust(now, elapsed)
+
+    def _adjust(self, now: float, elapsed: float) -> None:
+        """Apply one AIMD step from the finished window."""
+        succeeded = self._completed - self._failed
+        error_rate = self._failed / self._completed if self._completed else 0.0
+        # Seconds per MB, so a shift to larger files alone does not look like overload
+        mean_latency = self._latency_total / self._latency_units if succeeded else None
+        throughput_mb = self._bytes / elapsed / (1024 * 1024)
+        summary = (
+            f"{self._completed} transfers, {error_rate * 100:.0f}% failed, "
+            f"mean latency {mean_latency or 0:.2f}s/MB, {throughput_mb:.2f} MB/s"
+        )
+
+        if error_rate > self.error_threshold:
+            self._set_limit(self.limit * 3 // 4, f"errors ({summary})", now)
+        elif (
+            mean_latency is not None
+            and self._best_latency is not None
+            and mean_latency > self._best_latency * self.latency_tolerance
+        ):
+            self._set_limit(self.limit * 3 // 4, f"latency rising ({summary})", now)
+        else:
+            if mean_latency is not None and (
+                self._best_latency is None or mean_latency < self._best_latency
+            ):
+                self._best_latency = mean_latency
+            self._set_limit(self.limit + 1, f"healthy ({summary})", now)
+        self._reset_window(now)
+
+    def _set_limit(self, new_limit: int, reason: str, now: float) -> None:
+        """Change the limit within the bounds, log it and wake waiting workers."""
+        new_limit = max(self.min_limit, min(new_limit, self.max_limit))
+        if new_limit < self.limit:
+            self._cooldown_until = now + self.adjust_interval
+            self._reset_window(now)
+        if new_limit == self.limit:
+            return
+        print(f"Concurrency: {self.limit} -> {new_limit} active transfers, {reason}")
+        self.limit = new_limit
+        self.changes += 1
+        self._condition.notify_all()
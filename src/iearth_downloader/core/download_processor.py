@@ -2,14 +2,49 @@
 Download processor module for coordinating the entire download workflow.
 """
 
+import itertools
 import os
 import time
 import threading
 import queue
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 from iearth_downloader.core.catalog_manager import CatalogManager
+from iearth_downloader.core.concurrency import AdaptiveConcurrencyController
+from iearth_downloader.core.file_list_cache import FileListCache
 from iearth_downloader.core.file_manager import FileManager
-from iearth_downloader.core.downloader import Downloader, Logger
+from iearth_downloader.core.local_inventory import (
+    INVENTORY_MISSING,
+    INVENTORY_OK,
+    LocalInventory,
+)
+from iearth_downloader.core.path_index import PathIndex
+from iearth_downloader.core.retry import (
+    DeadLetterLog,
+    RetryScheduler,
+    compute_backoff,
+    is_retryable,
+)
+from iearth_downloader.core.scheduling import SCHEDULING_POLICIES, schedule_tasks
+from iearth_downloader.core.sharding import (
+    SHARD_BY_CHOICES,
+    SHARD_BY_FILE,
+    SHARD_BY_PATH,
+    find_shard_files,
+    in_shard,
+    shard_file_path,
+    shard_of,
+)
+from iearth_downloader.core.downloader import (
+    THROTTLE_STATUS_CODES,
+    Downloader,
+    get_part_path,
+    parse_expected_size,
+)
+from iearth_downloader.core.state_store import STATUS_COMPLETED, DownloadStateStore
+from iearth_downloader.core.task import DownloadTask
 from iearth_downloader.config.config import (
     DEFAULT_DOWNLOAD_PATH,
     MAX_DOWNLOAD_THREADS,
@@ -17,6 +52,9 @@ from iearth_downloader.config.config import (
     RESOURCE_ID,
 )
 from iearth_downloader.system.const import get_system_config
+from iearth_downloader.utils import auth, http_client, rate_limit
+from iearth_downloader.utils.checksum import file_sha256
+from iearth_downloader.utils.signed_url import SignedUrlCache
 
 
 def get_download_path():
@@ -40,14 +78,30 @@ def get_download_path():
 class DownloadProcessor:
     """Coordinates the entire download process."""
 
-    def __init__(self, custom_download_path: str = None, config_overrides: dict = None):
+    def __init__(
+        self,
+        custom_download_path: str = None,
+        config_overrides: dict = None,
+        batch_engine: Optional["DownloadProcessor"] = None,
+    ):
         """
         Initialize the download processor.
 
         Args:
             custom_download_path: Optional custom download path to override config
             config_overrides: Optional dictionary to override config values
-                Supported keys: 'max_threads', 'resource_id', 'target_sub_path'
+                Supported keys: 'max_threads', 'resource_id', 'target_sub_path', 'engine',
+                'max_segments', 'resolver_threads', 'persist_url_cache',
+                'enumeration_threads', 'file_list_api_concurrency', 'refresh_listing',
+                'sync', 'inventory_preflight', 'download_api_rate', 'file_list_api_rate',
+                'max_download_rate_mb', 'adaptive_concurrency', 'min_threads',
+                'max_retries', 'read_timeout', 'min_transfer_rate_kb', 'hedged_requests',
+                'scheduling_policy', 'shard', 'shard_by', 'include_paths', 'exclude_paths',
+                'export_catalog_json'
+            batch_engine: Processor running the download engine of a batch run this
+                processor is a member of. The member shares its HTTP session, rate
+                limits, file-list request slots and enumeration pool instead of
+                configuring its own.
         """
         # Apply configuration overrides
         if config_overrides is None:
@@ -57,55 +111,519 @@ class DownloadProcessor:
         self.max_threads = config_overrides.get("max_threads", MAX_DOWNLOAD_THREADS)
         self.resource_id = config_overrides.get("resource_id", RESOURCE_ID)
         self.target_sub_path = config_overrides.get("target_sub_path", TARGET_SUB_PATH)
+        self.engine = config_overrides.get("engine", "thread")
+        # Catalog path selectors (prefixes, globs or "re:" regexes), see core.path_index
+        self.include_paths = list(config_overrides.get("include_paths") or [])
+        self.exclude_paths = list(config_overrides.get("exclude_paths") or [])
 
         # Determine download base path first
         self.download_base_path = custom_download_path or get_download_path()
 
         # Load system configurations based on (possibly overridden) resource_id
         self._system_configs = get_system_config(self.resource_id)
-        self.sleep_interval = self._system_configs["SLEEP_INTERVAL"]
-        self.sleep_after_files = self._system_configs["SLEEP_AFTER_FILES"]
+        # Request rates (per second) and transfer bandwidth (MB/s), 0 = unlimited
+        self.download_api_rate = config_overrides.get(
+            "download_api_rate", self._system_configs["DOWNLOAD_API_RATE"]
+        )
+        self.file_list_api_rate = config_overrides.get(
+            "file_list_api_rate", self._system_configs["FILE_LIST_API_RATE"]
+        )
+        self.max_download_rate_mb = config_overrides.get(
+            "max_download_rate_mb", self._system_configs["MAX_DOWNLOAD_RATE_MB"]
+        )
+        self.max_segments = config_overrides.get(
+            "max_segments", self._system_configs["MAX_SEGMENTS"]
+        )
+        self.segment_threshold_mb = self._system_configs["SEGMENT_THRESHOLD_MB"]
+        self.resolver_threads = config_overrides.get(
+            "resolver_threads", self._system_configs["URL_RESOLVER_THREADS"]
+        )
+        self.signed_url_min_ttl = self._system_configs["SIGNED_URL_MIN_TTL"]
+        self.enumeration_threads = max(
+            1,
+            config_overrides.get(
+                "enumeration_threads", self._system_configs["ENUMERATION_THREADS"]
+            ),
+        )
+        self.file_list_api_concurrency = config_overrides.get(
+            "file_list_api_concurrency", self._system_configs["FILE_LIST_API_CONCURRENCY"]
+        )
+        self.file_list_cache_ttl_hours = self._system_configs["FILE_LIST_CACHE_TTL_HOURS"]
+        self.refresh_listing = config_overrides.get("refresh_listing", False)
+        # Only enumerate catalog paths added since the previous catalog snapshot
+        self.sync = config_overrides.get("sync", False)
+        self.persist_url_cache = config_overrides.get(
+            "persist_url_cache", self._system_configs["PERSIST_SIGNED_URL_CACHE"]
+        )
+        # Adjust the number of active transfers between min_threads and max_threads
+        self.adaptive_concurrency = config_overrides.get(
+            "adaptive_concurrency", self._system_configs["ADAPTIVE_CONCURRENCY"]
+        )
+        self.min_threads = config_overrides.get(
+            "min_threads", self._system_configs["MIN_CONCURRENCY"]
+        )
+        # Order of the tasks handed to the workers, chosen within a lookahead window
+        self.scheduling_policy = config_overrides.get(
+            "scheduling_policy", self._system_configs["SCHEDULING_POLICY"]
+        )
+        if self.scheduling_policy not in SCHEDULING_POLICIES:
+            raise ValueError(
+                f"Unknown scheduling policy: {self.scheduling_policy} "
+                f"(expected one of {', '.join(SCHEDULING_POLICIES)})"
+            )
+        self.scheduling_window = self._system_configs["SCHEDULING_WINDOW"]
+        # Race a duplicate against requests slower than hedge_percentile of recent ones
+        self.hedged_requests = config_overrides.get(
+            "hedged_requests", self._system_configs["HEDGED_REQUESTS"]
+        )
+        self.hedge_percentile = self._system_configs["HEDGE_PERCENTILE"]
+        self.hedge_budget = self._system_configs["HEDGE_BUDGET"]
+        # Failed downloads are retried with exponential backoff before they are dead-lettered
+        self.max_retries = config_overrides.get(
+            "max_retries", self._system_configs["MAX_RETRIES"]
+        )
+        self.retry_base_delay = self._system_configs["RETRY_BASE_DELAY"]
+        self.retry_max_delay = self._system_configs["RETRY_MAX_DELAY"]
+        # Timeouts of every request, and the throughput below which a transfer is aborted
+        self.connect_timeout = self._system_configs["CONNECT_TIMEOUT"]
+        self.read_timeout = config_overrides.get(
+            "read_timeout", self._system_configs["READ_TIMEOUT"]
+        )
+        self.min_transfer_rate_kb = config_overrides.get(
+            "min_transfer_rate_kb", self._system_configs["MIN_TRANSFER_RATE_KB"]
+        )
+        self.stall_window = self._system_configs["STALL_WINDOW"]
+        # Scan the download directory once instead of checking every file on disk
+        self.inventory_preflight = config_overrides.get(
+            "inventory_preflight", self._system_configs["INVENTORY_PREFLIGHT"]
+        )
+        self.inventory_scan_threads = self._system_configs["INVENTORY_SCAN_THREADS"]
+        # Processes re-hashing files for verify_local_files(rehash=True), 0 = all cores
+        self.rehash_workers = self._system_configs["REHASH_WORKERS"] or None
+        # Share (index, count) of the job this machine downloads, None for the whole job
+        self.shard = config_overrides.get("shard")
+        self.shard_by = config_overrides.get("shard_by", self._system_configs["SHARD_BY"])
+        if self.shard_by not in SHARD_BY_CHOICES:
+            raise ValueError(
+                f"Unknown shard granularity: {self.shard_by} "
+                f"(expected one of {', '.join(SHARD_BY_CHOICES)})"
+            )
 
         # Set catalog and log files to be in the download directory
         catalog_filename = self._system_configs["CATALOG_FILE"]
+        self.catalog_diff_file = os.path.join(
+            self.download_base_path, self._system_configs["CATALOG_DIFF_FILE"]
+        )
         finished_log_filename = self._system_configs["FINISHED_LOG_FILE"]
+        self.file_list_cache_file = os.path.join(
+            self.download_base_path, self._system_configs["FILE_LIST_CACHE_FILE"]
+        )
+        self.url_cache_file = os.path.join(
+            self.download_base_path, self._system_configs["SIGNED_URL_CACHE_FILE"]
+        )
         self.catalog_file = os.path.join(self.download_base_path, catalog_filename)
+        self.compact_catalog_file = os.path.join(
+            self.download_base_path, self._system_configs["COMPACT_CATALOG_FILE"]
+        )
+        # Also write the catalog as JSON next to the compact catalog file
+        self.export_catalog_json = config_overrides.get(
+            "export_catalog_json", self._system_configs["EXPORT_CATALOG_JSON"]
+        )
         self.finished_log_file = os.path.join(
             self.download_base_path, finished_log_filename
         )
+        self.state_db_file = os.path.join(
+            self.download_base_path, self._system_configs["STATE_DB_FILE"]
+        )
+        self.verify_report_file = os.path.join(
+            self.download_base_path, self._system_configs["VERIFY_REPORT_FILE"]
+        )
+        self.dead_letter_file = os.path.join(
+            self.download_base_path, self._system_configs["DEAD_LETTER_FILE"]
+        )
+        self.shard_report_file = os.path.join(
+            self.download_base_path, self._system_configs["SHARD_REPORT_FILE"]
+        )
+        self.manifest_file = os.path.join(
+            self.download_base_path, self._system_configs["MANIFEST_FILE"]
+        )
+        if self.shard is not None:
+            # Every shard writes its own files, so shards can share one download directory
+            self.catalog_file = shard_file_path(self.catalog_file, self.shard)
+            self.compact_catalog_file = shard_file_path(self.compact_catalog_file, self.shard)
+            self.catalog_diff_file = shard_file_path(self.catalog_diff_file, self.shard)
+            self.finished_log_file = shard_file_path(self.finished_log_file, self.shard)
+            self.state_db_file = shard_file_path(self.state_db_file, self.shard)
+            self.verify_report_file = shard_file_path(self.verify_report_file, self.shard)
+            self.manifest_file = shard_file_path(self.manifest_file, self.shard)
+            self.dead_letter_file = shard_file_path(self.dead_letter_file, self.shard)
+            self.file_list_cache_file = shard_file_path(self.file_list_cache_file, self.shard)
+            self.url_cache_file = shard_file_path(self.url_cache_file, self.shard)
 
         # Ensure download directory exists before initializing components
         os.makedirs(self.download_base_path, exist_ok=True)
 
+        self.batch_engine = batch_engine
+        # Shared by the members of a batch run, created by the engine processor when needed
+        self._enumeration_pool: Optional[ThreadPoolExecutor] = None
+        # A batch member uses the session and rate limits configured by the engine processor
+        if batch_engine is None:
+            # Size the shared keep-alive connection pool for the worker threads,
+            # each of which may run several segment transfers for large files
+            http_client.configure(
+                self.max_threads * max(1, self.max_segments)
+                + self.resolver_threads
+                + self.file_list_api_concurrency
+            )
+            http_client.set_timeouts(self.connect_timeout, self.read_timeout)
+            # Shared token buckets replace the periodic pauses between downloads
+            rate_limit.configure(
+                download_api_rate=self.download_api_rate,
+                file_list_api_rate=self.file_list_api_rate,
+                max_bytes_per_second=self.max_download_rate_mb * 1024 * 1024,
+            )
+
         # Initialize components
         self.catalog_manager = CatalogManager(
-            self.catalog_file, resource_id=self.resource_id
+            self.catalog_file,
+            resource_id=self.resource_id,
+            diff_file_path=self.catalog_diff_file,
+            compact_file_path=self.compact_catalog_file,
+            export_json=self.export_catalog_json,
+            sync=self.sync,
+        )
+        self.file_list_cache = None
+        if self.file_list_cache_ttl_hours >= 0:
+            self.file_list_cache = FileListCache(
+                self.file_list_cache_file,
+                resource_id=self.resource_id,
+                ttl_seconds=self.file_list_cache_ttl_hours * 3600,
+                refresh=self.refresh_listing,
+            )
+        self.file_manager = FileManager(
+            max_concurrent_requests=self.file_list_api_concurrency,
+            cache=self.file_list_cache,
+            request_slots=(
+                batch_engine.file_manager.request_slots if batch_engine is not None else None
+            ),
+        )
+        self.url_cache = SignedUrlCache(
+            max_entries=self._system_configs["SIGNED_URL_CACHE_SIZE"],
+            cache_file=self.url_cache_file if self.persist_url_cache else None,
+        )
+        self.downloader = Downloader(
+            resource_id=self.resource_id,
+            max_segments=self.max_segments,
+            segment_threshold_mb=self.segment_threshold_mb,
+            url_cache=self.url_cache,
+            min_transfer_rate_kb=self.min_transfer_rate_kb,
+            stall_window=self.stall_window,
         )
-        self.file_manager = FileManager()
-        self.downloader = Downloader(resource_id=self.resource_id)
-        self.log_lock = threading.Lock()
-        self.logger = Logger(log_file=self.finished_log_file, lock=self.log_lock)
+        if self.hedged_requests:
+            # Every resolver and transfer may have a primary and a hedged attempt running
+            self.downloader.enable_hedging(
+                self.hedge_percentile,
+                self.hedge_budget,
+                max_workers=2
+                * (self.max_threads * max(1, self.max_segments) + self.resolver_threads),
+            )
+        self.state_store = DownloadStateStore(self.state_db_file)
+        # Objects completed in earlier runs, loaded when processing starts
+        self.completed_objects = set()
+        self.skipped_completed_count = 0
+        # Number of catalog paths selected for processing, None if not known up front
+        self.selected_path_count: Optional[int] = None
+        # Whether the producer enumerated every selected path, and how many file lists failed
+        self.enumeration_complete = False
+        self.file_list_failures = 0
+        # Index of the files in the download directory, built by the preflight scan
+        self.inventory = None
+        self.skipped_present_count = 0
         self.download_queue = queue.Queue(maxsize=self.max_threads * 2)
+        # Resolved tasks waiting for a transfer thread
+        self.resolved_queue = queue.Queue(maxsize=self.max_threads * 2)
+        self.concurrency = None
+        if self.adaptive_concurrency:
+            self.concurrency = AdaptiveConcurrencyController(
+                self.min_threads,
+                self.max_threads,
+                adjust_interval=self._system_configs["CONCURRENCY_ADJUST_INTERVAL"],
+            )
+        self.dead_letter = DeadLetterLog(self.dead_letter_file)
+        # Processors of the other resources of a batch run, keyed by resource ID.
+        # Their tasks are downloaded by this processor's engine but recorded in their own state.
+        self.batch_members: Dict[int, "DownloadProcessor"] = {}
+        # Created by the download engine, hands failed tasks back to its first queue
+        self.retry_scheduler = None
+        # Tasks produced but not yet completed or dead-lettered, including pending retries
+        self._outstanding_tasks = 0
+        self._outstanding_condition = threading.Condition()
         self.downloaded_files_count = 0
+        self.failed_files_count = 0
+        self.retries_scheduled = 0
+        self.urls_re_resolved = 0
         self.lock_download_count = threading.Lock()
 
         # Print configuration being used
         print(f"Configuration being used:")
         print(f"  - Resource ID: {self.resource_id}")
-        print(f"  - Max Threads: {self.max_threads}")
+        print(f"  - Engine: {self.engine}")
+        if self.sync:
+            print("  - Mode: sync (only catalog paths added since the last snapshot)")
+        if self.concurrency is not None:
+            print(
+                f"  - Max Threads: {self.max_threads} (adaptive, {self.concurrency.min_limit}-"
+                f"{self.concurrency.max_limit}, starting at {self.concurrency.limit})"
+            )
+        else:
+            print(f"  - Max Threads: {self.max_threads}")
+        print(
+            f"  - Retries: up to {self.max_retries} per file, backoff "
+            f"{self.retry_base_delay}-{self.retry_max_delay}s"
+        )
+        stall_check = (
+            f"abort below {self.min_transfer_rate_kb} KB/s over {self.stall_window}s"
+            if self.min_transfer_rate_kb > 0
+            else "no stall check"
+        )
+        print(
+            f"  - Timeouts: connect {self.connect_timeout}s, read {self.read_timeout}s, "
+            f"{stall_check}"
+        )
+        if self.hedged_requests:
+            print(
+                f"  - Hedged Requests: after p{self.hedge_percentile:g} of recent latencies, "
+                f"budget {self.hedge_budget * 100:g}% of requests"
+            )
+        if self.scheduling_policy != "fifo":
+            print(
+                f"  - Scheduling: {self.scheduling_policy} "
+                f"(lookahead {self.scheduling_window} tasks)"
+            )
+        if self.engine == "async":
+            print("  - URL Resolver Threads: not used (async workers resolve their own URLs)")
+        else:
+            print(f"  - URL Resolver Threads: {self.resolver_threads}")
+        print(
+            f"  - Enumeration Threads: {self.enumeration_threads} "
+            f"(file-list API concurrency {self.file_list_api_concurrency})"
+        )
+        if self.file_list_cache is not None:
+            print(
+                f"  - File List Cache: {self.file_list_cache_file} "
+                f"(TTL {self.file_list_cache_ttl_hours} h{', refreshing' if self.refresh_listing else ''})"
+            )
+        else:
+            print("  - File List Cache: disabled")
+        print(
+            f"  - Signed URL Cache File: {self.url_cache_file if self.persist_url_cache else '(not persisted)'}"
+        )
+        print(
+            f"  - Rate Limits: download API {self.download_api_rate or 'unlimited'} req/s, "
+            f"file-list API {self.file_list_api_rate or 'unlimited'} req/s, "
+            f"bandwidth {self.max_download_rate_mb or 'unlimited'} MB/s"
+        )
+        if self.engine == "async":
+            print("  - Segments: not used by the async engine (one stream per file)")
+        else:
+            print(
+                f"  - Segments: {self.max_segments} per file >= {self.segment_threshold_mb} MB"
+            )
         print(
             f"  - Target Sub Path: '{self.target_sub_path}' (empty means process all)"
         )
+        if self.include_paths:
+            print(f"  - Include Paths: {', '.join(self.include_paths)}")
+        if self.exclude_paths:
+            print(f"  - Exclude Paths: {', '.join(self.exclude_paths)}")
+        if self.shard is not None:
+            print(f"  - Shard: {self.shard[0]}/{self.shard[1]} (by {self.shard_by})")
         print(f"  - Download Path: {self.download_base_path}")
-        print(f"  - Catalog File: {self.catalog_file}")
-        print(f"  - Log File: {self.finished_log_file}")
+        print(
+            f"  - Catalog File: {self.compact_catalog_file}"
+            f"{f' (JSON export: {self.catalog_file})' if self.export_catalog_json else ''}"
+        )
+        print(f"  - State Database: {self.state_db_file}")
+        print(f"  - Log File: {self.finished_log_file} (exported from the state database)")
+
+    def _owner(self, task: DownloadTask) -> "DownloadProcessor":
+        """Get the processor holding the state of the task's resource."""
+        return self.batch_members.get(task.resource_id, self)
+
+    def _batch_processors(self) -> List["DownloadProcessor"]:
+        """Get this processor followed by the other processors of a batch run."""
+        return [self, *self.batch_members.values()]
+
+    def _store_completed(self, task: DownloadTask, attempted: bool = True) -> None:
+        """Record a completed object in the state database of its resource."""
+        local_file_path = os.path.join(task.local_path, task.filename)
+        try:
+            bytes_written = os.path.getsize(local_file_path)
+        except OSError:
+            bytes_written = 0
+        # Checksums computed while the file was transferred
+        digest, server_checksum = (
+            self.downloader.pop_result(local_file_path) if attempted else (None, None)
+        )
+        self._owner(task).state_store.record_completed(
+            task.fullpath,
+            parse_expected_size(task.size),
+            bytes_written,
+            checksum=digest,
+            attempted=attempted,
+            server_checksum=server_checksum,
+        )
+
+    def _store_failed(self, task: DownloadTask, error: str) -> None:
+        """Record a failed attempt in the state database of its resource, with the bytes kept."""
+        part_path = get_part_path(os.path.join(task.local_path, task.filename))
+        try:
+            bytes_written = os.path.getsize(part_path)
+        except OSError:
+            bytes_written = 0
+        self._owner(task).state_store.record_failed(
+            task.fullpath, parse_expected_size(task.size), bytes_written, error
+        )
+
+    def _record_success(self, task: DownloadTask, attempted: bool = True) -> None:
+        """Record a finished download."""
+        self._store_completed(task, attempted)
+
+        with self.lock_download_count:
+            self.downloaded_files_count += 1
+        self._task_finished()
+
+        # the following api is abandoned for now
+        # if not self.downloader.record_download_info(task.fullpath, task.filename, task.size):
+        #     print(
+        #         f"Thread {threading.get_ident()}: Failed to record download information for: {task.filename}"
+        #     )
+
+    def _record_failure(
+        self, task: DownloadTask, error: str, status_code: Optional[int] = None
+    ) -> None:
+        """
+        Record a failed attempt and schedule a retry, or dead-letter the task.
+
+        Retryable failures are handed to the retry scheduler with exponential
+        backoff, so the worker returns to its queue at once. Permanent failures
+        and tasks that exhausted max_retries are written to the dead-letter file.
+
+        Args:
+            task: The failed task
+            error: Description of the failure
+            status_code: HTTP status of the response that caused it, if any
+        """
+        current_thread_id = threading.get_ident()
+        task.attempts += 1
+        self._store_failed(task, error)
+
+        if is_retryable(status_code) and task.attempts <= self.max_retries:
+            delay = compute_backoff(
+                task.attempts, self.retry_base_delay, self.retry_max_delay
+            )
+            print(
+                f"Thread {current_thread_id}: Failed to download {task.filename} ({error}), "
+                f"retrying in {delay:.1f}s (attempt {task.attempts}/{self.max_retries})"
+            )
+            with self.lock_download_count:
+                self.retries_scheduled += 1
+            self.retry_scheduler.schedule(task, delay)
+            return
+
+        reason = "permanent failure" if not is_retryable(status_code) else "retries exhausted"
+        print(
+            f"Thread {current_thread_id}: Failed to download: {task.filename} "
+            f"({error}, {reason} after {task.attempts} attempt(s))"
+        )
+        self._owner(task).dead_letter.append(task, error)
+        with self.lock_download_count:
+            self.failed_files_count += 1
+        self._task_finished()
+
+    def _record_unexpected_error(self, task: DownloadTask, ex: Exception) -> None:
+        """
+        Record a task whose processing raised an unexpected exception.
+
+        The task is retried or dead-lettered like any failure without a response.
+        If even that fails, the task is still counted as finished, so the run
+        does not wait for it forever.
+        """
+        print(
+            f"Thread {threading.get_ident()}: Unexpected error processing {task.filename}: "
+            f"{type(ex).__name__}: {ex}"
+        )
+        try:
+            self._record_failure(task, f"unexpected error: {type(ex).__name__}: {ex}")
+        except Exception as record_ex:
+            print(
+                f"Thread {threading.get_ident()}: Failed to record the failure of "
+                f"{task.filename}: {record_ex}"
+            )
+            with self.lock_download_count:
+                self.failed_files_count += 1
+            self._task_finished()
+
+    def _task_started(self) -> None:
+        """Count a task handed to the engine by the producer."""
+        with self._outstanding_condition:
+            self._outstanding_tasks += 1
 
-    def _download_worker(self):
-        """Worker function for download threads."""
+    def _task_finished(self) -> None:
+        """Count a task that completed or was dead-lettered."""
+        with self._outstanding_condition:
+            self._outstanding_tasks -= 1
+            if self._outstanding_tasks <= 0:
+                self._outstanding_condition.notify_all()
 
-        continuous_failure_count = 0
-        max_continuous_failures = 5  # Threshold to trigger re-login
+    def _wait_for_outstanding_tasks(self) -> None:
+        """Block until every produced task completed or was dead-lettered, including retries."""
+        with self._outstanding_condition:
+            while self._outstanding_tasks > 0:
+                self._outstanding_condition.wait()
 
+    def _record_transfer(
+        self, task: DownloadTask, started: float, ok: bool, throttled: bool
+    ) -> None:
+        """Report a finished transfer to the adaptive concurrency controller, if enabled."""
+        if self.concurrency is None:
+            return
+        self.concurrency.record(
+            time.monotonic() - started,
+            parse_expected_size(task.size) or 0,
+            ok,
+            throttled,
+        )
+
+    def _resolve_signed_url(self, task: DownloadTask) -> bool:
+        """
+        Resolve the signed URL of a task and record its expiry.
+        If the API rejects the token, waits for a single shared token refresh and retries once.
+        """
+        for _ in range(2):
+            try:
+                task.signed_url, task.url_expires_at = (
+                    self.downloader.resolve_signed_url_with_expiry(
+                        task.fullpath,
+                        min_ttl=self.signed_url_min_ttl,
+                        resource_id=task.resource_id,
+                    )
+                )
+                return task.signed_url is not None
+            except auth.AuthenticationError as ex:
+                print(
+                    f"Thread {threading.get_ident()}: Token rejected ({ex}), waiting for token refresh..."
+                )
+                if not auth.refresh_token(ex.token):
+                    return False
+        return False
+
+    def _resolve_worker(self):
+        """
+        Worker function for URL resolution threads.
+        Requests signed URLs ahead of the transfer threads and hands resolved tasks
+        to them through resolved_queue.
+        """
         while True:
             task = self.download_queue.get()
 
@@ -113,158 +631,292 @@ class DownloadProcessor:
                 self.download_queue.task_done()
                 break
 
-            fullpath, filename, local_path, size = task
-
-            current_thread_id = threading.get_ident()
-            print(f"Thread {current_thread_id}: Starting download for {filename}")
-            if self.downloader.download_file(fullpath, filename, local_path):
-                self.logger.log_to_fullpath(fullpath)
-
-                with self.lock_download_count:
-                    self.downloaded_files_count += 1
-                    current_total_downloaded_by_all_threads = (
-                        self.downloaded_files_count
+            try:
+                if not task.local_checked and self.downloader.is_downloaded(
+                    task.filename, task.local_path, task.size
+                ):
+                    print(
+                        f"File already exists and is complete: {os.path.join(task.local_path, task.filename)}"
                     )
+                    self._record_success(task, attempted=False)
+                elif self._resolve_signed_url(task):
+                    # Blocks while the transfer threads already have enough URLs waiting
+                    self.resolved_queue.put(task)
+                else:
+                    self._record_failure(task, "signed URL request failed")
+            except Exception as ex:
+                self._record_unexpected_error(task, ex)
+            finally:
+                self.download_queue.task_done()
 
-                # the following api is abandoned for now
-                # if not self.downloader.record_download_info(fullpath, filename, size):
-                #     print(
-                #         f"Thread {current_thread_id}: Failed to record download information for: {filename}"
-                #     )
+    def _download_worker(self, worker_id: int):
+        """
+        Worker function for download threads, transferring tasks with resolved URLs.
 
-                if (
-                    current_total_downloaded_by_all_threads % self.sleep_after_files
-                    == 0
-                    and current_total_downloaded_by_all_threads > 0
-                ):
+        Args:
+            worker_id: Worker number from 1, compared with the adaptive concurrency limit
+        """
+
+        while True:
+            if self.concurrency is not None:
+                self.concurrency.wait_for_slot(worker_id)
+            task = self.resolved_queue.get()
+
+            if task is None:
+                self.resolved_queue.task_done()
+                break
+
+            current_thread_id = threading.get_ident()
+            try:
+                if task.url_expires_within(self.signed_url_min_ttl):
                     print(
-                        f"Thread {current_thread_id}: Pausing for {self.sleep_interval} second(s) after {current_total_downloaded_by_all_threads} total downloads by the process..."
+                        f"Thread {current_thread_id}: Signed URL for {task.filename} is close to expiry, re-resolving"
                     )
-                    time.sleep(self.sleep_interval)
+                    with self.lock_download_count:
+                        self.urls_re_resolved += 1
+                    if not self._resolve_signed_url(task):
+                        self._record_failure(task, "signed URL request failed")
+                        continue
 
-                continuous_failure_count = 0  # Reset on success
-                self.download_queue.task_done()
-            else:
-                continuous_failure_count += 1
-                if continuous_failure_count >= max_continuous_failures:
-                    self.download_queue.task_done()
-                print(f"Thread {current_thread_id}: Failed to download: {filename}")
-                print(
-                    f"Thread {current_thread_id}: Re-logining and retrieving new token..."
+                print(f"Thread {current_thread_id}: Starting download for {task.filename}")
+                started = time.monotonic()
+                downloaded = self.downloader.transfer_file(
+                    task.signed_url, task.filename, task.local_path, task.size
                 )
+                status_code, error = (
+                    (None, None)
+                    if downloaded
+                    else self.downloader.pop_failure(
+                        os.path.join(task.local_path, task.filename)
+                    )
+                )
+                # Only this transfer's own response counts as throttling
+                self._record_transfer(
+                    task, started, downloaded, status_code in THROTTLE_STATUS_CODES
+                )
+                if downloaded:
+                    self._record_success(task)
+                else:
+                    self._record_failure(task, error, status_code)
+            except Exception as ex:
+                self._record_unexpected_error(task, ex)
+            finally:
+                self.resolved_queue.task_done()
 
-                from iearth_downloader.utils import auth
-
-                auth.login()
-
-    def process_catalog_and_download(self) -> None:
-        """
-        Main function to process catalog paths and download files to local directories using multiple threads.
-        The main thread acts as a producer, adding download tasks to a queue.
-        Worker threads consume tasks from the queue.
-        Filters paths based on target_sub_path if provided.
+    def _iter_file_lists(self, paths_to_process, table: str):
         """
-        catalog_data = self.catalog_manager.load_catalog_data()
-        if not catalog_data:
-            print("Failed to load catalog data.")
-            return
+        Fetch file lists for catalog paths concurrently, yielding them in catalog order.
 
-        all_catalog_paths = self.catalog_manager.get_paths()
-        table = self.catalog_manager.get_table()
-        data_type = self.catalog_manager.get_data_type()
+        Up to two lists per enumeration thread are fetched ahead of the consumer,
+        so memory stays bounded while the workers are kept busy.
 
-        if not all_catalog_paths:
-            print("No paths found in catalog data.")
+        Yields:
+            Tuples of (path, file_list); file_list is None if it could not be fetched
+        """
+        if self.batch_engine is not None or self.batch_members:
+            # The resources of a batch run are enumerated together by one pool
+            engine = self.batch_engine or self
+            yield from self._fetch_file_lists(
+                engine.get_enumeration_pool(), paths_to_process, table
+            )
             return
+        with ThreadPoolExecutor(max_workers=self.enumeration_threads) as pool:
+            yield from self._fetch_file_lists(pool, paths_to_process, table)
 
-        # Filter paths based on target_sub_path (either from config or override)
-        paths_to_process = []
-        if self.target_sub_path and self.target_sub_path.strip():
-            normalized_target_sub_path = self.target_sub_path.strip().replace(
-                "\\", "/"
-            )  # Normalize slashes
-            print(
-                f"Filtering catalog paths by TARGET_SUB_PATH: '{normalized_target_sub_path}'"
-            )
-            for p in all_catalog_paths:
-                normalized_catalog_path = p.replace(
-                    "\\", "/"
-                )  # Normalize slashes for comparison
-                if normalized_catalog_path.startswith(normalized_target_sub_path):
-                    paths_to_process.append(p)
-            if not paths_to_process:
-                print(
-                    f"No paths in the catalog match the TARGET_SUB_PATH: '{normalized_target_sub_path}'. No files will be downloaded."
+    def _fetch_file_lists(self, pool: ThreadPoolExecutor, paths_to_process, table: str):
+        """Fetch file lists on the given pool, a window ahead of the consumer, yielding them in order."""
+        window = self.enumeration_threads * 2
+        paths = iter(paths_to_process)
+        pending = deque(
+            (path, pool.submit(self.file_manager.fetch_file_list, table, path))
+            for path in itertools.islice(paths, window)
+        )
+        while pending:
+            path, future = pending.popleft()
+            for next_path in itertools.islice(paths, 1):
+                pending.append(
+                    (
+                        next_path,
+                        pool.submit(self.file_manager.fetch_file_list, table, next_path),
+                    )
                 )
-                # Optionally, print completion message here or let it flow to the end
-                # For now, let it flow, so it prints the standard completion message with 0 files.
-        else:
-            print("TARGET_SUB_PATH is not set. Processing all paths from the catalog.")
-            paths_to_process = all_catalog_paths
+            yield path, future.result()
 
-        if not paths_to_process:
-            print("No paths to process after filtering (or catalog was empty).")
-            # Print a more specific completion message if needed, or let it flow
-            # For consistency, we let it flow to the standard completion reporting.
-            # The tasks_added_to_queue will be 0, and the final report will reflect that.
+    def get_enumeration_pool(self) -> ThreadPoolExecutor:
+        """Get the enumeration pool shared by the resources of a batch run, creating it on first use."""
+        if self._enumeration_pool is None:
+            self._enumeration_pool = ThreadPoolExecutor(max_workers=self.enumeration_threads)
+        return self._enumeration_pool
 
-        print(
-            f"Processing {len(paths_to_process)} paths using up to {self.max_threads} threads..."
-        )
-        print(f"Table: {table}")
-        print(f"Type: {data_type}")
+    def shutdown_enumeration_pool(self) -> None:
+        """Stop the shared enumeration pool once the batch run no longer enumerates."""
+        if self._enumeration_pool is not None:
+            self._enumeration_pool.shutdown()
+            self._enumeration_pool = None
 
-        print(f"Base download directory: {self.download_base_path}")
-
-        self.logger.initialize_fullpath_log()
+    def _iter_download_tasks(self, paths_to_process, table: str, data_type: str):
+        """
+        Producer: enumerate the files under each catalog path and yield download tasks.
+        File lists are fetched by a pool of enumeration threads but consumed in catalog order.
+        Objects the state database records as completed are skipped without touching the filesystem,
+        and files the local inventory shows as complete are recorded as completed instead of queued.
 
-        threads = []
-        for _ in range(self.max_threads):
-            thread = threading.Thread(target=self._download_worker)
-            thread.daemon = (
-                True  # Allows main program to exit even if threads are still running
-            )
-            thread.start()
-            threads.append(thread)
+        Args:
+            paths_to_process: Catalog paths to enumerate, a list or an iterator
+            table: Catalog table name
+            data_type: Catalog data type, used to build the object key
 
+        Yields:
+            DownloadTask for each listed file
+        """
         tasks_added_to_queue = 0
-        for i, path in enumerate(paths_to_process, 1):
-            print(f"Producer: Processing path {i}/{len(paths_to_process)}: {path}")
+        self.enumeration_complete = False
+        self.file_list_failures = 0
+        file_lists = self._iter_file_lists(paths_to_process, table)
+        total = "" if self.selected_path_count is None else f"/{self.selected_path_count}"
+        for i, (path, file_list) in enumerate(file_lists, 1):
+            print(f"Producer: Processing path {i}{total}: {path}")
             local_path = os.path.join(self.download_base_path, path)
-            file_list = self.file_manager.fetch_file_list(table, path)
+            if file_list is None:
+                print(f"Producer: Could not fetch the file list of path: {path}")
+                self.file_list_failures += 1
+                continue
             if not file_list:
                 print(f"Producer: No files found in path: {path}")
                 continue
 
+            queued_from_path = 0
+            skipped_from_path = 0
+            present_in_path = 0
             for file_info in file_list:
                 filename = file_info.get("file", "")
                 size = file_info.get("size", 0)
                 fullpath = f"shared-dataset/{data_type}/{path}/{filename}"
                 if fullpath and filename:
-                    # The put() call will block if the queue is full (if maxsize was set and reached)
-                    self.download_queue.put((fullpath, filename, local_path, size))
-                    tasks_added_to_queue += 1
+                    if not self._in_file_shard(fullpath):
+                        continue
+                    if fullpath in self.completed_objects:
+                        skipped_from_path += 1
+                        continue
+                    task = DownloadTask(
+                        fullpath, filename, local_path, size, resource_id=self.resource_id
+                    )
+                    if self.inventory is not None:
+                        local_file_path = os.path.join(local_path, filename)
+                        expected_size = parse_expected_size(size)
+                        if self.inventory.compare(local_file_path, expected_size) == INVENTORY_OK:
+                            self.state_store.record_completed(
+                                fullpath,
+                                expected_size,
+                                self.inventory.size_of(local_file_path),
+                                attempted=False,
+                            )
+                            present_in_path += 1
+                            continue
+                        task.local_checked = True
+                    yield task
+                    queued_from_path += 1
+            tasks_added_to_queue += queued_from_path
+            self.skipped_completed_count += skipped_from_path
+            self.skipped_present_count += present_in_path
             print(
-                f"Producer: Queued {len(file_list)} files from path: {path}. Total tasks queued so far: {tasks_added_to_queue}"
+                f"Producer: Queued {queued_from_path} files from path: {path} "
+                f"({skipped_from_path} already completed, {present_in_path} already on disk). "
+                f"Total tasks queued so far: {tasks_added_to_queue}"
             )
+        self.enumeration_complete = True
+
+    def _complete_sync(self) -> None:
+        """
+        Advance the sync base to the fetched catalog once a sync run has enumerated
+        every added path. Otherwise the next sync run diffs against the same base and
+        enumerates the added paths again. Files that failed are in the dead-letter file.
+        """
+        if not self.sync or self.catalog_manager.catalog_diff is None:
+            return
+        if not self.enumeration_complete or self.file_list_failures:
+            print(
+                f"Sync: run incomplete ({self.file_list_failures} file lists could not be "
+                "fetched), the added paths will be enumerated again by the next sync run"
+            )
+            return
+        self.catalog_manager.complete_sync()
+
+    def _run_download_engine(self, tasks) -> int:
+        """
+        Run the thread-based download engine as a two-stage pipeline.
+        The main thread acts as a producer, adding download tasks to download_queue.
+        Resolver threads request signed URLs and pass the tasks to resolved_queue,
+        from which the transfer threads download the files. Failed tasks are put
+        back into download_queue by the retry scheduler.
+
+        Args:
+            tasks: Iterable of DownloadTask to download
+
+        Returns:
+            int: Number of tasks added to the queue
+        """
+        self.retry_scheduler = RetryScheduler(self.download_queue.put)
+
+        resolver_threads = []
+        for _ in range(self.resolver_threads):
+            thread = threading.Thread(target=self._resolve_worker)
+            thread.daemon = True
+            thread.start()
+            resolver_threads.append(thread)
+
+        threads = []
+        for worker_id in range(1, self.max_threads + 1):
+            thread = threading.Thread(target=self._download_worker, args=(worker_id,))
+            thread.daemon = (
+                True  # Allows main program to exit even if threads are still running
+            )
+            thread.start()
+            threads.append(thread)
+
+        tasks_added_to_queue = 0
+        for task in tasks:
+            self._task_started()
+            # The put() call will block if the queue is full (if maxsize was set and reached)
+            self.download_queue.put(task)
+            tasks_added_to_queue += 1
 
         print(
             f"Producer: All {tasks_added_to_queue} download tasks have been added to the queue."
         )
 
+        # Retries may still be waiting in the scheduler after the last task was produced
+        print("Producer: Waiting for all tasks to complete or exhaust their retries...")
+        self._wait_for_outstanding_tasks()
+        self.retry_scheduler.stop()
+
+        # Stop the resolver stage first so every resolved task reaches the transfer stage
+        print(
+            f"Producer: Sending {self.resolver_threads} sentinel values to stop resolver threads..."
+        )
+        for _ in range(self.resolver_threads):
+            self.download_queue.put(None)
+        for thread in resolver_threads:
+            thread.join()
+        print("Producer: All resolver threads have terminated.")
+
+        # Wake workers paused by the concurrency limit so each takes a sentinel
+        if self.concurrency is not None:
+            self.concurrency.stop()
+
         # Signal worker threads to stop by sending sentinel values
         print(
             f"Producer: Sending {self.max_threads} sentinel values to stop worker threads..."
         )
         for _ in range(self.max_threads):
-            self.download_queue.put(None)
+            self.resolved_queue.put(None)
 
         # Wait for all tasks in the queue to be processed by worker threads
         # This includes the sentinel None values, as workers call task_done() for them too.
         print(
             "Producer: Waiting for all tasks in queue to be processed (including sentinels)..."
         )
-        self.download_queue.join()
+        self.resolved_queue.join()
         print("Producer: All tasks in queue have been processed.")
 
         # Wait for all worker threads to finish their execution
@@ -272,6 +924,194 @@ class DownloadProcessor:
         for thread in threads:
             thread.join()
         print("Producer: All worker threads have terminated.")
+        print(f"Signed URLs re-resolved near expiry: {self.urls_re_resolved}")
+
+        return tasks_added_to_queue
+
+    def _select_sync_paths(self, table: str):
+        """
+        Select the catalog paths a sync run enumerates: those added since the previous snapshot.
+        Cached file lists of removed paths are dropped.
+
+        Returns:
+            List of added paths, or None if there was no previous snapshot and every
+            path is selected
+        """
+        if self.catalog_manager.all_paths_added():
+            print("Sync: no previous catalog snapshot, enumerating every path.")
+            return None
+        added_paths = self.catalog_manager.get_added_paths()
+        if added_paths is None:
+            print("Sync: no catalog diff available (catalog was not fetched in this run).")
+            return []
+
+        removed_paths = self.catalog_manager.get_removed_paths()
+        if self.file_list_cache is not None:
+            for path in removed_paths:
+                self.file_list_cache.invalidate(table, path)
+        print(
+            f"Sync: {len(added_paths)} added paths to enumerate, "
+            f"{len(removed_paths)} removed paths reported in {self.catalog_diff_file}"
+        )
+        return added_paths
+
+    def _select_paths_to_process(self):
+        """
+        Load the catalog and select the paths to process.
+        Applies sync mode and filters paths with the catalog's path index: a path is
+        kept if it starts with target_sub_path or matches an include selector, and
+        does not match an exclude selector.
+
+        Without a selection the paths are streamed from the catalog, so enumeration
+        starts before the whole catalog has been read; selected_path_count is then
+        the catalog size, or None if path sharding leaves the count unknown.
+
+        Returns:
+            Tuple of (paths_to_process, table, data_type), or None if the catalog is unusable;
+            paths_to_process is a list or an iterator of catalog paths
+        """
+        self.selected_path_count = None
+        catalog_data = self.catalog_manager.load_catalog_data()
+        if not catalog_data:
+            print("Failed to load catalog data.")
+            return None
+
+        table = self.catalog_manager.get_table()
+        data_type = self.catalog_manager.get_data_type()
+
+        if not self.catalog_manager.get_path_count():
+            print("No paths found in catalog data.")
+            return None
+
+        # Without sync mode, the paths are only read from the catalog once it is
+        # known which subtrees are selected
+        all_catalog_paths = self._select_sync_paths(table) if self.sync else None
+        # Whether the selection is limited to the paths added since the last sync
+        sync_selection = all_catalog_paths is not None
+
+        # Filter paths based on target_sub_path (either from config or override)
+        # and the include/exclude selectors
+        include = list(self.include_paths)
+        if self.target_sub_path and self.target_sub_path.strip():
+            include.insert(0, self.target_sub_path.strip())
+            print(f"Filtering catalog paths by TARGET_SUB_PATH: '{include[0]}'")
+        if include or self.exclude_paths:
+            index = (
+                PathIndex(all_catalog_paths)
+                if sync_selection
+                else self.catalog_manager.get_index()
+            )
+            paths_to_process = index.select(include, self.exclude_paths)
+            print(
+                f"Path selection (include: {', '.join(include) or 'all'}; "
+                f"exclude: {', '.join(self.exclude_paths) or 'none'}): "
+                f"{len(paths_to_process)} of {len(index)} paths"
+            )
+            if not paths_to_process:
+                print("No paths in the catalog match the selection. No files will be downloaded.")
+                # Let it flow, so it prints the standard completion message with 0 files.
+        else:
+            print("TARGET_SUB_PATH is not set. Processing all paths from the catalog.")
+            if sync_selection:
+                paths_to_process = all_catalog_paths
+            else:
+                # Stream the paths, enumeration starts with the first ones read
+                paths_to_process = self.catalog_manager.iter_paths()
+                self.selected_path_count = self.catalog_manager.get_path_count()
+        if isinstance(paths_to_process, list):
+            self.selected_path_count = len(paths_to_process)
+
+        if self.selected_path_count == 0:
+            print("No paths to process after filtering (or catalog was empty).")
+            # Print a more specific completion message if needed, or let it flow
+            # For consistency, we let it flow to the standard completion reporting.
+            # The tasks_added_to_queue will be 0, and the final report will reflect that.
+
+        if self.shard is not None and self.shard_by == SHARD_BY_PATH:
+            if isinstance(paths_to_process, list):
+                paths_to_process = [p for p in paths_to_process if in_shard(p, self.shard)]
+                self.selected_path_count = len(paths_to_process)
+                print(
+                    f"Shard {self.shard[0]}/{self.shard[1]}: {len(paths_to_process)} catalog paths "
+                    "assigned to this machine"
+                )
+            else:
+                shard = self.shard
+                paths_to_process = (p for p in paths_to_process if in_shard(p, shard))
+                self.selected_path_count = None
+                print(
+                    f"Shard {self.shard[0]}/{self.shard[1]}: catalog paths are assigned to this "
+                    "machine as they are read"
+                )
+
+        return paths_to_process, table, data_type
+
+    def _in_file_shard(self, fullpath: str) -> bool:
+        """Check whether an object belongs to this machine when sharding by file."""
+        return self.shard_by != SHARD_BY_FILE or in_shard(fullpath, self.shard)
+
+    def process_catalog_and_download(self) -> None:
+        """
+        Main function to process catalog paths and download files to local directories
+        using the configured download engine.
+        """
+        tasks = self.prepare_download_tasks()
+        if tasks is None:
+            return
+        self._download_and_report(tasks)
+
+    def prepare_download_tasks(self):
+        """
+        Select the catalog paths, load the completed objects and scan the download directory.
+
+        Returns:
+            Generator of DownloadTask enumerating the selected paths, or None if the catalog is unusable
+        """
+        selection = self._select_paths_to_process()
+        if selection is None:
+            return None
+        paths_to_process, table, data_type = selection
+
+        if self.selected_path_count is not None:
+            print(
+                f"Processing {self.selected_path_count} paths using up to {self.max_threads} threads..."
+            )
+        else:
+            print(f"Processing catalog paths using up to {self.max_threads} threads...")
+        print(f"Table: {table}")
+        print(f"Type: {data_type}")
+
+        print(f"Base download directory: {self.download_base_path}")
+
+        self.completed_objects = self.state_store.completed_objects()
+        print(
+            f"State database: {len(self.completed_objects)} objects already completed will be skipped"
+        )
+        if self.inventory_preflight:
+            self._scan_local_inventory()
+        return self._iter_download_tasks(paths_to_process, table, data_type)
+
+    def _download_and_report(self, tasks) -> None:
+        """
+        Run the download engine over the given tasks and print the run summary.
+
+        Args:
+            tasks: Iterable of DownloadTask to download
+        """
+        if self.persist_url_cache:
+            print(
+                f"Loaded {self.url_cache.load()} unexpired signed URLs from {self.url_cache_file}"
+            )
+
+        tasks_added_to_queue = self._run_download_engine(
+            schedule_tasks(tasks, self.scheduling_policy, self.scheduling_window)
+        )
+        self.downloader.close_hedgers()
+        self.url_cache.save()
+        processors = self._batch_processors()
+        for processor in processors:
+            processor.state_store.flush()
+            processor._complete_sync()
 
         print(f"\n=== Processing completed ===")
         print(f"Total files identified and queued for download: {tasks_added_to_queue}")
@@ -283,7 +1123,401 @@ class DownloadProcessor:
             print(f"Download success rate: {success_rate:.1f}%")
         else:
             print("No files were scheduled for download.")
-        print(f"Files downloaded to: {self.download_base_path}")
+        print(f"Retries scheduled: {self.retries_scheduled}")
+        self._print_stall_stats()
+        self._print_hedge_stats()
+        if self.failed_files_count:
+            print(
+                f"Failed after retries: {self.failed_files_count} "
+                f"(re-run with --retry-dead-letter, listed in {self.dead_letter_file})"
+            )
+        print(
+            "Skipped (completed in earlier runs): "
+            f"{sum(processor.skipped_completed_count for processor in processors)}"
+        )
+        if any(processor.inventory is not None for processor in processors):
+            print(
+                "Skipped (already complete on disk): "
+                f"{sum(processor.skipped_present_count for processor in processors)}"
+            )
+        for processor in processors:
+            if self.batch_members:
+                print(f"--- Resource {processor.resource_id} ---")
+            print(f"Files downloaded to: {processor.download_base_path}")
+            exported = processor.state_store.export_finished_log(processor.finished_log_file)
+            print(f"Exported {exported} completed paths to {processor.finished_log_file}")
+            exported = processor.state_store.export_manifest(processor.manifest_file)
+            print(f"Wrote integrity manifest of {exported} files to {processor.manifest_file}")
+            state_counts = processor.state_store.status_counts()
+            print(
+                "Download state: "
+                + ", ".join(
+                    f"{status}={count}" for status, count in sorted(state_counts.items())
+                )
+            )
+        if self.batch_members:
+            print("---")
+        if self.concurrency is not None:
+            print(
+                f"Adaptive concurrency: {self.concurrency.changes} changes, "
+                f"final limit {self.concurrency.limit} active transfers"
+            )
+        self._print_pool_stats()
+        self._print_rate_limit_stats()
+        self._print_url_cache_stats()
+        self._print_file_list_cache_stats()
+        print(f"Token refreshes after authentication failures: {auth.get_refresh_count()}")
+
+    def run_dead_letter(self) -> None:
+        """
+        Download only the tasks recorded in the dead-letter file, without fetching the catalog.
+        Tasks that fail again are written back to the dead-letter file.
+        """
+        tasks = self.take_dead_letter_tasks()
+        if not tasks:
+            return
+        self._download_and_report(tasks)
+        self.dead_letter.complete_rerun()
+
+    def take_dead_letter_tasks(self) -> List[DownloadTask]:
+        """
+        Read the tasks recorded in the dead-letter file.
+        The file keeps them until dead_letter.complete_rerun() is called after the re-run.
+
+        Returns:
+            List of DownloadTask of this processor's resource
+        """
+        entries = self.dead_letter.take_entries()
+        print(f"Re-running {len(entries)} tasks from {self.dead_letter_file}")
+        return [
+            DownloadTask(
+                entry["fullpath"],
+                entry["filename"],
+                entry["local_path"],
+                entry.get("size", 0),
+                resource_id=self.resource_id,
+            )
+            for entry in entries
+        ]
+
+    def _scan_local_inventory(self) -> LocalInventory:
+        """Index the files in the download directory with a single parallel scan."""
+        print(f"Scanning local files in {self.download_base_path}...")
+        start_time = time.time()
+        self.inventory = LocalInventory(self.download_base_path)
+        file_count = self.inventory.scan(self.inventory_scan_threads)
+        print(
+            f"Local inventory: {file_count} files in {len(self.inventory.dirs)} directories "
+            f"scanned in {time.time() - start_time:.1f}s"
+        )
+        return self.inventory
+
+    def verify_local_files(self, rehash: bool = False) -> None:
+        """
+        Compare the listed files with the download directory without downloading anything.
+
+        Missing and size-mismatched files are written to the verify report. The state
+        database is updated so that complete files are marked completed and invalid
+        files are downloaded again by the next run.
+
+        Args:
+            rehash: Also re-hash the complete files that are suspect: those without a
+                recorded sha256, or whose size or modification time changed since they
+                were recorded. Files whose digest no longer matches are reported as
+                checksum mismatches and downloaded again by the next run.
+        """
+        selection = self._select_paths_to_process()
+        if selection is None:
+            return
+        paths_to_process, table, data_type = selection
+
+        inventory = self._scan_local_inventory()
+        completed_objects = self.state_store.completed_objects()
+        # Recorded size, digest and update time of completed objects, to pick files to re-hash
+        recorded = (
+            {
+                row[0]: (row[3], row[6], row[7])
+                for row in self.state_store.iter_objects(STATUS_COMPLETED)
+            }
+            if rehash
+            else {}
+        )
+        suspects = []
+        counts = {"ok": 0, "missing": 0, "size_mismatch": 0}
+        with open(self.verify_report_file, "w", encoding="utf-8") as report:
+            for path, file_list in self._iter_file_lists(paths_to_process, table):
+                if file_list is None:
+                    print(f"Verify: could not fetch the file list of path {path}, not checked")
+                    continue
+                local_path = os.path.join(self.download_base_path, path)
+                for file_info in file_list:
+                    filename = file_info.get("file", "")
+                    if not filename:
+                        continue
+                    fullpath = f"shared-dataset/{data_type}/{path}/{filename}"
+                    if not self._in_file_shard(fullpath):
+                        continue
+                    local_file_path = os.path.join(local_path, filename)
+                    expected_size = parse_expected_size(file_info.get("size", 0))
+                    result = inventory.compare(local_file_path, expected_size)
+                    actual_size = inventory.size_of(local_file_path) or 0
+                    counts[result] += 1
+                    if result == INVENTORY_OK:
+                        if fullpath not in completed_objects:
+                            self.state_store.record_completed(
+                                fullpath, expected_size, actual_size, attempted=False
+                            )
+                        if rehash:
+                            bytes_written, digest, updated_at = recorded.get(
+                                fullpath, (None, None, 0)
+                            )
+                            if (
+                                digest is None
+                                or bytes_written != actual_size
+                                or (inventory.mtime_of(local_file_path) or 0) > updated_at
+                            ):
+                                suspects.append(
+                                    (fullpath, f"{path}/{filename}", local_file_path,
+                                     expected_size, actual_size, digest)
+                                )
+                        continue
+
+                    report.write(
+                        f"{result}\t{path}/{filename}\t{actual_size}\t{expected_size}\n"
+                    )
+                    if fullpath in completed_objects:
+                        error = (
+                            "missing on disk"
+                            if result == INVENTORY_MISSING
+                            else "size mismatch on disk"
+                        )
+                        self.state_store.record_failed(
+                            fullpath, expected_size, actual_size, error, attempted=False
+                        )
+            if suspects:
+                counts["checksum_mismatch"] = self._rehash_files(suspects, report)
+        self.state_store.flush()
+
+        print("\n=== Verification completed ===")
+        print(f"Complete files: {counts['ok']}")
+        print(f"Missing files: {counts['missing']}")
+        print(f"Size-mismatched files: {counts['size_mismatch']}")
+        if rehash:
+            print(f"Re-hashed files: {len(suspects)}")
+            print(f"Checksum-mismatched files: {counts.get('checksum_mismatch', 0)}")
+        print(f"Report written to: {self.verify_report_file}")
+        self._print_file_list_cache_stats()
+
+    def _rehash_files(self, suspects: list, report) -> int:
+        """
+        Hash files on a process pool and compare them with their recorded digests.
+
+        Hashing is CPU-bound, so the files are spread over processes rather than threads.
+
+        Args:
+            suspects: Tuples of (fullpath, report path, local file path, expected size,
+                size on disk, recorded digest or None)
+            report: Open verify report to append checksum mismatches to
+
+        Returns:
+            int: Number of files whose digest differs from the recorded one
+        """
+        print(f"Re-hashing {len(suspects)} files...")
+        start_time = time.time()
+        mismatches = 0
+        with ProcessPoolExecutor(max_workers=self.rehash_workers) as pool:
+            digests = pool.map(
+                file_sha256, [suspect[2] for suspect in suspects], chunksize=8
+            )
+            for suspect, digest in zip(suspects, digests):
+                fullpath, report_path, _, expected_size, actual_size, recorded = suspect
+                if digest is None:
+                    continue
+                if recorded is not None and digest != recorded:
+                    mismatches += 1
+                    report.write(
+                        f"checksum_mismatch\t{report_path}\t{actual_size}\t{expected_size}\n"
+                    )
+                    self.state_store.record_failed(
+                        fullpath, expected_size, actual_size, "checksum mismatch on disk",
+                        attempted=False,
+                    )
+                else:
+                    self.state_store.record_completed(
+                        fullpath, expected_size, actual_size, checksum=digest, attempted=False
+                    )
+        print(f"Re-hashed {len(suspects)} files in {time.time() - start_time:.1f}s")
+        return mismatches
+
+    def run_verify(self, rehash: bool = False) -> None:
+        """
+        Run the verification process: fetch catalog data and check the local files.
+
+        Args:
+            rehash: Also re-hash suspect files, see verify_local_files
+        """
+        print("Starting verification of local files...")
+        print(f"Download base directory: {self.download_base_path}")
+
+        print("\n=== Step 1: Fetching catalog data ===")
+        if not self.catalog_manager.fetch_catalog_data():
+            print("Failed to fetch catalog data. Exiting.")
+            return
+
+        print("\n=== Step 2: Verifying local files ===")
+        self.verify_local_files(rehash)
+
+    def merge_shards(self, shard_dirs: Optional[List[str]] = None) -> None:
+        """
+        Combine the state of every shard of a job and report the objects still missing.
+
+        The per-shard state databases found in the download directory and in
+        shard_dirs are merged into this processor's state database, the finished
+        log is exported from it, and every listed object that no shard completed
+        is written to the shard report with the shard it belongs to.
+
+        Args:
+            shard_dirs: Further directories holding the files of shards with separate storage
+        """
+        directories = [self.download_base_path, *(shard_dirs or [])]
+        shard_files = find_shard_files(self.state_db_file, directories)
+        if not shard_files:
+            print(f"No shard state databases found in: {', '.join(directories)}")
+            return
+        shard_counts = {count for _, _, count in shard_files}
+        if len(shard_counts) > 1:
+            print(
+                "Found state databases of jobs with different shard counts "
+                f"({', '.join(str(count) for count in sorted(shard_counts))}); "
+                "remove the stale ones and merge again."
+            )
+            return
+        shard_count = shard_counts.pop()
+
+        for path, index, count in shard_files:
+            merged = self.state_store.merge_from(path)
+            print(f"Merged {merged} objects of shard {index}/{count} from {path}")
+        absent = set(range(1, shard_count + 1)) - {index for _, index, _ in shard_files}
+        if absent:
+            print(
+                f"Warning: no state found for shard(s) {', '.join(map(str, sorted(absent)))}"
+                f" of {shard_count}"
+            )
+
+        selection = self._select_paths_to_process()
+        if selection is None:
+            return
+        paths_to_process, table, data_type = selection
+
+        completed_objects = self.state_store.completed_objects()
+        listed = [0] * (shard_count + 1)
+        done = [0] * (shard_count + 1)
+        with open(self.shard_report_file, "w", encoding="utf-8") as report:
+            for path, file_list in self._iter_file_lists(paths_to_process, table):
+                if file_list is None:
+                    print(f"Merge: could not fetch the file list of path {path}, not counted")
+                    continue
+                for file_info in file_list:
+                    filename = file_info.get("file", "")
+                    if not filename:
+                        continue
+                    fullpath = f"shared-dataset/{data_type}/{path}/{filename}"
+                    key = path if self.shard_by == SHARD_BY_PATH else fullpath
+                    index = shard_of(key, shard_count)
+                    listed[index] += 1
+                    if fullpath in completed_objects:
+                        done[index] += 1
+                        continue
+                    expected_size = parse_expected_size(file_info.get("size", 0))
+                    report.write(f"{index}/{shard_count}\t{path}/{filename}\t{expected_size}\n")
+        exported = self.state_store.export_finished_log(self.finished_log_file)
+
+        print("\n=== Shard merge completed ===")
+        for index in range(1, shard_count + 1):
+            print(
+                f"Shard {index}/{shard_count}: {done[index]} of {listed[index]} listed files completed"
+            )
+        total_listed = sum(listed)
+        total_done = sum(done)
+        if total_listed:
+            print(
+                f"Total: {total_done} of {total_listed} listed files completed "
+                f"({total_done / total_listed * 100:.1f}%)"
+            )
+        print(f"Missing files written to: {self.shard_report_file}")
+        print(f"Exported {exported} completed paths to {self.finished_log_file}")
+
+    def run_merge_shards(self, shard_dirs: Optional[List[str]] = None) -> None:
+        """
+        Run the merge process: fetch catalog data and combine the state of all shards.
+        """
+        print("Starting merge of shard results...")
+        print(f"Download base directory: {self.download_base_path}")
+
+        print("\n=== Step 1: Fetching catalog data ===")
+        if not self.catalog_manager.fetch_catalog_data():
+            print("Failed to fetch catalog data. Exiting.")
+            return
+
+        print("\n=== Step 2: Merging shard state ===")
+        self.merge_shards(shard_dirs)
+
+    def _print_file_list_cache_stats(self) -> None:
+        """Print how many file-list API calls the file-list cache saved."""
+        if self.file_list_cache is None:
+            return
+        stats = self.file_list_cache.stats()
+        print(
+            f"File list cache: {stats['hits']} API calls saved, "
+            f"{stats['misses']} fetched ({stats['stale']} expired entries)"
+        )
+
+    def _print_url_cache_stats(self) -> None:
+        """Print hit-rate statistics of the signed URL cache."""
+        cache = self.url_cache
+        print(
+            f"Signed URL cache: {cache.hits} hits, {cache.misses} misses "
+            f"(hit rate {cache.hit_rate() * 100:.1f}%), "
+            f"{cache.expired} expired, {cache.evicted} evicted"
+        )
+
+    def _print_stall_stats(self) -> None:
+        """Print how many transfers were aborted as stalled or timed out."""
+        print(
+            f"Stalled transfers aborted: {self.downloader.stalled_transfers}, "
+            f"requests timed out: {self.downloader.timed_out_requests}"
+        )
+
+    def _print_hedge_stats(self) -> None:
+        """Print how many requests were hedged and how often the hedge finished first."""
+        for hedger in (self.downloader.url_hedger, self.downloader.transfer_hedger):
+            if hedger is None:
+                continue
+            stats = hedger.stats()
+            delay = f"{stats['delay']:.2f}s" if stats["delay"] is not None else "not yet set"
+            print(
+                f"Hedged {hedger.name} requests: {stats['hedges']} of {stats['operations']} "
+                f"({stats['hedge_wins']} won by the hedge), hedge delay {delay}"
+            )
+
+    def _print_rate_limit_stats(self) -> None:
+        """Print the time workers spent waiting on each rate limit."""
+        for name, stats in rate_limit.limiter_stats().items():
+            if stats["rate"] is None:
+                continue
+            print(
+                f"Rate limit {name}: {stats['acquired']:.0f} acquired at {stats['rate']:g}/s, "
+                f"{stats['waited_seconds']:.1f}s spent waiting"
+            )
+
+    def _print_pool_stats(self) -> None:
+        """Print connection pool reuse statistics for the shared HTTP session."""
+        stats = http_client.pool_stats()
+        print(
+            f"Connection pool: {stats['requests']} requests, "
+            f"{stats['hits']} reused connections (hits), "
+            f"{stats['misses']} new connections (misses) across {stats['pools']} host(s)"
+        )
 
     def run_full_process(self) -> None:
         """
@@ -302,8 +1536,39 @@ class DownloadProcessor:
 
         print("\n=== Processing completed ===")
         print("Files generated:")
-        print(f"- {self.catalog_file}: Contains catalog structure and paths")
+        print(f"- {self.compact_catalog_file}: Contains the catalog tree (compact format)")
+        if self.export_catalog_json:
+            print(f"- {self.catalog_file}: Contains catalog structure and paths (JSON export)")
+        print(f"- {self.catalog_diff_file}: Contains paths added/removed since the previous catalog")
+        print(f"- {self.state_db_file}: Contains the download state of every object")
         print(f"- {self.finished_log_file}: Contains downloaded file information")
+        print(f"- {self.manifest_file}: Contains the size and sha256 of every downloaded file")
         print(
             f"- Downloaded files: Organized in subdirectories under {self.download_base_path}"
         )
+
+
+def create_download_processor(
+    custom_download_path: str = None, config_overrides: dict = None
+) -> DownloadProcessor:
+    """
+    Create the download processor for the engine selected in config_overrides.
+
+    Args:
+        custom_download_path: Optional custom download path to override config
+        config_overrides: Optional dictionary to override config values;
+            'engine' selects "thread" (default) or "async"
+
+    Returns:
+        DownloadProcessor or AsyncDownloadProcessor instance
+    """
+    engine = (config_overrides or {}).get("engine", "thread")
+    if engine == "async":
+        from iearth_downloader.core.async_download_processor import (
+            AsyncDownloadProcessor,
+        )
+
+        return AsyncDownloadProcessor(custom_download_path, config_overrides)
+    if engine != "thread":
+        raise ValueError(f"Unknown download engine: {engine} (expected 'thread' or 'async')")
+    return DownloadProcessor(custom_download_path, config_overrides)
@@ -1,89 +1,899 @@
 """
-Download module for handling file downloads and logging.
+Download module for handling file downloads.
 """
 
+import json
 import os
 import requests
-import threading  # For type hinting Optional[threading.Lock]
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from iearth_downloader.utils.encrypt_utils import encrypt4long
 
 # Import constants from config that are NOT user credentials
 from iearth_downloader.config.config import RESOURCE_ID
 
 # TOKEN and USER_ACCOUNT are no longer imported directly from config
-# FINISHED_LOG_FILE is also not needed here anymore as Logger gets its path from download_processor
+# FINISHED_LOG_FILE is not needed here, the download state is kept by download_processor
 
 from iearth_downloader.system.const import sys_config  # Import sys_config
+from iearth_downloader.core.hedging import Hedger
 
 # Import the auth module to access its getter functions for credentials
 from iearth_downloader.utils import auth
+from iearth_downloader.utils import checksum
+from iearth_downloader.utils.chunking import ChunkSizer, read_chunks
+from iearth_downloader.utils import http_client
+from iearth_downloader.utils import rate_limit
+from iearth_downloader.utils.signed_url import SignedUrlCache, signed_url_expiry
+
+
+# Suffix of the temporary file a download is streamed into before it is complete
+PART_SUFFIX = ".part"
+# Marker next to a part file that is preallocated beyond the bytes written so far
+PREALLOCATED_SUFFIX = ".prealloc"
+# HTTP status codes the storage server uses to ask clients to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_expected_size(size: Any) -> Optional[int]:
+    """
+    Parse the 'size' field of a file list entry into a byte count.
+
+    Returns:
+        Size in bytes, or None if the size is missing or not a plain number
+    """
+    try:
+        expected_size = int(size)
+    except (TypeError, ValueError):
+        return None
+    return expected_size if expected_size > 0 else None
+
+
+def get_part_path(local_file_path: str) -> str:
+    """Get the temporary '.part' path used while downloading local_file_path."""
+    return local_file_path + PART_SUFFIX
+
+
+def is_download_complete(local_file_path: str, expected_size: Optional[int]) -> bool:
+    """
+    Check whether a file has already been downloaded completely.
+
+    With a known expected size the file must match it exactly, otherwise any
+    non-empty file is treated as complete.
+    """
+    try:
+        actual_size = os.path.getsize(local_file_path)
+    except OSError:
+        return False
+    if expected_size is None:
+        return actual_size > 0
+    return actual_size == expected_size
+
+
+def prepare_resume_offset(
+    local_file_path: str, part_path: str, expected_size: Optional[int]
+) -> int:
+    """
+    Determine the byte offset a download can resume from.
+
+    A truncated file left in place by an older version is moved to the part path
+    so it can be resumed, and part files larger than the expected size are discarded.
+
+    Returns:
+        Number of bytes already on disk in the part file
+    """
+    marker_path = part_path + PREALLOCATED_SUFFIX
+    if os.path.exists(marker_path):
+        # Interrupted before the preallocated tail was cut off: the size of the
+        # part file says nothing about the bytes written, so start over
+        print(f"Discarded interrupted preallocated download: {part_path}")
+        for path in (part_path, marker_path):
+            if os.path.exists(path):
+                os.remove(path)
+    if (
+        expected_size is not None
+        and not os.path.exists(part_path)
+        and os.path.exists(local_file_path)
+        and os.path.getsize(local_file_path) < expected_size
+    ):
+        print(f"Incomplete file found, resuming it: {local_file_path}")
+        os.replace(local_file_path, part_path)
+
+    try:
+        offset = os.path.getsize(part_path)
+    except OSError:
+        return 0
+    if expected_size is not None and offset > expected_size:
+        os.remove(part_path)
+        return 0
+    return offset
+
+
+def preallocate(f, size: int) -> bool:
+    """
+    Reserve disk space for a whole file in one call, so it is not fragmented by
+    growing with every write. Also sets the file size.
+
+    Returns:
+        bool: False if the platform or filesystem does not support preallocation
+    """
+    if not hasattr(os, "posix_fallocate"):
+        return False
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+    except OSError:
+        return False
+    return True
+
+
+class PartFileWriter:
+    """
+    Writes a stream into a part file from a resume offset.
+
+    Part files of at least preallocate_min_size bytes are preallocated to the
+    expected size. The unwritten tail is cut off again when the writer is
+    closed, so the size of the part file always equals the bytes written and
+    resuming and the size check of finalize_part work as for a growing file. A
+    marker file exists while the part file is preallocated, so a part file left
+    by a killed process is not mistaken for a complete one.
+    """
+
+    def __init__(
+        self,
+        part_path: str,
+        offset: int,
+        expected_size: Optional[int],
+        preallocate_min_size: int,
+    ):
+        """
+        Args:
+            part_path: Path of the part file
+            offset: Bytes already in the part file, 0 to start a new one
+            expected_size: Size of the complete file, if known
+            preallocate_min_size: Smallest file size to preallocate, 0 disables preallocation
+        """
+        self.part_path = part_path
+        self.marker_path = part_path + PREALLOCATED_SUFFIX
+        self.position = offset
+        self.preallocated = bool(
+            preallocate_min_size
+            and expected_size is not None
+            and expected_size >= preallocate_min_size
+            and expected_size > offset
+        )
+        if self.preallocated:
+            open(self.marker_path, "wb").close()
+            self.file = open(part_path, "r+b" if offset else "wb")
+            self.file.seek(offset)
+            if not preallocate(self.file, expected_size):
+                self.preallocated = False
+                os.remove(self.marker_path)
+        else:
+            self.file = open(part_path, "ab" if offset else "wb")
+
+    def write(self, data) -> None:
+        """Write the next bytes of the stream."""
+        self.file.write(data)
+        self.position += len(data)
+
+    def close(self) -> None:
+        """Cut off the unwritten preallocated tail and close the part file."""
+        try:
+            if self.preallocated:
+                self.file.truncate(self.position)
+        finally:
+            self.file.close()
+            if self.preallocated:
+                os.remove(self.marker_path)
+
+    def __enter__(self) -> "PartFileWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def parse_content_total(headers, offset: int, status_code: int) -> Optional[int]:
+    """
+    Get the total size of the object from the response headers.
+
+    Uses the total of a Content-Range header ('bytes a-b/total' or 'bytes */total')
+    if present, otherwise offset plus Content-Length for successful responses.
+    """
+    content_range = headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1].strip()
+        if total.isdigit():
+            return int(total)
+    content_length = headers.get("Content-Length")
+    if status_code in (200, 206) and content_length and content_length.isdigit():
+        return (offset if status_code == 206 else 0) + int(content_length)
+    return None
+
+
+def finalize_part(
+    part_path: str, local_file_path: str, expected_size: Optional[int]
+) -> bool:
+    """
+    Rename a finished part file into place after verifying its size.
+
+    A part file that is still too short is kept so the next attempt can resume it.
+
+    Returns:
+        bool: True if the file was moved into place, False on size mismatch
+    """
+    actual_size = os.path.getsize(part_path)
+    if expected_size is not None and actual_size != expected_size:
+        print(
+            f"Size mismatch for {local_file_path}: got {actual_size} bytes, expected {expected_size}"
+        )
+        if actual_size > expected_size:
+            os.remove(part_path)
+        return False
+    os.replace(part_path, local_file_path)
+    return True
+
+
+# Suffix of the sidecar file tracking segment progress of a segmented part file
+SEGMENT_PROGRESS_SUFFIX = ".segments"
+# Persist segment progress after this many bytes have been written by a segment
+SEGMENT_PROGRESS_SAVE_BYTES = 16 * 1024 * 1024
+
+
+def discard_segment_progress(part_path: str) -> None:
+    """Remove a segmented part file and its progress sidecar, if present."""
+    progress_path = part_path + SEGMENT_PROGRESS_SUFFIX
+    if os.path.exists(progress_path):
+        for path in (part_path, progress_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def is_timeout_error(ex: Exception) -> bool:
+    """Check whether an exception from requests or aiohttp is a connect or read timeout."""
+    if isinstance(ex, (requests.exceptions.Timeout, TimeoutError)):
+        return True
+    # urllib3 read timeouts while streaming are wrapped in a ConnectionError
+    return isinstance(ex, requests.exceptions.ConnectionError) and "timed out" in str(ex)
+
+
+class TransferStalledError(Exception):
+    """Raised when a transfer stays below the minimum throughput for a whole stall window."""
+
+
+class StallWatchdog:
+    """
+    Minimum-throughput check for a chunk loop.
+
+    Bytes are counted per window of stall_window seconds; if a window ends with
+    fewer than min_bytes_per_second * stall_window bytes, the transfer is treated
+    as stalled. Connections that deliver nothing at all are caught earlier by the
+    read timeout, this catches connections that only trickle. Time the transfer
+    spends waiting on the bandwidth limit is not part of the window, so a low
+    per-transfer share of max_download_rate_mb is not mistaken for a stall.
+    """
+
+    def __init__(self, min_bytes_per_second: float, stall_window: float):
+        """
+        Args:
+            min_bytes_per_second: Minimum average throughput, 0 or less disables the check
+            stall_window: Seconds over which the throughput is averaged
+        """
+        self.min_bytes_per_second = min_bytes_per_second
+        self.stall_window = stall_window
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+
+    def update(self, nbytes: int, paused: float = 0.0) -> None:
+        """
+        Count bytes received and check the throughput when the window is over.
+
+        Args:
+            nbytes: Bytes received since the last update
+            paused: Seconds since the last update spent waiting on the bandwidth limit
+
+        Raises:
+            TransferStalledError: If the finished window was below the minimum throughput
+        """
+        if self.min_bytes_per_second <= 0:
+            return
+        # Shift the window start, so limiter waits count as neither time nor throughput
+        self._window_start += paused
+        self._window_bytes += nbytes
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self.stall_window:
+            return
+        rate = self._window_bytes / elapsed
+        if rate < self.min_bytes_per_second:
+            raise TransferStalledError(
+                f"transfer stalled at {rate / 1024:.1f} KB/s over {elapsed:.0f}s"
+            )
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+
+
+# Status codes and error message keywords the download API uses for rejected tokens
+AUTH_ERROR_CODES = ("401", "403")
+AUTH_ERROR_KEYWORDS = ("token", "login", "unauthorized", "authenticat")
+
+
+def raise_for_auth_failure(status_code: int, data: Any, token: Optional[str]) -> None:
+    """
+    Raise AuthenticationError if a download API response rejects the token.
+
+    Args:
+        status_code: HTTP status code of the response
+        data: Parsed JSON body of the response, or None
+        token: Token the request was sent with
+
+    Raises:
+        auth.AuthenticationError: On HTTP 401/403 or an authentication error in the body
+    """
+    if str(status_code) in AUTH_ERROR_CODES:
+        raise auth.AuthenticationError(f"HTTP {status_code}", token)
+    if not isinstance(data, dict) or "signedUrl" in data:
+        return
+    if str(data.get("code")) in AUTH_ERROR_CODES:
+        raise auth.AuthenticationError(f"API error code {data.get('code')}", token)
+    message = str(
+        data.get("message") or data.get("msg") or data.get("failReason") or ""
+    )
+    if any(keyword in message.lower() for keyword in AUTH_ERROR_KEYWORDS):
+        raise auth.AuthenticationError(message, token)
+
+
+class SegmentHasher:
+    """
+    Hashes a segmented part file in file order while its segments are written.
+
+    The hash advances through the file as the segments fill in. A chunk written
+    right at the hashed position is hashed from memory, and bytes that another
+    segment wrote further ahead are read back from the part file once the
+    bytes before them are complete. Each byte is read back at most once, and
+    usually not at all for the segment in front, so a finished download needs
+    no second pass over the file.
+    """
+
+    def __init__(self, part_path: str, segments: List[List[int]]):
+        """
+        Initialize the hasher.
+
+        Args:
+            part_path: Path of the part file
+            segments: [start, end (inclusive), bytes done] of every segment, in file order
+        """
+        self.part_path = part_path
+        self._ranges = [(start, end) for start, end, _ in segments]
+        # End of the bytes written so far by each segment
+        self._written = [start + done for start, _, done in segments]
+        self._size = segments[-1][1] + 1 if segments else 0
+        self._hasher = checksum.new_hasher()
+        self._offset = 0
+        self._current = 0
+        self._lock = threading.Lock()
+
+    def update(self, index: int, position: int, chunk: bytes) -> None:
+        """
+        Report a chunk written and flushed to the part file by a segment.
+
+        Args:
+            index: Segment number
+            position: File position the chunk was written at
+            chunk: The bytes written
+        """
+        with self._lock:
+            self._written[index] = position + len(chunk)
+            if position == self._offset:
+                self._hasher.update(chunk)
+                self._offset += len(chunk)
+            self._advance()
+
+    def result(self):
+        """Get the hasher if the whole file has been hashed, otherwise None."""
+        with self._lock:
+            self._advance()
+            return self._hasher if self._offset == self._size else None
+
+    def _advance(self) -> None:
+        """Hash the bytes already on disk from the hashed position to the end of what is written."""
+        while self._current < len(self._ranges):
+            end = self._ranges[self._current][1]
+            written = self._written[self._current]
+            if written > self._offset:
+                checksum.update_from_file(
+                    self._hasher, self.part_path, written - self._offset, self._offset
+                )
+                self._offset = written
+            if written <= end:
+                break
+            self._current += 1
+
+
+class SegmentProgress:
+    """Tracks the byte ranges of a segmented download and persists them next to the part file."""
+
+    def __init__(self, part_path: str, total_size: int, segments: List[List[int]]):
+        self.part_path = part_path
+        self.progress_path = part_path + SEGMENT_PROGRESS_SUFFIX
+        self.total_size = total_size
+        # Each segment is [start, end (inclusive), bytes done]
+        self.segments = segments
+        self.lock = threading.Lock()
+        # Headers of a segment response, holding the server's ETag of the whole object
+        self.response_headers = None
+
+    @classmethod
+    def load_or_create(
+        cls, part_path: str, total_size: int, max_segments: int
+    ) -> "SegmentProgress":
+        """
+        Load the saved progress of a segmented download, or start a new one.
+
+        A new download preallocates the part file to its full size.
+        """
+        progress_path = part_path + SEGMENT_PROGRESS_SUFFIX
+        try:
+            with open(progress_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if (
+                saved.get("total_size") == total_size
+                and os.path.getsize(part_path) == total_size
+            ):
+                return cls(part_path, total_size, saved["segments"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        segment_size = -(-total_size // max_segments)  # Ceiling division
+        segments = [
+            [start, min(start + segment_size, total_size) - 1, 0]
+            for start in range(0, total_size, segment_size)
+        ]
+        with open(part_path, "wb") as f:
+            if not preallocate(f, total_size):
+                f.truncate(total_size)
+        progress = cls(part_path, total_size, segments)
+        progress.save()
+        return progress
+
+    def pending_segments(self) -> List[int]:
+        """Get the indexes of segments that still have bytes to download."""
+        return [
+            i
+            for i, (start, end, done) in enumerate(self.segments)
+            if start + done <= end
+        ]
+
+    def is_complete(self) -> bool:
+        """Check whether every segment has been downloaded completely."""
+        return not self.pending_segments()
+
+    def update(self, index: int, done: int) -> None:
+        """Record the bytes done for a segment and persist the progress."""
+        with self.lock:
+            self.segments[index][2] = done
+            self.save()
+
+    def save(self) -> None:
+        """Write the progress to the sidecar file."""
+        tmp_path = self.progress_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"total_size": self.total_size, "segments": self.segments}, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def remove(self) -> None:
+        """Remove the sidecar file once the download is complete."""
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
 
 
 class Downloader:
     """Handles file downloading and related operations."""
 
-    def __init__(self, resource_id: int = None):
+    def __init__(
+        self,
+        resource_id: int = None,
+        max_segments: int = None,
+        segment_threshold_mb: int = None,
+        url_cache: Optional[SignedUrlCache] = None,
+        min_transfer_rate_kb: float = None,
+        stall_window: float = None,
+    ):
         """
         Initialize the Downloader.
 
         Args:
             resource_id: Optional resource ID to use. If None, uses the default from config.
+            max_segments: Number of concurrent byte-range segments for large files.
+                If None, uses the value from system.ini.
+            segment_threshold_mb: Minimum file size in MB for segmented downloads.
+                If None, uses the value from system.ini.
+            url_cache: Optional cache of signed URLs shared by all threads
+            min_transfer_rate_kb: Minimum throughput in KB/s before a transfer counts as stalled.
+                If None, uses the value from system.ini.
+            stall_window: Seconds over which the minimum throughput is checked.
+                If None, uses the value from system.ini.
         """
         self.resource_id = resource_id if resource_id is not None else RESOURCE_ID
+        self.max_segments = (
+            max_segments if max_segments is not None else sys_config.max_segments
+        )
+        threshold_mb = (
+            segment_threshold_mb
+            if segment_threshold_mb is not None
+            else sys_config.segment_threshold_mb
+        )
+        self.segment_threshold = threshold_mb * 1024 * 1024
+        self.url_cache = url_cache
+        self.signed_url_default_ttl = sys_config.signed_url_default_ttl
+        # Read sizes of the transfer loops and the smallest file preallocated on disk
+        self.min_chunk_size = sys_config.chunk_size
+        self.max_chunk_size = sys_config.max_chunk_size_kb * 1024
+        self.preallocate_min_size = sys_config.preallocate_min_mb * 1024 * 1024
+        if min_transfer_rate_kb is None:
+            min_transfer_rate_kb = sys_config.min_transfer_rate_kb
+        self.min_transfer_rate = min_transfer_rate_kb * 1024
+        self.stall_window = (
+            stall_window if stall_window is not None else sys_config.stall_window
+        )
+        # Transfers aborted by the stall watchdog and requests that hit a timeout
+        self.stalled_transfers = 0
+        self.timed_out_requests = 0
+        # Throttling responses seen by all transfers, read by the concurrency controller
+        self.throttled_responses = 0
+        self._throttle_lock = threading.Lock()
+        # Cause of the last failed transfer per local file: (HTTP status or None, message)
+        self._failures: Dict[str, Tuple[Optional[int], str]] = {}
+        # Checksums of finished transfers per local file: (sha256, server checksum)
+        self._results: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        # Hedgers for signed-URL requests and transfer requests, set by enable_hedging
+        self.url_hedger: Optional[Hedger] = None
+        self.transfer_hedger: Optional[Hedger] = None
+
+    def enable_hedging(self, percentile: float, budget: float, max_workers: int) -> None:
+        """
+        Race a duplicate request against signed-URL requests and transfer requests that run long.
+
+        Transfers are hedged until the response headers arrive; the body is then
+        read from the winning response only.
+
+        Args:
+            percentile: Percentile of recent latencies after which a request is hedged
+            budget: Highest fraction of requests that may be hedged
+            max_workers: Threads for running the attempts of each request type
+        """
+        self.url_hedger = Hedger("download_api", percentile, budget, max_workers)
+        self.transfer_hedger = Hedger("transfer", percentile, budget, max_workers)
+
+    def build_signed_url_request(
+        self, fullpath: str, token: str, resource_id: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Build the payload and headers for a signed-URL request to the download API.
+
+        Args:
+            fullpath: Object key of the file to download
+            token: Authentication token
+            resource_id: Resource the object belongs to, the downloader's resource if None
+
+        Returns:
+            Tuple of (payload, headers)
+        """
+        payload = {
+            "objectKey": fullpath,
+            "resourceId": str(resource_id if resource_id is not None else self.resource_id),
+            "userAccount": auth.get_user_account(),  # Get user_account from auth module
+            "resourceType": "REMOTE_SENSING",
+            "country": "Japan",
+        }
+
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}",  # Use the retrieved token
+        }
+        return payload, headers
+
+    @staticmethod
+    def rewrite_signed_url(signed_url: str, fullpath: str) -> str:
+        """
+        Rebuild the signed URL returned by the download API into a direct https URL.
+
+        Args:
+            signed_url: URL returned in the 'signedUrl' field of the API response
+            fullpath: Object key of the file to download
+
+        Returns:
+            Decoded https URL pointing at the object on the storage site
+        """
+        site = signed_url.split("/")[2].split(":")[0]
+        params = signed_url.split("?")[1]
+        signed_url = f"https://{site}/{fullpath}?{params}"
+        # Decode the url from url encoding
+        return requests.utils.unquote(signed_url)
 
-    def download_file(self, fullpath: str, filename: str, local_path: str) -> bool:
+    def download_file(
+        self, fullpath: str, filename: str, local_path: str, size: Any = None
+    ) -> bool:
         """
         Download a file using the encrypted fullpath and save it in the specified local path.
-        Uses the token obtained from auth.py for authorization.
+        Resolves a signed URL and transfers the file in one call.
+
+        Args:
+            fullpath: Object key of the file to download
+            filename: Name of the file
+            local_path: Local directory to save the file in
+            size: Expected file size in bytes, as listed by fetch_file_list
         """
+        if self.is_downloaded(filename, local_path, size):
+            print(f"File already exists and is complete: {os.path.join(local_path, filename)}")
+            return True
+
+        signed_url = self.resolve_signed_url(fullpath)
+        if not signed_url:
+            return False
+        return self.transfer_file(signed_url, filename, local_path, size)
+
+    def is_downloaded(self, filename: str, local_path: str, size: Any = None) -> bool:
+        """Check whether a file is already complete on disk, without contacting the API."""
+        local_file_path = os.path.join(local_path, filename)
+        return is_download_complete(local_file_path, parse_expected_size(size))
+
+    def resolve_signed_url(self, fullpath: str, min_ttl: float = 0) -> Optional[str]:
+        """
+        Get a signed download URL for an object, from the cache or the download API.
+
+        Args:
+            fullpath: Object key of the file to download
+            min_ttl: Minimum number of seconds a cached URL must remain valid
+
+        Returns:
+            The signed https URL, or None on failure
+        """
+        return self.resolve_signed_url_with_expiry(fullpath, min_ttl)[0]
+
+    def resolve_signed_url_with_expiry(
+        self, fullpath: str, min_ttl: float = 0, resource_id: Optional[int] = None
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """
+        Get a signed download URL for an object together with its expiry time.
+        Cached URLs valid for at least min_ttl seconds are reused, otherwise a new
+        URL is requested from the download API using the token from auth.py.
+
+        Args:
+            fullpath: Object key of the file to download
+            min_ttl: Minimum number of seconds a cached URL must remain valid
+            resource_id: Resource the object belongs to, the downloader's resource if None
+
+        Returns:
+            Tuple of (signed_url, expires_at as epoch seconds), or (None, None) on failure
+
+        Raises:
+            auth.AuthenticationError: If the download API rejected the token
+        """
+        if self.url_cache is not None:
+            cached = self.url_cache.get(fullpath, min_ttl)
+            if cached is not None:
+                return cached
+
         current_token = auth.get_token()  # Get token from auth module
         if not current_token:
             # This error should ideally be logged by the calling function in download_processor
             # print("Error in Downloader: No authentication token found. Please login first.")
+            return None, None
+
+        try:
+            encrypt_fullpath = encrypt4long({"objectKey": fullpath})
+            if self.url_hedger is not None:
+                signed_url = self.url_hedger.run(
+                    lambda: self._request_signed_url(fullpath, current_token, resource_id)
+                )
+            else:
+                signed_url = self._request_signed_url(fullpath, current_token, resource_id)
+
+        except auth.AuthenticationError:
+            # Let the caller refresh the token and retry
+            raise
+        except Exception as ex:
+            print(f"Error resolving signed URL for {fullpath}: {ex}")
+            return None, None
+
+        expires_at = signed_url_expiry(signed_url, self.signed_url_default_ttl)
+        if self.url_cache is not None:
+            self.url_cache.put(fullpath, signed_url, expires_at)
+        return signed_url, expires_at
+
+    def close_hedgers(self) -> None:
+        """Release the threads of the hedgers once no more requests are sent."""
+        for hedger in (self.url_hedger, self.transfer_hedger):
+            if hedger is not None:
+                hedger.close()
+
+    def _request_signed_url(
+        self, fullpath: str, token: str, resource_id: Optional[int] = None
+    ) -> str:
+        """
+        Request a signed URL for an object from the download API.
+
+        Raises:
+            auth.AuthenticationError: If the download API rejected the token
+        """
+        payload, headers = self.build_signed_url_request(fullpath, token, resource_id)
+
+        # New api call to get signed URL
+        rate_limit.acquire_request(rate_limit.DOWNLOAD_API)
+        response = http_client.get_session().post(
+            sys_config.download_api, json=payload, headers=headers
+        )
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        raise_for_auth_failure(response.status_code, data, token)
+        return self.rewrite_signed_url(data["signedUrl"], fullpath)
+
+    def _open_transfer(self, session, signed_url: str, headers: Dict[str, str]):
+        """Send a streaming transfer request, hedged until its response headers arrive."""
+        if self.transfer_hedger is None:
+            return session.get(signed_url, stream=True, headers=headers)
+        return self.transfer_hedger.run(
+            lambda: session.get(signed_url, stream=True, headers=headers),
+            discard=lambda response: response.close(),
+        )
+
+    def record_response_status(self, status_code: int) -> None:
+        """Count a storage response that asks the client to slow down."""
+        if status_code in THROTTLE_STATUS_CODES:
+            with self._throttle_lock:
+                self.throttled_responses += 1
+
+    def record_failure(
+        self, local_file_path: str, status_code: Optional[int], message: str
+    ) -> None:
+        """Remember why the transfer of a file failed, for the retry classification."""
+        with self._throttle_lock:
+            self._failures[local_file_path] = (status_code, message)
+
+    def pop_failure(self, local_file_path: str) -> Tuple[Optional[int], str]:
+        """
+        Get and clear the cause of the last failed transfer of a file.
+
+        Returns:
+            Tuple of (HTTP status or None, message); (None, "transfer failed") if no cause was recorded
+        """
+        with self._throttle_lock:
+            return self._failures.pop(local_file_path, (None, "transfer failed"))
+
+    def finalize_download(
+        self,
+        part_path: str,
+        local_file_path: str,
+        total_size: Optional[int],
+        hasher=None,
+        headers=None,
+    ) -> bool:
+        """
+        Move a complete part file into place and remember its checksums.
+
+        Args:
+            part_path: Path of the part file
+            local_file_path: Target path of the file
+            total_size: Expected size, or None if unknown
+            hasher: Hasher fed with the whole file while it was written; if None
+                the file is read back once to hash it
+            headers: Response headers holding the server's ETag or checksum
+
+        Returns:
+            bool: True if the file was moved into place
+        """
+        if not finalize_part(part_path, local_file_path, total_size):
             return False
+        if hasher is not None:
+            digest = hasher.hexdigest()
+        else:
+            digest = checksum.file_sha256(local_file_path)
+        server_checksum = checksum.server_checksum(headers) if headers is not None else None
+        with self._throttle_lock:
+            self._results[local_file_path] = (digest, server_checksum)
+        return True
+
+    def pop_result(self, local_file_path: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get and clear the checksums of the last finished transfer of a file.
+
+        Returns:
+            Tuple of (sha256 hex digest, server checksum); (None, None) if nothing was recorded
+        """
+        with self._throttle_lock:
+            return self._results.pop(local_file_path, (None, None))
+
+    def new_chunk_sizer(self, remaining: Optional[int] = None) -> ChunkSizer:
+        """Create the read-size chooser of one transfer loop with remaining bytes to read."""
+        return ChunkSizer(self.min_chunk_size, self.max_chunk_size, remaining)
+
+    def new_watchdog(self) -> StallWatchdog:
+        """Create a stall watchdog for one transfer loop."""
+        return StallWatchdog(self.min_transfer_rate, self.stall_window)
 
+    def record_stall(self, ex: Exception) -> None:
+        """Count a transfer aborted by the watchdog or a request that timed out."""
+        with self._throttle_lock:
+            if isinstance(ex, TransferStalledError):
+                self.stalled_transfers += 1
+            elif is_timeout_error(ex):
+                self.timed_out_requests += 1
+
+    def _note_failure(self, local_file_path: str, signed_url: str, ex: Exception) -> None:
+        """Inspect a failed transfer request: record its cause, count stalls and throttling and drop rejected URLs."""
+        self.record_stall(ex)
+        response = getattr(ex, "response", None)
+        status_code = response.status_code if response is not None else None
+        if status_code is not None:
+            self.record_response_status(status_code)
+        self.record_failure(local_file_path, status_code, f"{type(ex).__name__}: {ex}")
+        self._discard_rejected_url(signed_url, ex)
+
+    def _discard_rejected_url(self, signed_url: str, ex: Exception) -> None:
+        """Drop a cached URL if the storage server rejected it as unauthorized or expired."""
+        response = getattr(ex, "response", None)
+        if (
+            self.url_cache is not None
+            and response is not None
+            and response.status_code in (401, 403)
+        ):
+            self.url_cache.discard_url(signed_url)
+
+    def transfer_file(
+        self, signed_url: str, filename: str, local_path: str, size: Any = None
+    ) -> bool:
+        """
+        Transfer a file from its signed URL into the specified local path.
+
+        Data is streamed into a '.part' file next to the target. An existing '.part'
+        file is resumed with an HTTP Range request, and the file is only renamed into
+        place once its size matches the expected size. Files of at least
+        segment_threshold bytes are downloaded as concurrent byte-range segments.
+
+        Args:
+            signed_url: Signed URL returned by resolve_signed_url
+            filename: Name of the file
+            local_path: Local directory to save the file in
+            size: Expected file size in bytes, as listed by fetch_file_list
+        """
+        local_file_path = os.path.join(local_path, filename)
         try:
             os.makedirs(local_path, exist_ok=True)
-            local_file_path = os.path.join(local_path, filename)
-            if (
-                os.path.exists(local_file_path)
-                and os.path.getsize(local_file_path) > 0.01
-            ):
-                print(f"File already exists and is non-empty: {local_file_path}")
+            expected_size = parse_expected_size(size)
+            if is_download_complete(local_file_path, expected_size):
+                print(f"File already exists and is complete: {local_file_path}")
                 return True
 
-            encrypt_fullpath = encrypt4long({"objectKey": fullpath})
-            payload = {
-                "objectKey": fullpath,
-                "resourceId": str(self.resource_id),
-                "userAccount": auth.get_user_account(),  # Get user_account from auth module
-                "resourceType": "REMOTE_SENSING",
-                "country": "Japan",
-            }
-
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {current_token}",  # Use the retrieved token
-            }
-
-            # The print for starting download is now in download_processor's worker thread
-            # New api call to get signed URL
-            response = requests.post(
-                sys_config.download_api, json=payload, headers=headers
-            )
-            signed_url = response.json()["signedUrl"]
-            site = signed_url.split("/")[2].split(":")[0]
-            params = signed_url.split("?")[1]
-            signed_url = f"https://{site}/{fullpath}?{params}"
-            # Decode the url from url encoding
-            signed_url = requests.utils.unquote(signed_url)
-
-            with open(local_file_path, "wb") as f:
-                r = requests.get(signed_url, stream=True)
-                for chunk in r.iter_content(chunk_size=sys_config.chunk_size):
-                    if chunk:
-                        f.write(chunk)
+            part_path = get_part_path(local_file_path)
+            session = http_client.get_session()
+            if self._use_segments(expected_size):
+                downloaded = self._download_segmented(
+                    session, signed_url, part_path, local_file_path, expected_size
+                )
+                if downloaded is None:
+                    print(f"Server does not support range requests, streaming: {filename}")
+                    discard_segment_progress(part_path)
+                    downloaded = self._download_stream(
+                        session, signed_url, part_path, local_file_path, expected_size, 0
+                    )
+            else:
+                # A preallocated segmented part file cannot be resumed as a stream
+                discard_segment_progress(part_path)
+                offset = prepare_resume_offset(local_file_path, part_path, expected_size)
+                if expected_size is not None and offset == expected_size:
+                    downloaded = self.finalize_download(
+                        part_path, local_file_path, expected_size
+                    )
+                else:
+                    downloaded = self._download_stream(
+                        session, signed_url, part_path, local_file_path, expected_size, offset
+                    )
+            if not downloaded:
+                return False
 
             # The print for successful download is now in download_processor's worker thread
             print(f"Successfully downloaded: {local_file_path}")
@@ -92,8 +902,181 @@ class Downloader:
         except Exception as ex:
             # Errors (including print statements) are now handled by the calling worker in download_processor
             print(f"Error downloading file {filename}: {ex}")
+            self._note_failure(local_file_path, signed_url, ex)
             return False
 
+    def _use_segments(self, expected_size: Optional[int]) -> bool:
+        """Check whether a file of the given size should be downloaded in segments."""
+        return (
+            self.max_segments > 1
+            and expected_size is not None
+            and expected_size >= self.segment_threshold
+        )
+
+    def _download_stream(
+        self,
+        session,
+        signed_url: str,
+        part_path: str,
+        local_file_path: str,
+        expected_size: Optional[int],
+        offset: int,
+    ) -> bool:
+        """
+        Stream a file into its part file, resuming from offset, and finalize it.
+
+        Returns:
+            bool: True if the file was downloaded and moved into place
+        """
+        filename = os.path.basename(local_file_path)
+        range_headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self._open_transfer(session, signed_url, range_headers) as r:
+            if r.status_code == 416:
+                # Range not satisfiable: the part file is already complete or invalid
+                total_size = parse_content_total(r.headers, offset, 416)
+                if total_size == offset:
+                    return self.finalize_download(part_path, local_file_path, total_size)
+                os.remove(part_path)
+                print(f"Discarded invalid partial download: {part_path}")
+                return False
+            r.raise_for_status()
+
+            hasher = checksum.new_hasher()
+            if offset and r.status_code != 206:
+                print(f"Server ignored range request, restarting: {filename}")
+                offset = 0
+            elif offset:
+                print(f"Resuming {filename} from byte {offset}")
+                # The digest covers the whole file, starting with the bytes already on disk
+                checksum.update_from_file(hasher, part_path, offset)
+            total_size = expected_size or parse_content_total(
+                r.headers, offset, r.status_code
+            )
+
+            watchdog = self.new_watchdog()
+            sizer = self.new_chunk_sizer(total_size - offset if total_size else None)
+            with PartFileWriter(
+                part_path, offset, total_size, self.preallocate_min_size
+            ) as f:
+                for chunk in read_chunks(r, sizer):
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    waited = rate_limit.throttle_bytes(len(chunk))
+                    watchdog.update(len(chunk), waited)
+
+        return self.finalize_download(
+            part_path, local_file_path, total_size, hasher, r.headers
+        )
+
+    def _download_segmented(
+        self,
+        session,
+        signed_url: str,
+        part_path: str,
+        local_file_path: str,
+        expected_size: int,
+    ) -> Optional[bool]:
+        """
+        Download a large file as concurrent byte-range segments into one preallocated part file.
+
+        Segment progress is kept in a '.segments' sidecar file so an interrupted
+        download resumes each segment where it stopped.
+
+        Returns:
+            True if the file was downloaded and moved into place, False on failure,
+            or None if the server does not support range requests
+        """
+        progress = SegmentProgress.load_or_create(
+            part_path, expected_size, self.max_segments
+        )
+        pending = progress.pending_segments()
+        print(
+            f"Downloading {os.path.basename(local_file_path)} in {len(progress.segments)} segments "
+            f"({len(pending)} remaining)"
+        )
+
+        hasher = SegmentHasher(part_path, progress.segments)
+        with ThreadPoolExecutor(max_workers=len(pending) or 1) as pool:
+            futures = [
+                pool.submit(
+                    self._download_segment, session, signed_url, progress, i, hasher
+                )
+                for i in pending
+            ]
+            results = [future.result() for future in futures]
+
+        if any(result is None for result in results):
+            return None
+        if not all(results) or not progress.is_complete():
+            return False
+
+        progress.remove()
+        # The segments were hashed in file order while they were written
+        return self.finalize_download(
+            part_path,
+            local_file_path,
+            expected_size,
+            hasher.result(),
+            headers=progress.response_headers,
+        )
+
+    def _download_segment(
+        self,
+        session,
+        signed_url: str,
+        progress: "SegmentProgress",
+        index: int,
+        hasher: Optional[SegmentHasher] = None,
+    ) -> Optional[bool]:
+        """
+        Download the remaining bytes of one segment into its place in the part file.
+        Written chunks are reported to the hasher of the file, if given.
+
+        Returns:
+            True if the segment is complete, False on failure, or None if the
+            server answered the range request with a full response
+        """
+        start, end, done = progress.segments[index]
+        range_headers = {"Range": f"bytes={start + done}-{end}"}
+        try:
+            with self._open_transfer(session, signed_url, range_headers) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    return None
+                progress.response_headers = r.headers
+
+                watchdog = self.new_watchdog()
+                sizer = self.new_chunk_sizer(end + 1 - (start + done))
+                with open(progress.part_path, "r+b") as f:
+                    f.seek(start + done)
+                    unsaved = 0
+                    for chunk in read_chunks(r, sizer):
+                        chunk = chunk[: end + 1 - (start + done)]
+                        f.write(chunk)
+                        if hasher is not None:
+                            # The hasher may read the bytes back from another handle
+                            f.flush()
+                            hasher.update(index, start + done, chunk)
+                        done += len(chunk)
+                        waited = rate_limit.throttle_bytes(len(chunk))
+                        watchdog.update(len(chunk), waited)
+                        unsaved += len(chunk)
+                        if unsaved >= SEGMENT_PROGRESS_SAVE_BYTES:
+                            f.flush()
+                            progress.update(index, done)
+                            unsaved = 0
+                        if start + done > end:
+                            break
+                    f.flush()
+                    progress.update(index, done)
+        except Exception as ex:
+            print(f"Error downloading segment {index} of {progress.part_path}: {ex}")
+            self._note_failure(progress.part_path[: -len(PART_SUFFIX)], signed_url, ex)
+            progress.update(index, done)
+            return False
+
+        return start + done == end + 1
+
     def record_download_info(self, fullpath: str, filename: str, size: int) -> bool:
         """
         Record download information by calling the API.
@@ -120,7 +1103,9 @@ class Downloader:
 
         try:
             # The print for starting recording is now in download_processor's worker thread
-            response = requests.post(sys_config.record_api, json=payload)
+            response = http_client.get_session().post(
+                sys_config.record_api, json=payload
+            )
             response.raise_for_status()
             # The print for successful recording is now in download_processor's worker thread
             return True
@@ -129,49 +1114,3 @@ class Downloader:
             # Errors (including print statements) are now handled by the calling worker in download_processor
             return False
 
-
-class Logger:
-    """Handles logging operations for downloaded files."""
-
-    def __init__(self, log_file: str, lock: Optional[threading.Lock] = None) -> None:
-        """Initialize the logger with a log file and an optional lock."""
-        self.log_file = log_file
-        self.lock: Optional[threading.Lock] = lock  # Type hint for instance variable
-
-    def initialize_fullpath_log(self) -> None:
-        """Initialize or clear the log file."""
-        try:
-            if self.lock:
-                self.lock.acquire()
-            with open(self.log_file, "w", encoding="utf-8") as f:
-                f.write("")
-            # Initialization print is now handled by download_processor
-        except Exception:
-            # Errors (including print statements) are now handled by the calling download_processor
-            pass  # Let the caller handle logging of this error
-        finally:
-            if self.lock and self.lock.locked():
-                self.lock.release()
-
-    def log_to_fullpath(self, fullpath: str) -> None:
-        """
-        Log the modified fullpath to the log file.
-        Removes the first two directory levels from the path.
-        """
-        try:
-            path_parts = fullpath.split("/")
-            if len(path_parts) > 2:
-                modified_fullpath = "/".join(path_parts[2:])
-            else:
-                modified_fullpath = fullpath
-
-            if self.lock:
-                self.lock.acquire()
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(f"{modified_fullpath}\n")
-        except Exception:
-            # Errors (including print statements) are now handled by the calling download_processor
-            pass  # Let the caller handle logging of this error
-        finally:
-            if self.lock and self.lock.locked():
-                self.lock.release()
@@ -0,0 +1,125 @@
+"""
+File-list cache module persisting fetched file lists in a local SQLite database.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class FileListCache:
+    """
+    On-disk cache of file lists keyed by resource, table and catalog path.
+
+    Each entry stores the time it was fetched. Entries older than the TTL are
+    treated as missing, and refresh mode ignores all entries while still
+    rewriting them with the fresh results.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        resource_id: int,
+        ttl_seconds: float,
+        refresh: bool = False,
+    ):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            db_path: Path of the SQLite database file
+            resource_id: Resource ID the cached lists belong to
+            ttl_seconds: Maximum age of a cached list, 0 or less never expires
+            refresh: Ignore cached lists and fetch every path again
+        """
+        self.db_path = db_path
+        self.resource_id = resource_id
+        self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file_lists (
+                    resource_id INTEGER NOT NULL,
+                    table_name TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    files TEXT NOT NULL,
+                    PRIMARY KEY (resource_id, table_name, path)
+                )
+                """
+            )
+            self._conn.commit()
+
+    def get(self, table: str, path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached file list of a path if it is present and fresh.
+
+        Returns:
+            The cached file list, or None if it must be fetched from the API
+        """
+        if self.refresh:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, files FROM file_lists "
+                "WHERE resource_id = ? AND table_name = ? AND path = ?",
+                (self.resource_id, table, path),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            fetched_at, files = row
+            if self.ttl_seconds > 0 and time.time() - fetched_at > self.ttl_seconds:
+                self.stale += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(files)
+
+    def put(self, table: str, path: str, file_list: List[Dict[str, Any]]) -> None:
+        """Store the file list of a path with the current time."""
+        files = json.dumps(file_list, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_lists "
+                "(resource_id, table_name, path, fetched_at, files) VALUES (?, ?, ?, ?, ?)",
+                (self.resource_id, table, path, time.time(), files),
+            )
+            self._conn.commit()
+
+    def invalidate(self, table: str, path: str) -> None:
+        """Remove the cached file list of a path."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM file_lists "
+                "WHERE resource_id = ? AND table_name = ? AND path = ?",
+                (self.resource_id, table, path),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics for this run.
+
+        Returns:
+            dict with 'hits' (API calls saved), 'misses' and 'stale' (expired entries)
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "stale": self.stale}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
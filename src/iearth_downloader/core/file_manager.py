@@ -4,24 +4,61 @@ File management module for handling file operations.
 
 import requests
 import json
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Optional
+from iearth_downloader.core.file_list_cache import FileListCache
 from iearth_downloader.system.const import sys_config
+from iearth_downloader.utils import http_client, rate_limit
 
 
 class FileManager:
     """Manages file operations including fetching file lists."""
 
-    def fetch_file_list(self, table: str, path: str) -> List[Dict[str, Any]]:
+    def __init__(
+        self,
+        max_concurrent_requests: int = None,
+        cache: Optional[FileListCache] = None,
+        request_slots: Optional[threading.BoundedSemaphore] = None,
+    ):
         """
-        Fetch file list for a specific path from the API.
+        Initialize the FileManager.
+
+        Args:
+            max_concurrent_requests: Maximum number of file-list API requests in flight
+                at once across all threads. If None, uses the value from system.ini.
+            cache: Optional persistent cache of previously fetched file lists
+            request_slots: Optional semaphore shared with other FileManagers, e.g. of the
+                resources of a batch run, so the limit applies to all of them together.
+                If None, a semaphore of max_concurrent_requests slots is created.
+        """
+        self.cache = cache
+        if max_concurrent_requests is None:
+            max_concurrent_requests = sys_config.file_list_api_concurrency
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        if request_slots is None:
+            request_slots = threading.BoundedSemaphore(self.max_concurrent_requests)
+        self.request_slots = request_slots
+
+    def fetch_file_list(self, table: str, path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch file list for a specific path from the cache or the API.
+        Successful API responses are stored in the cache, failed requests are not.
+        A response without a "response" file list, such as an error body sent
+        with HTTP 200, counts as a failed request.
 
         Args:
             table: The table name
             path: The path to fetch files for
 
         Returns:
-            List of file information dictionaries
+            List of file information dictionaries, or None if the request failed
         """
+        if self.cache is not None:
+            cached_list = self.cache.get(table, path)
+            if cached_list is not None:
+                print(f"Using cached file list for path: {path}")
+                return cached_list
+
         payload = {
             "params": {
                 "table": table,
@@ -34,15 +71,28 @@ class FileManager:
 
         try:
             print(f"Fetching file list for path: {path}")
-            response = requests.post(sys_config.file_list_api, json=payload)
+            with self.request_slots:
+                rate_limit.acquire_request(rate_limit.FILE_LIST_API)
+                response = http_client.get_session().post(
+                    sys_config.file_list_api, json=payload
+                )
             response.raise_for_status()
 
             data = response.json()
-            return data.get("response", [])
+            file_list = data.get("response") if isinstance(data, dict) else None
+            if not isinstance(file_list, list):
+                print(
+                    f"Error fetching file list for path {path}: "
+                    f"no file list in response: {str(data)[:200]}"
+                )
+                return None
+            if self.cache is not None:
+                self.cache.put(table, path, file_list)
+            return file_list
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching file list for path {path}: {e}")
-            return []
+            return None
         except json.JSONDecodeError as e:
             print(f"Error parsing response for path {path}: {e}")
-            return []
+            return None
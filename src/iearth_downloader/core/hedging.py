@@ -0,0 +1,215 @@
+"""
+Hedged request module cutting tail latency by racing a duplicate of slow operations.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Latencies kept per operation type for the rolling percentile
+LATENCY_WINDOW = 200
+# Operations observed before the first hedge is allowed
+MIN_SAMPLES = 20
+# Hedges that can be saved up while operations are fast
+MAX_HEDGE_CREDITS = 10.0
+
+
+class Hedger:
+    """
+    Races a duplicate attempt against operations that run longer than usual.
+
+    Each operation starts one attempt. If it has not finished after the given
+    percentile of recent latencies, a second attempt is started; the first to
+    succeed wins and the other is cancelled, or discarded when it finishes if it
+    cannot be cancelled.
+
+    Every operation earns budget hedge credits and every hedge spends one, so
+    over a run at most a budget fraction of the operations is duplicated.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95,
+        budget: float = 0.05,
+        max_workers: int = 8,
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            name: Operation type, used in the statistics
+            percentile: Percentile of recent latencies after which a hedge is started
+            budget: Highest fraction of operations that may be hedged
+            max_workers: Threads for running attempts of blocking operations
+        """
+        self.name = name
+        self.percentile = percentile
+        self.budget = budget
+        self.max_workers = max_workers
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._credits = 0.0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.operations = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Get the seconds after which an operation is hedged, or None before enough samples."""
+        with self._lock:
+            if len(self._latencies) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+    def _start_operation(self) -> None:
+        """Count an operation and earn its share of hedge credits."""
+        with self._lock:
+            self.operations += 1
+            self._credits = min(MAX_HEDGE_CREDITS, self._credits + self.budget)
+
+    def _take_hedge_credit(self) -> bool:
+        """Spend a hedge credit if the budget allows another hedge."""
+        with self._lock:
+            if self._credits < 1:
+                return False
+            self._credits -= 1
+            self.hedges += 1
+            return True
+
+    def _finish_operation(self, started: float, hedge_won: bool) -> None:
+        """Record the latency of a successful operation."""
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def run(
+        self,
+        operation: Callable[[], Any],
+        discard: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """
+        Run a blocking operation with hedging.
+
+        Args:
+            operation: Callable performing one attempt
+            discard: Called with the result of a losing attempt, e.g. to close a response
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            Exception: The error of the first attempt if every attempt failed
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=f"hedge-{self.name}",
+                    )
+        self._start_operation()
+        started = time.monotonic()
+        primary = self._executor.submit(operation)
+        pending = {primary}
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, _ = wait(pending, timeout=delay)
+            if not done and self._take_hedge_credit():
+                pending.add(self._executor.submit(operation))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                    if discard is not None:
+                        loser.add_done_callback(
+                            lambda f: f.cancelled() or f.exception() or discard(f.result())
+                        )
+                for other in done - {future}:
+                    if discard is not None and other.exception() is None:
+                        discard(other.result())
+                self._finish_operation(started, future is not primary)
+                return future.result()
+        raise error
+
+    async def run_async(
+        self,
+        operation: Callable[[], Awaitable[Any]],
+        discard: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """
+        Run a coroutine operation with hedging; the losing attempt is cancelled.
+
+        Args:
+            operation: Callable returning a new awaitable for each attempt
+            discard: Called with the result of a losing attempt that finished anyway
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            Exception: The error of the first attempt if every attempt failed
+        """
+        self._start_operation()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(operation())
+        pending = {primary}
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and self._take_hedge_credit():
+                pending.add(asyncio.ensure_future(operation()))
+
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    for other in done - {task}:
+                        if discard is not None and other.exception() is None:
+                            discard(other.result())
+                    self._finish_operation(started, task is not primary)
+                    return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report how often operations were hedged.
+
+        Returns:
+            dict with 'operations', 'hedges', 'hedge_wins' and 'delay' (current hedge delay or None)
+        """
+        return {
+            "operations": self.operations,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "delay": self.hedge_delay(),
+        }
+
+    def close(self) -> None:
+        """Shut down the attempt threads without waiting for losing attempts."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,118 @@
+"""
+Local inventory module indexing the files already present in the download directory.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set, Tuple
+
+# Results of comparing a listed object with the local inventory
+INVENTORY_OK = "ok"
+INVENTORY_MISSING = "missing"
+INVENTORY_SIZE_MISMATCH = "size_mismatch"
+
+
+def _scan_directory(path: str) -> Tuple[List[Tuple[str, int, float]], List[str]]:
+    """
+    List one directory with os.scandir.
+
+    Returns:
+        Tuple of ([(file path, size, modification time), ...], [subdirectory paths])
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime))
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"Error scanning directory {path}: {e}")
+    return files, subdirs
+
+
+class LocalInventory:
+    """
+    In-memory index of file path to size and modification time for a download directory tree.
+
+    The tree is walked once with os.scandir, one directory per task on a thread
+    pool, so checking whether a listed file is already complete needs no
+    further filesystem calls.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize an empty inventory.
+
+        Args:
+            root: Download directory to scan
+        """
+        self.root = os.path.normpath(root)
+        self.files: Dict[str, int] = {}
+        self.mtimes: Dict[str, float] = {}
+        self.dirs: Set[str] = set()
+
+    def scan(self, max_workers: int = 8) -> int:
+        """
+        Walk the directory tree in parallel and rebuild the index.
+
+        Args:
+            max_workers: Number of directories listed concurrently
+
+        Returns:
+            int: Number of files indexed
+        """
+        self.files = {}
+        self.mtimes = {}
+        self.dirs = set()
+        if not os.path.isdir(self.root):
+            return 0
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            self.dirs.add(self.root)
+            pending = {pool.submit(_scan_directory, self.root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirs = future.result()
+                    for file_path, size, mtime in files:
+                        self.files[file_path] = size
+                        self.mtimes[file_path] = mtime
+                    for subdir in subdirs:
+                        self.dirs.add(subdir)
+                        pending.add(pool.submit(_scan_directory, subdir))
+        return len(self.files)
+
+    def size_of(self, file_path: str) -> Optional[int]:
+        """Get the indexed size of a file, or None if it was not found."""
+        return self.files.get(os.path.normpath(file_path))
+
+    def mtime_of(self, file_path: str) -> Optional[float]:
+        """Get the indexed modification time of a file, or None if it was not found."""
+        return self.mtimes.get(os.path.normpath(file_path))
+
+    def compare(self, file_path: str, expected_size: Optional[int]) -> str:
+        """
+        Compare a listed file with the index.
+
+        Args:
+            file_path: Local path of the file
+            expected_size: Listed size in bytes, None if unknown (any non-empty file matches)
+
+        Returns:
+            INVENTORY_OK, INVENTORY_MISSING or INVENTORY_SIZE_MISMATCH
+        """
+        actual_size = self.size_of(file_path)
+        if actual_size is None:
+            return INVENTORY_MISSING
+        if expected_size is None:
+            return INVENTORY_OK if actual_size > 0 else INVENTORY_SIZE_MISMATCH
+        if actual_size != expected_size:
+            return INVENTORY_SIZE_MISMATCH
+        return INVENTORY_OK
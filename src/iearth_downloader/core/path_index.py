@@ -0,0 +1,324 @@
+"""
+Path index module selecting catalog paths with a prefix trie.
+
+Selectors are matched against the trie one path component at a time, so
+selecting paths only visits the subtrees that can match instead of testing
+every flattened catalog path. A selector is one of:
+
+- a plain prefix, matched like str.startswith: "MODISwater2001-2022/200"
+- a glob, matched per path component, selecting the whole subtree of every
+  matching node; "*", "?" and "[...]" match within a component, "**" matches
+  any number of components and braces expand to alternatives or ranges:
+  "MODISwater2001-2022/20{08..12}/h2?v0*"
+- a regular expression prefixed with "re:", searched in the full path; if it
+  is anchored with "^" only the subtree of its literal prefix is searched:
+  "re:^MODISwater2001-2022/20(08|09)/"
+"""
+
+import fnmatch
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Prefix marking a selector as a regular expression
+REGEX_PREFIX = "re:"
+# Characters that make a selector a glob rather than a plain prefix
+GLOB_CHARS = set("*?[{")
+# Characters with a special meaning in a regular expression
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+_BRACE_RANGE = re.compile(r"^(-?\d+)\.\.(-?\d+)$")
+
+
+def normalize_path(path: str) -> str:
+    """Normalize slashes and strip surrounding whitespace and slashes."""
+    return path.strip().replace("\\", "/").strip("/")
+
+
+def expand_braces(pattern: str) -> List[str]:
+    """
+    Expand shell-style braces: "{a,b}" to alternatives and "{08..12}" to a
+    zero-padded numeric range. Unbalanced braces are kept literally.
+    """
+    start = pattern.find("{")
+    if start < 0:
+        return [pattern]
+    depth = 0
+    for end in range(start, len(pattern)):
+        if pattern[end] == "{":
+            depth += 1
+        elif pattern[end] == "}":
+            depth -= 1
+            if depth == 0:
+                break
+    else:
+        return [pattern]
+
+    body = pattern[start + 1 : end]
+    head, tail = pattern[:start], pattern[end + 1 :]
+    range_match = _BRACE_RANGE.match(body)
+    if range_match:
+        first, last = range_match.group(1), range_match.group(2)
+        width = max(len(first.lstrip("-")), len(last.lstrip("-")))
+        step = 1 if int(last) >= int(first) else -1
+        alternatives = [
+            str(number).zfill(width)
+            for number in range(int(first), int(last) + step, step)
+        ]
+    else:
+        alternatives = _split_alternatives(body)
+        if len(alternatives) < 2:
+            # "{x}" is not an expansion; keep the brace and expand the rest
+            return [head + "{" + rest for rest in expand_braces(body + "}" + tail)]
+
+    expanded = []
+    for alternative in alternatives:
+        expanded.extend(expand_braces(head + alternative + tail))
+    return expanded
+
+
+def _split_alternatives(body: str) -> List[str]:
+    """Split the body of a brace expression at its top-level commas."""
+    parts = []
+    depth = 0
+    current = ""
+    for char in body:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _regex_literal_prefix(pattern: str) -> str:
+    """
+    Get the literal text an anchored regular expression starts with.
+
+    Returns "" if the pattern has an alternation, as a branch after a "|"
+    does not have to start with the text of the first one.
+    """
+    escaped = in_class = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "|":
+            return ""
+    prefix = ""
+    for char in pattern[1:]:
+        if char in REGEX_SPECIAL:
+            # A quantifier applies to the previous character, which is then optional
+            if char in "*?{" and prefix:
+                prefix = prefix[:-1]
+            break
+        prefix += char
+    return prefix
+
+
+class _Node:
+    """Trie node: children by path component and the index of the path ending here."""
+
+    __slots__ = ("children", "index")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.index = -1
+
+
+class PathIndex:
+    """
+    Prefix trie over flattened catalog paths.
+
+    Paths are split into components once when the index is built; selections
+    return the original path strings in catalog order. Matching only uses the
+    node accessors (_root, _child, _children, _leaves, _path), so an index
+    stored elsewhere, like the compact catalog file, can reuse it by
+    overriding them.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()):
+        """
+        Build the index.
+
+        Args:
+            paths: Flattened catalog paths, in catalog order
+        """
+        self._paths: List[str] = []
+        self._root = _Node()
+        for path in paths:
+            self.add(path)
+
+    def add(self, path: str) -> None:
+        """Add a path to the index."""
+        node = self._root
+        for component in normalize_path(path).split("/"):
+            child = node.children.get(component)
+            if child is None:
+                child = node.children[component] = _Node()
+            node = child
+        if node.index < 0:
+            node.index = len(self._paths)
+            self._paths.append(path)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    @property
+    def paths(self) -> List[str]:
+        """All paths, in catalog order."""
+        return self._paths
+
+    def select(
+        self,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Select the paths matching any include selector and no exclude selector.
+
+        Args:
+            include: Selectors of the paths to keep; all paths if empty or None
+            exclude: Selectors of the paths to drop
+
+        Returns:
+            Matching paths in catalog order
+        """
+        include = [selector for selector in include or [] if selector.strip()]
+        exclude = [selector for selector in exclude or [] if selector.strip()]
+        if include:
+            selected: Set[int] = set()
+            for selector in include:
+                selected.update(self.match(selector))
+        else:
+            selected = set(self._leaves(self._root))
+        for selector in exclude:
+            selected.difference_update(self.match(selector))
+        return [self._path(key) for key in sorted(selected)]
+
+    def match(self, selector: str) -> Iterator[int]:
+        """
+        Yield the keys of the paths matching one selector; keys sort in catalog order.
+
+        Args:
+            selector: Plain prefix, glob or "re:" regular expression
+        """
+        if selector.startswith(REGEX_PREFIX):
+            yield from self._match_regex(selector[len(REGEX_PREFIX) :])
+            return
+        pattern = normalize_path(selector)
+        if GLOB_CHARS.isdisjoint(pattern):
+            # A trailing slash ends the prefix at a whole component
+            whole = selector.strip().replace("\\", "/").endswith("/")
+            yield from self._match_prefix(pattern, whole)
+            return
+        seen: Set[int] = set()
+        for expanded in expand_braces(pattern):
+            components = [
+                component
+                if component == "**" or GLOB_CHARS.isdisjoint(component)
+                else re.compile(fnmatch.translate(component))
+                for component in expanded.split("/")
+            ]
+            for node in self._match_components(self._root, components):
+                for key in self._leaves(node):
+                    if key not in seen:
+                        seen.add(key)
+                        yield key
+
+    def _match_prefix(self, prefix: str, whole: bool = False) -> Iterator[int]:
+        """
+        Yield the paths starting with prefix.
+
+        Args:
+            prefix: Normalized prefix; its last component may be partial
+            whole: Require the last component to match completely
+        """
+        if not prefix:
+            yield from self._leaves(self._root)
+            return
+        *components, last = prefix.split("/")
+        node = self._root
+        for component in components:
+            node = self._child(node, component)
+            if node is None:
+                return
+        if whole:
+            child = self._child(node, last)
+            if child is not None:
+                yield from self._leaves(child)
+            return
+        for name, child in self._children(node):
+            if name.startswith(last):
+                yield from self._leaves(child)
+
+    def _match_regex(self, pattern: str) -> Iterator[int]:
+        """Yield the paths a regular expression finds a match in."""
+        regex = re.compile(pattern)
+        if pattern.startswith("^"):
+            candidates = self._match_prefix(_regex_literal_prefix(pattern))
+        else:
+            candidates = self._leaves(self._root)
+        for key in candidates:
+            if regex.search(normalize_path(self._path(key))):
+                yield key
+
+    def _match_components(self, node, components: list) -> Iterator:
+        """Yield the nodes whose path below node matches the glob components, without recursion."""
+        visited: Set[tuple] = set()
+        stack = [(node, 0)]
+        while stack:
+            node, position = stack.pop()
+            key = (node, position)
+            if key in visited:
+                continue
+            visited.add(key)
+            if position == len(components):
+                yield node
+                continue
+            component = components[position]
+            if isinstance(component, str):
+                if component == "**":
+                    # Zero components, or one more component and "**" again
+                    stack.append((node, position + 1))
+                    stack.extend((child, position) for _, child in self._children(node))
+                    continue
+                child = self._child(node, component)
+                if child is not None:
+                    stack.append((child, position + 1))
+                continue
+            stack.extend(
+                (child, position + 1)
+                for name, child in self._children(node)
+                if component.match(name)
+            )
+
+    def _child(self, node: _Node, name: str) -> Optional[_Node]:
+        """Get the child of a node with the given name, or None."""
+        return node.children.get(name)
+
+    def _children(self, node: _Node) -> Iterator[Tuple[str, _Node]]:
+        """Yield (name, child) for the children of a node, in catalog order."""
+        return iter(node.children.items())
+
+    def _leaves(self, node: _Node) -> Iterator[int]:
+        """Yield the keys of all paths in the subtree of a node, without recursion."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.index >= 0:
+                yield current.index
+            stack.extend(reversed(list(current.children.values())))
+
+    def _path(self, key: int) -> str:
+        """Get the path with the given key."""
+        return self._paths[key]
@@ -0,0 +1,197 @@
+"""
+Retry module scheduling failed downloads again with backoff and recording exhausted tasks.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from iearth_downloader.core.task import DownloadTask
+
+# HTTP status codes that will not change on retry: the object is missing or the request is invalid
+PERMANENT_STATUS_CODES = (400, 404, 410)
+
+
+def is_retryable(status_code: Optional[int]) -> bool:
+    """
+    Classify a failure by the HTTP status of the response that caused it.
+
+    Failures without a response (connection errors, timeouts, truncated or
+    invalid files) are retryable, as are throttling, server errors and
+    rejected signed URLs, which are re-resolved on the next attempt.
+    """
+    return status_code not in PERMANENT_STATUS_CODES
+
+
+def compute_backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Get the delay before a retry using exponential backoff with jitter.
+
+    The delay doubles with every attempt up to max_delay, and a random half of
+    it is jittered so tasks that failed together do not retry together.
+
+    Args:
+        attempt: Number of failed attempts so far, from 1
+        base_delay: Delay in seconds after the first failure
+        max_delay: Upper bound of the delay in seconds
+
+    Returns:
+        Delay in seconds
+    """
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RetryScheduler:
+    """
+    Delay queue handing failed tasks back to the download pipeline once their backoff has passed.
+
+    Scheduling never blocks, so workers return to the queue immediately instead
+    of sleeping while they hold a task. A background thread waits for the
+    earliest due task and passes it to the requeue callback.
+    """
+
+    def __init__(self, requeue: Callable[[DownloadTask], None]):
+        """
+        Initialize the scheduler and start its thread.
+
+        Args:
+            requeue: Called with each task when it is due; may block while the pipeline is full
+        """
+        self._requeue = requeue
+        self._heap: List = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self.scheduled = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, task: DownloadTask, delay: float) -> None:
+        """Queue a task to be handed back after delay seconds."""
+        with self._condition:
+            heapq.heappush(
+                self._heap, (time.monotonic() + delay, next(self._counter), task)
+            )
+            self.scheduled += 1
+            self._condition.notify()
+
+    def _run(self) -> None:
+        """Scheduler thread: hand back tasks as they become due."""
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if self._stopped:
+                    return
+                _, _, task = heapq.heappop(self._heap)
+            self._requeue(task)
+
+    def stop(self) -> None:
+        """Stop the scheduler thread; tasks still waiting are dropped."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+
+class DeadLetterLog:
+    """
+    JSON-lines file of tasks that failed permanently or ran out of retries.
+
+    Each line holds what is needed to download the object again without the
+    catalog, so the file can be re-run on its own.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Initialize the log.
+
+        Args:
+            file_path: Path of the dead-letter file
+        """
+        self.file_path = file_path
+        self.count = 0
+        self._lock = threading.Lock()
+        # Length of the file read by take_entries, None if nothing is being re-run
+        self._taken_length: Optional[int] = None
+
+    def append(self, task: DownloadTask, error: str) -> None:
+        """Record a task that will not be retried in this run."""
+        entry = {
+            "fullpath": task.fullpath,
+            "filename": task.filename,
+            "local_path": task.local_path,
+            "size": task.size,
+            "attempts": task.attempts,
+            "error": error,
+        }
+        with self._lock:
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.count += 1
+
+    def take_entries(self) -> List[Dict]:
+        """
+        Read all recorded tasks for a re-run.
+
+        The file is kept, and tasks that fail again are appended to it, until
+        complete_rerun() drops the entries read here. If the re-run is
+        interrupted, the file still lists every task.
+
+        Returns:
+            List of dead-letter entries, deduplicated by fullpath (last entry wins)
+        """
+        if not os.path.exists(self.file_path):
+            return []
+        entries: Dict[str, Dict] = {}
+        with self._lock:
+            with open(self.file_path, "rb") as f:
+                data = f.read()
+            self._taken_length = len(data)
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print(f"Skipping invalid dead-letter entry: {line}")
+                continue
+            entries[entry["fullpath"]] = entry
+        return list(entries.values())
+
+    def complete_rerun(self) -> None:
+        """
+        Drop the entries read by take_entries after their re-run finished.
+
+        The file is rewritten with only the tasks that failed again, or removed
+        if none did.
+        """
+        with self._lock:
+            if self._taken_length is None:
+                return
+            taken_length, self._taken_length = self._taken_length, None
+            if not os.path.exists(self.file_path):
+                return
+            with open(self.file_path, "rb") as f:
+                f.seek(taken_length)
+                failed_again = f.read()
+            if not failed_again:
+                os.remove(self.file_path)
+                return
+            temp_path = self.file_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(failed_again)
+            os.replace(temp_path, self.file_path)
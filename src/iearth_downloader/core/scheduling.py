@@ -0,0 +1,71 @@
+"""
+Scheduling module ordering download tasks by size within a bounded lookahead window.
+"""
+
+import heapq
+import itertools
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from iearth_downloader.core.downloader import parse_expected_size
+from iearth_downloader.core.task import DownloadTask
+
+FIFO = "fifo"
+LARGEST_FIRST = "largest-first"
+SMALLEST_FIRST = "smallest-first"
+
+
+def _task_size(task: DownloadTask) -> int:
+    """Get the listed size of a task, 0 if unknown."""
+    return parse_expected_size(task.size) or 0
+
+
+# Priority of a task under each policy, lowest first; None keeps the catalog order
+SCHEDULING_POLICIES: Dict[str, Optional[Callable[[DownloadTask], float]]] = {
+    FIFO: None,
+    LARGEST_FIRST: lambda task: -_task_size(task),
+    SMALLEST_FIRST: _task_size,
+}
+
+
+def schedule_tasks(
+    tasks: Iterable[DownloadTask], policy: str, window: int
+) -> Iterator[DownloadTask]:
+    """
+    Reorder a stream of tasks by a scheduling policy.
+
+    Up to window tasks are held in a priority heap; each further task from the
+    catalog releases the highest-priority held task. Memory stays bounded by
+    window regardless of the catalog size, and tasks are still produced while
+    the catalog is being enumerated. Ties keep the catalog order.
+
+    Args:
+        tasks: Tasks in catalog order
+        policy: Name of a policy in SCHEDULING_POLICIES
+        window: Number of tasks to look ahead, 1 or less keeps the catalog order
+
+    Yields:
+        DownloadTask in scheduled order
+
+    Raises:
+        ValueError: If the policy is unknown
+    """
+    if policy not in SCHEDULING_POLICIES:
+        raise ValueError(
+            f"Unknown scheduling policy: {policy} "
+            f"(expected one of {', '.join(SCHEDULING_POLICIES)})"
+        )
+    priority = SCHEDULING_POLICIES[policy]
+    if priority is None or window <= 1:
+        yield from tasks
+        return
+
+    heap = []
+    counter = itertools.count()
+    for task in tasks:
+        entry = (priority(task), next(counter), task)
+        if len(heap) < window:
+            heapq.heappush(heap, entry)
+            continue
+        yield heapq.heappushpop(heap, entry)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
@@ -0,0 +1,85 @@
+"""
+Sharding module splitting one download job across several machines by stable hashing.
+"""
+
+import glob
+import hashlib
+import os
+import re
+from typing import List, Optional, Tuple
+
+# Granularity of the partition: single files or whole catalog paths
+SHARD_BY_FILE = "file"
+SHARD_BY_PATH = "path"
+SHARD_BY_CHOICES = (SHARD_BY_FILE, SHARD_BY_PATH)
+
+# Infix of the per-shard output files, e.g. download_state_id_9.shard2of4.sqlite
+SHARD_FILE_INFIX = ".shard{}of{}"
+SHARD_FILE_RE = re.compile(r"\.shard(\d+)of(\d+)$")
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification "i/N", numbered from 1.
+
+    Returns:
+        Tuple of (index, count)
+
+    Raises:
+        ValueError: If the specification is malformed or the index is out of range
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N such as 1/4") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}', index must be between 1 and {count}")
+    return index, count
+
+
+def shard_of(key: str, count: int) -> int:
+    """
+    Get the shard a key belongs to, numbered from 1.
+
+    Uses a cryptographic hash rather than hash(), which is salted per process,
+    so every machine assigns every key to the same shard.
+    """
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def in_shard(key: str, shard: Optional[Tuple[int, int]]) -> bool:
+    """Check whether a key belongs to the given (index, count) shard; True if not sharded."""
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(key, count) == index
+
+
+def shard_file_path(file_path: str, shard: Tuple[int, int]) -> str:
+    """Get the per-shard name of an output file, keeping its extension."""
+    root, ext = os.path.splitext(file_path)
+    return root + SHARD_FILE_INFIX.format(*shard) + ext
+
+
+def find_shard_files(file_path: str, directories: List[str]) -> List[Tuple[str, int, int]]:
+    """
+    Find the per-shard versions of an output file in the given directories.
+
+    Args:
+        file_path: Path of the unsharded file; only its name is used
+        directories: Directories to search
+
+    Returns:
+        List of (path, index, count), sorted by index
+    """
+    root, ext = os.path.splitext(os.path.basename(file_path))
+    found = []
+    for directory in directories:
+        pattern = os.path.join(glob.escape(directory), glob.escape(root) + ".shard*of*" + ext)
+        for path in glob.glob(pattern):
+            name = os.path.basename(path)[: len(os.path.basename(path)) - len(ext)]
+            match = SHARD_FILE_RE.search(name)
+            if match is not None and name[: match.start()] == root:
+                found.append((path, int(match.group(1)), int(match.group(2))))
+    return sorted(found, key=lambda item: (item[1], item[0]))
@@ -0,0 +1,362 @@
+"""
+Download state module keeping one durable row per object in a SQLite database.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+# Object statuses stored in the database
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+# Columns of the objects table, in the order of the rows returned by iter_objects
+OBJECT_COLUMNS = (
+    "fullpath",
+    "status",
+    "expected_size",
+    "bytes_written",
+    "attempts",
+    "last_error",
+    "checksum",
+    "updated_at",
+    "server_checksum",
+)
+# Queued to the writer thread by close() to stop it
+_STOP = object()
+
+
+def trim_fullpath(fullpath: str) -> str:
+    """
+    Remove the first two directory levels ('shared-dataset/<type>') from an object key.
+    This is the path format of the downloaded files log.
+    """
+    path_parts = fullpath.split("/")
+    if len(path_parts) > 2:
+        return "/".join(path_parts[2:])
+    return fullpath
+
+
+class DownloadStateStore:
+    """
+    Durable per-object download state in SQLite (WAL mode).
+
+    Each object has a row with its status, expected size, bytes written,
+    attempt count, last error, the sha256 computed while downloading and the
+    ETag or checksum returned by the storage server. Updates are queued and written
+    in batches by a background thread, so workers never wait on the database.
+    """
+
+    # Write a batch once this many updates are queued
+    BATCH_SIZE = 500
+    # Write pending updates at least this often (seconds)
+    FLUSH_INTERVAL = 2.0
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the state database and start the writer thread.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS objects (
+                fullpath TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                expected_size INTEGER,
+                bytes_written INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                checksum TEXT,
+                updated_at REAL NOT NULL,
+                server_checksum TEXT
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(objects)")}
+        if "server_checksum" not in columns:
+            # Databases created before server checksums were recorded
+            self._conn.execute("ALTER TABLE objects ADD COLUMN server_checksum TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS objects_status ON objects (status)"
+        )
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+        self._updates: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def record_completed(
+        self,
+        fullpath: str,
+        expected_size: Optional[int],
+        bytes_written: int,
+        checksum: Optional[str] = None,
+        attempted: bool = True,
+        server_checksum: Optional[str] = None,
+    ) -> None:
+        """
+        Queue an update marking an object as completed.
+
+        Args:
+            fullpath: Object key
+            expected_size: Listed size in bytes, if known
+            bytes_written: Size of the file on disk
+            checksum: Optional sha256 hex digest of the file
+            attempted: False if the file was already present and no transfer was made
+            server_checksum: Optional ETag and checksum headers returned by the server
+        """
+        self._updates.put(
+            (
+                fullpath,
+                STATUS_COMPLETED,
+                expected_size,
+                bytes_written,
+                1 if attempted else 0,
+                None,
+                checksum,
+                time.time(),
+                server_checksum,
+            )
+        )
+
+    def record_failed(
+        self,
+        fullpath: str,
+        expected_size: Optional[int],
+        bytes_written: int,
+        error: str,
+        attempted: bool = True,
+    ) -> None:
+        """
+        Queue an update marking an object as failed.
+
+        Args:
+            fullpath: Object key
+            expected_size: Listed size in bytes, if known
+            bytes_written: Bytes on disk for this object
+            error: Description of the failure
+            attempted: False if the object was found invalid without a download attempt
+        """
+        self._updates.put(
+            (
+                fullpath,
+                STATUS_FAILED,
+                expected_size,
+                bytes_written,
+                1 if attempted else 0,
+                error,
+                None,
+                time.time(),
+                None,
+            )
+        )
+
+    def _write_loop(self) -> None:
+        """Writer thread: collect queued updates and commit them in batches until stopped."""
+        stopped = False
+        while not stopped:
+            batch = []
+            waiters = []
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    item = self._updates.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopped = True
+                    break
+                if isinstance(item, threading.Event):
+                    # flush() marker: write everything queued before it now
+                    waiters.append(item)
+                    break
+                batch.append(item)
+            if batch:
+                self._write_batch(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write_batch(self, batch) -> None:
+        """Upsert a batch of updates in a single transaction."""
+        with self._db_lock:
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO objects (
+                        fullpath, status, expected_size, bytes_written,
+                        attempts, last_error, checksum, updated_at, server_checksum
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (fullpath) DO UPDATE SET
+                        status = excluded.status,
+                        expected_size = COALESCE(excluded.expected_size, objects.expected_size),
+                        bytes_written = excluded.bytes_written,
+                        attempts = objects.attempts + excluded.attempts,
+                        last_error = excluded.last_error,
+                        checksum = CASE
+                            WHEN excluded.status = 'failed' THEN NULL
+                            ELSE COALESCE(excluded.checksum, objects.checksum)
+                        END,
+                        updated_at = excluded.updated_at,
+                        server_checksum = COALESCE(
+                            excluded.server_checksum, objects.server_checksum
+                        )
+                    """,
+                    batch,
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing download state to {self.db_path}: {e}")
+
+    def flush(self) -> None:
+        """Block until every update queued so far has been committed."""
+        marker = threading.Event()
+        self._updates.put(marker)
+        marker.wait()
+
+    def completed_objects(self) -> Set[str]:
+        """Get the object keys of all completed objects."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT fullpath FROM objects WHERE status = ?", (STATUS_COMPLETED,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def iter_objects(self, status: Optional[str] = None) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate over stored objects.
+
+        Yields:
+            Tuples of (fullpath, status, expected_size, bytes_written, attempts,
+            last_error, checksum, updated_at, server_checksum)
+        """
+        sql = (
+            "SELECT fullpath, status, expected_size, bytes_written, attempts, "
+            "last_error, checksum, updated_at, server_checksum FROM objects"
+        )
+        params: Tuple[Any, ...] = ()
+        if status is not None:
+            sql += " WHERE status = ?"
+            params = (status,)
+        with self._db_lock:
+            rows = self._conn.execute(sql + " ORDER BY fullpath", params).fetchall()
+        yield from rows
+
+    def merge_from(self, db_path: str) -> int:
+        """
+        Merge the objects of another state database, such as the state of one shard.
+
+        A completed object is never replaced by a failed one; otherwise the most
+        recently updated row wins, so merging the same database twice changes nothing.
+
+        Args:
+            db_path: Path of the SQLite database to merge
+
+        Returns:
+            int: Number of objects read from the other database
+        """
+        self.flush()
+        # Read only, so merging never modifies the other database
+        other = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            present = {row[1] for row in other.execute("PRAGMA table_info(objects)")}
+            # Columns missing from databases of older versions are read as NULL
+            columns = ", ".join(
+                column if column in present else f"NULL AS {column}"
+                for column in OBJECT_COLUMNS
+            )
+            rows = other.execute(f"SELECT {columns} FROM objects").fetchall()
+        finally:
+            other.close()
+        with self._db_lock:
+            self._conn.executemany(
+                """
+                INSERT INTO objects (
+                    fullpath, status, expected_size, bytes_written,
+                    attempts, last_error, checksum, updated_at, server_checksum
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (fullpath) DO UPDATE SET
+                    status = excluded.status,
+                    expected_size = COALESCE(excluded.expected_size, objects.expected_size),
+                    bytes_written = excluded.bytes_written,
+                    attempts = excluded.attempts,
+                    last_error = excluded.last_error,
+                    checksum = excluded.checksum,
+                    updated_at = excluded.updated_at,
+                    server_checksum = COALESCE(excluded.server_checksum, objects.server_checksum)
+                WHERE (excluded.status = 'completed' AND objects.status != 'completed')
+                    OR (
+                        (excluded.status = 'completed' OR objects.status != 'completed')
+                        AND excluded.updated_at > objects.updated_at
+                    )
+                """,
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def status_counts(self) -> Dict[str, int]:
+        """Get the number of objects per status."""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM objects GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def export_finished_log(self, log_file: str) -> int:
+        """
+        Export completed objects in the format of the old downloaded files log.
+
+        Args:
+            log_file: Path of the text file to write
+
+        Returns:
+            int: Number of paths written
+        """
+        count = 0
+        with open(log_file, "w", encoding="utf-8") as f:
+            for row in self.iter_objects(STATUS_COMPLETED):
+                f.write(f"{trim_fullpath(row[0])}\n")
+                count += 1
+        return count
+
+    def export_manifest(self, manifest_file: str) -> int:
+        """
+        Export an integrity manifest of the completed objects.
+
+        Each line holds the path (in the format of the downloaded files log), the
+        size on disk, the sha256 digest and the ETag or checksum returned by the
+        server, separated by tabs; unknown values are left empty.
+
+        Args:
+            manifest_file: Path of the manifest to write
+
+        Returns:
+            int: Number of objects written
+        """
+        count = 0
+        with open(manifest_file, "w", encoding="utf-8") as f:
+            f.write("# path\tsize\tsha256\tserver_checksum\n")
+            for row in self.iter_objects(STATUS_COMPLETED):
+                fullpath, _, _, bytes_written, _, _, checksum, _, server_checksum = row
+                f.write(
+                    f"{trim_fullpath(fullpath)}\t{bytes_written}\t"
+                    f"{checksum or ''}\t{server_checksum or ''}\n"
+                )
+                count += 1
+        return count
+
+    def close(self) -> None:
+        """Write pending updates, stop the writer thread and close the database."""
+        self._updates.put(_STOP)
+        self._writer.join()
+        with self._db_lock:
+            self._conn.close()
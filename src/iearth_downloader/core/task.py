@@ -0,0 +1,31 @@
+"""
+Download task module describing a single file queued for download.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class DownloadTask:
+    """A file queued for download, optionally carrying its resolved signed URL."""
+
+    fullpath: str
+    filename: str
+    local_path: str
+    size: Any = 0
+    signed_url: Optional[str] = None
+    url_expires_at: Optional[float] = None
+    # Set when the local inventory already found the file missing or incomplete
+    local_checked: bool = False
+    # Failed download attempts so far in this run
+    attempts: int = 0
+    # Resource the object belongs to, None for the processor's own resource
+    resource_id: Optional[int] = None
+
+    def url_expires_within(self, seconds: float) -> bool:
+        """Check whether the resolved URL is missing or expires within the given seconds."""
+        if self.signed_url is None or self.url_expires_at is None:
+            return True
+        return self.url_expires_at - time.time() < seconds
@@ -4,7 +4,13 @@ Main entry point for the data download script.
 
 import argparse
 import sys
-from iearth_downloader.core.download_processor import DownloadProcessor
+from iearth_downloader.core.batch_processor import (
+    create_batch_processor,
+    load_job_file,
+    parse_resource_ids,
+)
+from iearth_downloader.core.download_processor import create_download_processor
+from iearth_downloader.core.sharding import SHARD_BY_CHOICES, parse_shard
 from iearth_downloader.utils import auth
 
 
@@ -31,8 +37,13 @@ def main():
     # Resource ID for the dataset to download
     parser.add_argument(
         "--resource-id",
-        type=int,
-        help="Resource ID for the dataset to download (default from config.py)",
+        type=str,
+        help="Resource ID for the dataset to download, or a comma-separated list such as 9,13,26 for a batch run (default from config.py)",
+    )
+    parser.add_argument(
+        "--job-file",
+        type=str,
+        help="TOML file listing the resources of a batch run as [[jobs]] with resource_id and optional target_sub_path",
     )
 
     # Target sub-path filter
@@ -41,8 +52,189 @@ def main():
         type=str,
         help="Specify a sub-path to filter downloads from the catalog (default from config.py)",
     )
+    parser.add_argument(
+        "--include",
+        action="append",
+        help="Only download catalog paths matching this prefix, glob such as 'MODISwater2001-2022/20{08..12}/h2?v0*' or 're:' regex; repeatable",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        help="Skip catalog paths matching this prefix, glob or 're:' regex; repeatable",
+    )
+    parser.add_argument(
+        "--export-catalog-json",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Also write the fetched catalog as JSON next to the compact catalog file (default from system.ini)",
+    )
+
+    # Retries
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        help="Retries per file after a retryable failure, with exponential backoff (default from system.ini)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        help="Seconds to wait for data on an open connection before the request fails (default from system.ini)",
+    )
+    parser.add_argument(
+        "--min-rate-kb",
+        type=float,
+        help="Abort and retry transfers averaging less than this many KB/s, 0 disables (default from system.ini)",
+    )
+    parser.add_argument(
+        "--retry-dead-letter",
+        action="store_true",
+        help="Only download the files recorded in the dead-letter file by earlier runs",
+    )
+
+    # Adaptive concurrency
+    parser.add_argument(
+        "--adaptive",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Adjust the number of active transfers between --min-threads and --max-threads from latency, errors and throttling (default from system.ini)",
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=["fifo", "largest-first", "smallest-first"],
+        help="Order of the download queue: 'fifo' (catalog order), 'largest-first' or 'smallest-first' (default from system.ini)",
+    )
+    parser.add_argument(
+        "--hedge",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Send a duplicate of signed-URL and transfer requests slower than a percentile of recent ones; the first response wins (default from system.ini)",
+    )
+    parser.add_argument(
+        "--min-threads",
+        type=int,
+        help="Lowest number of active transfers with --adaptive (default from system.ini)",
+    )
+
+    # Segments per large file
+    parser.add_argument(
+        "--segments",
+        type=int,
+        help="Concurrent byte-range segments per large file, 1 disables (default from system.ini)",
+    )
+
+    # URL resolver threads
+    parser.add_argument(
+        "--resolvers",
+        type=int,
+        help="Threads resolving signed URLs ahead of the transfer threads (default from system.ini)",
+    )
+
+    # Catalog enumeration
+    parser.add_argument(
+        "--enum-threads",
+        type=int,
+        help="Threads fetching file lists of catalog paths concurrently (default from system.ini)",
+    )
+    parser.add_argument(
+        "--file-list-concurrency",
+        type=int,
+        help="Maximum concurrent requests to the file-list API (default from system.ini)",
+    )
+
+    # Rate limits
+    parser.add_argument(
+        "--api-rate",
+        type=float,
+        help="Maximum requests per second to the download API, 0 for unlimited (default from system.ini)",
+    )
+    parser.add_argument(
+        "--file-list-rate",
+        type=float,
+        help="Maximum requests per second to the file-list API, 0 for unlimited (default from system.ini)",
+    )
+    parser.add_argument(
+        "--max-rate-mb",
+        type=float,
+        help="Maximum total download bandwidth in MB/s, 0 for unlimited (default from system.ini)",
+    )
+
+    # Incremental sync
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Only enumerate and download catalog paths added since the previous catalog snapshot",
+    )
+
+    # File list cache
+    parser.add_argument(
+        "--refresh-listing",
+        action="store_true",
+        help="Ignore cached file lists and fetch every catalog path from the API again",
+    )
+
+    # Signed URL cache persistence
+    parser.add_argument(
+        "--persist-url-cache",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Save signed download URLs in the download directory so a restart can reuse them (default from system.ini)",
+    )
+
+    # Local inventory preflight and verification
+    parser.add_argument(
+        "--preflight",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Scan the download directory once and only queue missing or incomplete files (default from system.ini)",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Only compare the listed files with the download directory and write a report, without downloading",
+    )
+    parser.add_argument(
+        "--rehash",
+        action="store_true",
+        help="With --verify, also re-hash complete files with no recorded sha256 or a changed size or modification time",
+    )
+
+    # Sharding across machines
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="Download only share i of N of the job, e.g. 2/4, assigned by a stable hash so every machine gets a disjoint share",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=list(SHARD_BY_CHOICES),
+        help="Shard by single files ('file') or whole catalog paths ('path') (default from system.ini)",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="Only merge the state of all shards of the job into one state database and write a completeness report",
+    )
+    parser.add_argument(
+        "--shard-dirs",
+        type=str,
+        help="Comma-separated download directories of shards with separate storage, searched by --merge-shards",
+    )
+
+    # Download engine
+    parser.add_argument(
+        "--engine",
+        choices=["thread", "async"],
+        default="thread",
+        help="Download engine: 'thread' (one thread per transfer) or 'async' (asyncio, requires aiohttp)",
+    )
 
     args = parser.parse_args()
+    if args.engine == "async" and args.segments is not None:
+        # The async engine downloads every file as a single stream
+        parser.error("--segments is only supported by the thread engine")
+    if args.engine == "async" and args.resolvers is not None:
+        # Async workers resolve the signed URL of each task themselves
+        parser.error("--resolvers is only used by the thread engine")
 
     # User authentication
     print("=== User authentication ===")
@@ -52,6 +244,90 @@ def main():
 
     print("\nAuthentication successful！")
 
+    # Prepare configuration overrides
+    config_overrides = {}
+    if args.max_threads is not None:
+        config_overrides["max_threads"] = args.max_threads
+    if args.target_sub_path is not None:
+        config_overrides["target_sub_path"] = args.target_sub_path
+    if args.include:
+        config_overrides["include_paths"] = args.include
+    if args.exclude:
+        config_overrides["exclude_paths"] = args.exclude
+    if args.export_catalog_json is not None:
+        config_overrides["export_catalog_json"] = args.export_catalog_json
+    if args.max_retries is not None:
+        config_overrides["max_retries"] = args.max_retries
+    if args.read_timeout is not None:
+        config_overrides["read_timeout"] = args.read_timeout
+    if args.min_rate_kb is not None:
+        config_overrides["min_transfer_rate_kb"] = args.min_rate_kb
+    if args.adaptive is not None:
+        config_overrides["adaptive_concurrency"] = args.adaptive
+    if args.schedule is not None:
+        config_overrides["scheduling_policy"] = args.schedule
+    if args.hedge is not None:
+        config_overrides["hedged_requests"] = args.hedge
+    if args.min_threads is not None:
+        config_overrides["min_threads"] = args.min_threads
+    if args.segments is not None:
+        config_overrides["max_segments"] = args.segments
+    if args.resolvers is not None:
+        config_overrides["resolver_threads"] = args.resolvers
+    if args.enum_threads is not None:
+        config_overrides["enumeration_threads"] = args.enum_threads
+    if args.file_list_concurrency is not None:
+        config_overrides["file_list_api_concurrency"] = args.file_list_concurrency
+    if args.api_rate is not None:
+        config_overrides["download_api_rate"] = args.api_rate
+    if args.file_list_rate is not None:
+        config_overrides["file_list_api_rate"] = args.file_list_rate
+    if args.max_rate_mb is not None:
+        config_overrides["max_download_rate_mb"] = args.max_rate_mb
+    if args.sync:
+        config_overrides["sync"] = True
+    if args.refresh_listing:
+        config_overrides["refresh_listing"] = True
+    if args.persist_url_cache is not None:
+        config_overrides["persist_url_cache"] = args.persist_url_cache
+    if args.preflight is not None:
+        config_overrides["inventory_preflight"] = args.preflight
+    if args.shard is not None:
+        if args.merge_shards:
+            parser.error("--merge-shards combines all shards and cannot be used with --shard")
+        config_overrides["shard"] = args.shard
+    if args.shard_by is not None:
+        config_overrides["shard_by"] = args.shard_by
+    config_overrides["engine"] = args.engine
+
+    # A job file or several resource IDs select a batch run sharing one set of workers
+    jobs = None
+    if args.job_file is not None:
+        jobs = load_job_file(args.job_file)
+    elif args.resource_id is not None:
+        jobs = parse_resource_ids(args.resource_id)
+
+    def create_processor():
+        if jobs:
+            return create_batch_processor(
+                jobs, custom_download_path=args.download_path, config_overrides=config_overrides
+            )
+        return create_download_processor(
+            custom_download_path=args.download_path, config_overrides=config_overrides
+        )
+
+    if args.verify:
+        print("\n=== Start verification ===")
+        processor = create_processor()
+        processor.run_verify(args.rehash)
+        return
+
+    if args.merge_shards:
+        print("\n=== Start shard merge ===")
+        processor = create_processor()
+        processor.run_merge_shards(args.shard_dirs.split(",") if args.shard_dirs else None)
+        return
+
     confirmation = (
         input("Whether to start downloading task immediately？([y]/n): ")
         .strip()
@@ -64,20 +340,12 @@ def main():
 
     print("\n=== Start download task ===")
 
-    # Prepare configuration overrides
-    config_overrides = {}
-    if args.max_threads is not None:
-        config_overrides["max_threads"] = args.max_threads
-    if args.resource_id is not None:
-        config_overrides["resource_id"] = args.resource_id
-    if args.target_sub_path is not None:
-        config_overrides["target_sub_path"] = args.target_sub_path
-
     # Create processor with optional custom download path and config overrides
-    processor = DownloadProcessor(
-        custom_download_path=args.download_path, config_overrides=config_overrides
-    )
-    processor.run_full_process()
+    processor = create_processor()
+    if args.retry_dead_letter:
+        processor.run_dead_letter()
+    else:
+        processor.run_full_process()
 
 
 if __name__ == "__main__":
@@ -3,19 +3,60 @@ from __future__ import annotations
 import typer
 import sys
 import os
+from enum import Enum
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .core.download_processor import DownloadProcessor
+    from .core.batch_processor import (
+        create_batch_processor,
+        load_job_file,
+        parse_resource_ids,
+    )
+    from .core.download_processor import create_download_processor
     from .utils import auth
 
 app = typer.Typer(help="iEarth Data Download CLI")
 
 
+class SchedulePolicy(str, Enum):
+    """Values of --schedule, the keys of core.scheduling.SCHEDULING_POLICIES."""
+
+    fifo = "fifo"
+    largest_first = "largest-first"
+    smallest_first = "smallest-first"
+
+
+class ShardBy(str, Enum):
+    """Values of --shard-by, as in core.sharding.SHARD_BY_CHOICES."""
+
+    file = "file"
+    path = "path"
+
+
+def _parse_shard_option(value: str | None):
+    """Parse --shard into (index, count), reporting an invalid value as a usage error."""
+    if value is None:
+        return None
+    from iearth_downloader.core.sharding import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from None
+
+
 def _init_imports():
-    globals()["DownloadProcessor"] = __import__(
-        "iearth_downloader.core.download_processor", fromlist=["DownloadProcessor"]
-    ).DownloadProcessor
+    globals()["create_download_processor"] = __import__(
+        "iearth_downloader.core.download_processor",
+        fromlist=["create_download_processor"],
+    ).create_download_processor
+    batch_processor = __import__(
+        "iearth_downloader.core.batch_processor",
+        fromlist=["create_batch_processor"],
+    )
+    globals()["create_batch_processor"] = batch_processor.create_batch_processor
+    globals()["load_job_file"] = batch_processor.load_job_file
+    globals()["parse_resource_ids"] = batch_processor.parse_resource_ids
     globals()["auth"] = __import__("iearth_downloader.utils.auth", fromlist=["auth"])
 
 
@@ -33,11 +74,16 @@ def download(
         "-m",
         help="Number of concurrent download threads (default from config.py)",
     ),
-    resource_id: int | None = typer.Option(
+    resource_id: str | None = typer.Option(
         None,
         "--resource-id",
         "-id",
-        help="Resource ID for the dataset to download (default from config.py)",
+        help="Resource ID for the dataset to download, or a comma-separated list such as 9,13,26 for a batch run (default from config.py)",
+    ),
+    job_file: str | None = typer.Option(
+        None,
+        "--job-file",
+        help="TOML file listing the resources of a batch run as [[jobs]] with resource_id and optional target_sub_path",
     ),
     target_sub_path: str | None = typer.Option(
         None,
@@ -45,6 +91,154 @@ def download(
         "-sp",
         help="Specify a sub-path to filter downloads from the catalog (default from config.py)",
     ),
+    include: list[str] | None = typer.Option(
+        None,
+        "--include",
+        help="Only download catalog paths matching this prefix, glob such as 'MODISwater2001-2022/20{08..12}/h2?v0*' or 're:' regex; repeatable",
+    ),
+    exclude: list[str] | None = typer.Option(
+        None,
+        "--exclude",
+        help="Skip catalog paths matching this prefix, glob or 're:' regex; repeatable",
+    ),
+    export_catalog_json: bool | None = typer.Option(
+        None,
+        "--export-catalog-json/--no-export-catalog-json",
+        help="Also write the fetched catalog as JSON next to the compact catalog file (default from system.ini)",
+    ),
+    max_retries: int | None = typer.Option(
+        None,
+        "--max-retries",
+        help="Retries per file after a retryable failure, with exponential backoff (default from system.ini)",
+    ),
+    read_timeout: float | None = typer.Option(
+        None,
+        "--read-timeout",
+        help="Seconds to wait for data on an open connection before the request fails (default from system.ini)",
+    ),
+    min_rate_kb: float | None = typer.Option(
+        None,
+        "--min-rate-kb",
+        help="Abort and retry transfers averaging less than this many KB/s, 0 disables (default from system.ini)",
+    ),
+    retry_dead_letter: bool = typer.Option(
+        False,
+        "--retry-dead-letter",
+        help="Only download the files recorded in the dead-letter file by earlier runs",
+    ),
+    adaptive: bool | None = typer.Option(
+        None,
+        "--adaptive/--no-adaptive",
+        help="Adjust the number of active transfers between --min-threads and --max-threads from latency, errors and throttling (default from system.ini)",
+    ),
+    schedule: SchedulePolicy | None = typer.Option(
+        None,
+        "--schedule",
+        help="Order of the download queue: 'fifo' (catalog order), 'largest-first' or 'smallest-first' (default from system.ini)",
+    ),
+    hedge: bool | None = typer.Option(
+        None,
+        "--hedge/--no-hedge",
+        help="Send a duplicate of signed-URL and transfer requests slower than a percentile of recent ones; the first response wins (default from system.ini)",
+    ),
+    min_threads: int | None = typer.Option(
+        None,
+        "--min-threads",
+        help="Lowest number of active transfers with --adaptive (default from system.ini)",
+    ),
+    segments: int | None = typer.Option(
+        None,
+        "--segments",
+        "-seg",
+        help="Concurrent byte-range segments per large file, 1 disables (default from system.ini)",
+    ),
+    resolvers: int | None = typer.Option(
+        None,
+        "--resolvers",
+        help="Threads resolving signed URLs ahead of the transfer threads (default from system.ini)",
+    ),
+    enum_threads: int | None = typer.Option(
+        None,
+        "--enum-threads",
+        help="Threads fetching file lists of catalog paths concurrently (default from system.ini)",
+    ),
+    file_list_concurrency: int | None = typer.Option(
+        None,
+        "--file-list-concurrency",
+        help="Maximum concurrent requests to the file-list API (default from system.ini)",
+    ),
+    api_rate: float | None = typer.Option(
+        None,
+        "--api-rate",
+        help="Maximum requests per second to the download API, 0 for unlimited (default from system.ini)",
+    ),
+    file_list_rate: float | None = typer.Option(
+        None,
+        "--file-list-rate",
+        help="Maximum requests per second to the file-list API, 0 for unlimited (default from system.ini)",
+    ),
+    max_rate_mb: float | None = typer.Option(
+        None,
+        "--max-rate-mb",
+        help="Maximum total download bandwidth in MB/s, 0 for unlimited (default from system.ini)",
+    ),
+    sync: bool = typer.Option(
+        False,
+        "--sync",
+        help="Only enumerate and download catalog paths added since the previous catalog snapshot",
+    ),
+    refresh_listing: bool = typer.Option(
+        False,
+        "--refresh-listing",
+        help="Ignore cached file lists and fetch every catalog path from the API again",
+    ),
+    persist_url_cache: bool | None = typer.Option(
+        None,
+        "--persist-url-cache/--no-persist-url-cache",
+        help="Save signed download URLs in the download directory so a restart can reuse them (default from system.ini)",
+    ),
+    preflight: bool | None = typer.Option(
+        None,
+        "--preflight/--no-preflight",
+        help="Scan the download directory once and only queue missing or incomplete files (default from system.ini)",
+    ),
+    verify: bool = typer.Option(
+        False,
+        "--verify",
+        help="Only compare the listed files with the download directory and write a report, without downloading",
+    ),
+    rehash: bool = typer.Option(
+        False,
+        "--rehash",
+        help="With --verify, also re-hash complete files with no recorded sha256 or a changed size or modification time",
+    ),
+    shard: str | None = typer.Option(
+        None,
+        "--shard",
+        callback=_parse_shard_option,
+        help="Download only share i of N of the job, e.g. 2/4, assigned by a stable hash so every machine gets a disjoint share",
+    ),
+    shard_by: ShardBy | None = typer.Option(
+        None,
+        "--shard-by",
+        help="Shard by single files ('file') or whole catalog paths ('path') (default from system.ini)",
+    ),
+    merge_shards: bool = typer.Option(
+        False,
+        "--merge-shards",
+        help="Only merge the state of all shards of the job into one state database and write a completeness report",
+    ),
+    shard_dirs: str | None = typer.Option(
+        None,
+        "--shard-dirs",
+        help="Comma-separated download directories of shards with separate storage, searched by --merge-shards",
+    ),
+    engine: str = typer.Option(
+        "thread",
+        "--engine",
+        "-e",
+        help="Download engine: 'thread' (one thread per transfer) or 'async' (asyncio, requires aiohttp)",
+    ),
 ):
     """
         Command to run the data download process.
@@ -85,6 +279,10 @@ def download(
 
         # Specify resource ID, thread count, download path and sub-path filter simultaneously
 
+        iearth --include "MODISwater2001-2022/20{08..12}/h2?v0*" --exclude "re:v0[5-9]$"
+
+        # Select paths with globs and regexes; --include and --exclude can be repeated
+
     7. Windows path example:
 
         iearth --download-path "C:\\Users\\YourName\\Downloads\\dataset"
@@ -103,7 +301,40 @@ def download(
 
         # Path relative to current directory
 
-    10. View help information:
+    10. Use the asyncio engine for many small files:
+
+        iearth --engine async --max-threads 200
+
+        # --max-threads is the number of concurrent transfers in async mode
+
+    11. Check which files are missing or incomplete without downloading:
+
+        iearth --resource-id 9 --verify
+
+        # Writes verify_report_id_9.txt to the download directory
+        # Add --rehash to also check the sha256 of changed files
+
+    12. Download again the files that failed in earlier runs:
+
+        iearth --resource-id 9 --retry-dead-letter
+
+        # Reads dead_letter_id_9.jsonl from the download directory
+
+    13. Download several datasets with one set of workers:
+
+        iearth --resource-id 9,13,26
+
+        # Each resource is downloaded to its own resource_<id> subdirectory
+
+    14. Split one dataset across two machines and merge the results:
+
+        iearth --resource-id 9 --shard 1/2    # on the first machine
+        iearth --resource-id 9 --shard 2/2    # on the second machine
+        iearth --resource-id 9 --merge-shards
+
+        # Writes shard_report_id_9.txt listing the files no shard completed
+
+    15. View help information:
 
         iearth --help
 
@@ -111,6 +342,19 @@ def download(
     """
     _init_imports()
 
+    if engine == "async" and segments is not None:
+        # The async engine downloads every file as a single stream
+        raise typer.BadParameter(
+            "segmented downloads are only supported by the thread engine",
+            param_hint="--segments",
+        )
+    if engine == "async" and resolvers is not None:
+        # Async workers resolve the signed URL of each task themselves
+        raise typer.BadParameter(
+            "resolver threads are only used by the thread engine",
+            param_hint="--resolvers",
+        )
+
     # User authentication
     typer.echo("=== User authentication ===")
     while not auth.login():
@@ -119,6 +363,94 @@ def download(
 
     typer.echo("\nAuthentication successful！")
 
+    # Prepare configuration overrides
+    config_overrides = {}
+    if download_path is not None:
+        config_overrides["download_path"] = download_path
+    if max_threads is not None:
+        config_overrides["max_threads"] = max_threads
+    if target_sub_path is not None:
+        config_overrides["target_sub_path"] = target_sub_path
+    if include:
+        config_overrides["include_paths"] = include
+    if exclude:
+        config_overrides["exclude_paths"] = exclude
+    if export_catalog_json is not None:
+        config_overrides["export_catalog_json"] = export_catalog_json
+    if max_retries is not None:
+        config_overrides["max_retries"] = max_retries
+    if read_timeout is not None:
+        config_overrides["read_timeout"] = read_timeout
+    if min_rate_kb is not None:
+        config_overrides["min_transfer_rate_kb"] = min_rate_kb
+    if adaptive is not None:
+        config_overrides["adaptive_concurrency"] = adaptive
+    if schedule is not None:
+        config_overrides["scheduling_policy"] = schedule.value
+    if hedge is not None:
+        config_overrides["hedged_requests"] = hedge
+    if min_threads is not None:
+        config_overrides["min_threads"] = min_threads
+    if segments is not None:
+        config_overrides["max_segments"] = segments
+    if resolvers is not None:
+        config_overrides["resolver_threads"] = resolvers
+    if enum_threads is not None:
+        config_overrides["enumeration_threads"] = enum_threads
+    if file_list_concurrency is not None:
+        config_overrides["file_list_api_concurrency"] = file_list_concurrency
+    if api_rate is not None:
+        config_overrides["download_api_rate"] = api_rate
+    if file_list_rate is not None:
+        config_overrides["file_list_api_rate"] = file_list_rate
+    if max_rate_mb is not None:
+        config_overrides["max_download_rate_mb"] = max_rate_mb
+    if sync:
+        config_overrides["sync"] = True
+    if refresh_listing:
+        config_overrides["refresh_listing"] = True
+    if persist_url_cache is not None:
+        config_overrides["persist_url_cache"] = persist_url_cache
+    if preflight is not None:
+        config_overrides["inventory_preflight"] = preflight
+    if shard is not None:
+        if merge_shards:
+            typer.echo("--merge-shards combines all shards and cannot be used with --shard")
+            raise typer.Exit(code=1)
+        # Parsed into (index, count) by _parse_shard_option
+        config_overrides["shard"] = shard
+    if shard_by is not None:
+        config_overrides["shard_by"] = shard_by.value
+    config_overrides["engine"] = engine
+
+    # A job file or several resource IDs select a batch run sharing one set of workers
+    jobs = None
+    if job_file is not None:
+        jobs = load_job_file(job_file)
+    elif resource_id is not None:
+        jobs = parse_resource_ids(resource_id)
+
+    def create_processor():
+        if jobs:
+            return create_batch_processor(
+                jobs, custom_download_path=download_path, config_overrides=config_overrides
+            )
+        return create_download_processor(
+            custom_download_path=download_path, config_overrides=config_overrides
+        )
+
+    if verify:
+        typer.echo("\n=== Start verification ===")
+        processor = create_processor()
+        processor.run_verify(rehash)
+        return
+
+    if merge_shards:
+        typer.echo("\n=== Start shard merge ===")
+        processor = create_processor()
+        processor.run_merge_shards(shard_dirs.split(",") if shard_dirs else None)
+        return
+
     confirmation = (
         typer.prompt(
             "Whether to start downloading task immediately？([y]/n): ", default="y"
@@ -133,22 +465,12 @@ def download(
 
     typer.echo("\n=== Start download task ===")
 
-    # Prepare configuration overrides
-    config_overrides = {}
-    if download_path is not None:
-        config_overrides["download_path"] = download_path
-    if max_threads is not None:
-        config_overrides["max_threads"] = max_threads
-    if resource_id is not None:
-        config_overrides["resource_id"] = resource_id
-    if target_sub_path is not None:
-        config_overrides["target_sub_path"] = target_sub_path
-
     # Initialize and run the download processor
-    processor = DownloadProcessor(
-        custom_download_path=download_path, config_overrides=config_overrides
-    )
-    processor.run_full_process()
+    processor = create_processor()
+    if retry_dead_letter:
+        processor.run_dead_letter()
+    else:
+        processor.run_full_process()
 
 
 if __name__ == "__main__":
@@ -34,22 +34,199 @@ class SystemConfig:
         pattern = self._config.get('file_configuration', 'catalog_file_pattern')
         return pattern.format(resource_id)
     
+    def get_compact_catalog_file(self, resource_id):
+        """Get compact catalog file name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'compact_catalog_file_pattern')
+        return pattern.format(resource_id)
+    
+    @property
+    def export_catalog_json(self):
+        return self._config.getboolean('file_configuration', 'export_catalog_json')
+    
+    def get_catalog_diff_file(self, resource_id):
+        """Get catalog diff file name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'catalog_diff_file_pattern')
+        return pattern.format(resource_id)
+    
     def get_finished_log_file(self, resource_id):
         """Get finished log file name based on resource ID."""
         pattern = self._config.get('file_configuration', 'finished_log_file_pattern')
         return pattern.format(resource_id)
     
+    def get_state_db_file(self, resource_id):
+        """Get download state database name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'state_db_file_pattern')
+        return pattern.format(resource_id)
+    
+    def get_dead_letter_file(self, resource_id):
+        """Get dead-letter file name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'dead_letter_file_pattern')
+        return pattern.format(resource_id)
+    
+    def get_verify_report_file(self, resource_id):
+        """Get verify report file name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'verify_report_file_pattern')
+        return pattern.format(resource_id)
+    
+    def get_manifest_file(self, resource_id):
+        """Get integrity manifest file name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'manifest_file_pattern')
+        return pattern.format(resource_id)
+    
+    def get_shard_report_file(self, resource_id):
+        """Get shard completeness report file name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'shard_report_file_pattern')
+        return pattern.format(resource_id)
+    
+    def get_file_list_cache_file(self, resource_id):
+        """Get file list cache database name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'file_list_cache_file_pattern')
+        return pattern.format(resource_id)
+    
+    def get_signed_url_cache_file(self, resource_id):
+        """Get signed URL cache file name based on resource ID."""
+        pattern = self._config.get('file_configuration', 'signed_url_cache_file_pattern')
+        return pattern.format(resource_id)
+    
     @property
     def chunk_size(self):
         return self._config.getint('download_configuration', 'chunk_size')
     
     @property
-    def sleep_interval(self):
-        return self._config.getint('download_configuration', 'sleep_interval')
+    def max_chunk_size_kb(self):
+        return self._config.getint('download_configuration', 'max_chunk_size_kb')
+    
+    @property
+    def preallocate_min_mb(self):
+        return self._config.getint('download_configuration', 'preallocate_min_mb')
+    
+    @property
+    def connect_timeout(self):
+        return self._config.getfloat('download_configuration', 'connect_timeout')
+    
+    @property
+    def read_timeout(self):
+        return self._config.getfloat('download_configuration', 'read_timeout')
+    
+    @property
+    def min_transfer_rate_kb(self):
+        return self._config.getfloat('download_configuration', 'min_transfer_rate_kb')
+    
+    @property
+    def stall_window(self):
+        return self._config.getfloat('download_configuration', 'stall_window')
+    
+    @property
+    def max_retries(self):
+        return self._config.getint('download_configuration', 'max_retries')
+    
+    @property
+    def retry_base_delay(self):
+        return self._config.getfloat('download_configuration', 'retry_base_delay')
+    
+    @property
+    def retry_max_delay(self):
+        return self._config.getfloat('download_configuration', 'retry_max_delay')
+    
+    @property
+    def adaptive_concurrency(self):
+        return self._config.getboolean('download_configuration', 'adaptive_concurrency')
+    
+    @property
+    def min_concurrency(self):
+        return self._config.getint('download_configuration', 'min_concurrency')
+    
+    @property
+    def shard_by(self):
+        return self._config.get('download_configuration', 'shard_by')
+    
+    @property
+    def scheduling_policy(self):
+        return self._config.get('download_configuration', 'scheduling_policy')
+    
+    @property
+    def scheduling_window(self):
+        return self._config.getint('download_configuration', 'scheduling_window')
+    
+    @property
+    def hedged_requests(self):
+        return self._config.getboolean('download_configuration', 'hedged_requests')
+    
+    @property
+    def hedge_percentile(self):
+        return self._config.getfloat('download_configuration', 'hedge_percentile')
+    
+    @property
+    def hedge_budget(self):
+        return self._config.getfloat('download_configuration', 'hedge_budget')
+    
+    @property
+    def concurrency_adjust_interval(self):
+        return self._config.getfloat('download_configuration', 'concurrency_adjust_interval')
+    
+    @property
+    def download_api_rate(self):
+        return self._config.getfloat('download_configuration', 'download_api_rate')
+    
+    @property
+    def file_list_api_rate(self):
+        return self._config.getfloat('download_configuration', 'file_list_api_rate')
+    
+    @property
+    def max_download_rate_mb(self):
+        return self._config.getfloat('download_configuration', 'max_download_rate_mb')
+    
+    @property
+    def segment_threshold_mb(self):
+        return self._config.getint('download_configuration', 'segment_threshold_mb')
+    
+    @property
+    def max_segments(self):
+        return self._config.getint('download_configuration', 'max_segments')
+    
+    @property
+    def url_resolver_threads(self):
+        return self._config.getint('download_configuration', 'url_resolver_threads')
+    
+    @property
+    def signed_url_min_ttl(self):
+        return self._config.getint('download_configuration', 'signed_url_min_ttl')
+    
+    @property
+    def signed_url_default_ttl(self):
+        return self._config.getint('download_configuration', 'signed_url_default_ttl')
+    
+    @property
+    def signed_url_cache_size(self):
+        return self._config.getint('download_configuration', 'signed_url_cache_size')
+    
+    @property
+    def persist_signed_url_cache(self):
+        return self._config.getboolean('download_configuration', 'persist_signed_url_cache')
+    
+    @property
+    def inventory_preflight(self):
+        return self._config.getboolean('download_configuration', 'inventory_preflight')
+    
+    @property
+    def inventory_scan_threads(self):
+        return self._config.getint('download_configuration', 'inventory_scan_threads')
+    
+    @property
+    def rehash_workers(self):
+        return self._config.getint('download_configuration', 'rehash_workers')
+    
+    @property
+    def enumeration_threads(self):
+        return self._config.getint('download_configuration', 'enumeration_threads')
+    
+    @property
+    def file_list_api_concurrency(self):
+        return self._config.getint('download_configuration', 'file_list_api_concurrency')
     
     @property
-    def sleep_after_files(self):
-        return self._config.getint('download_configuration', 'sleep_after_files')
+    def file_list_cache_ttl_hours(self):
+        return self._config.getfloat('download_configuration', 'file_list_cache_ttl_hours')
     
     @property
     def base_url(self):
@@ -92,10 +269,52 @@ def get_system_config(resource_id):
     """
     return {
         'CATALOG_FILE': sys_config.get_catalog_file(resource_id),
+        'COMPACT_CATALOG_FILE': sys_config.get_compact_catalog_file(resource_id),
+        'EXPORT_CATALOG_JSON': sys_config.export_catalog_json,
+        'CATALOG_DIFF_FILE': sys_config.get_catalog_diff_file(resource_id),
         'FINISHED_LOG_FILE': sys_config.get_finished_log_file(resource_id),
+        'STATE_DB_FILE': sys_config.get_state_db_file(resource_id),
+        'DEAD_LETTER_FILE': sys_config.get_dead_letter_file(resource_id),
+        'VERIFY_REPORT_FILE': sys_config.get_verify_report_file(resource_id),
+        'SHARD_REPORT_FILE': sys_config.get_shard_report_file(resource_id),
+        'MANIFEST_FILE': sys_config.get_manifest_file(resource_id),
+        'SIGNED_URL_CACHE_FILE': sys_config.get_signed_url_cache_file(resource_id),
+        'FILE_LIST_CACHE_FILE': sys_config.get_file_list_cache_file(resource_id),
         'CHUNK_SIZE': sys_config.chunk_size,
-        'SLEEP_INTERVAL': sys_config.sleep_interval,
-        'SLEEP_AFTER_FILES': sys_config.sleep_after_files,
+        'MAX_CHUNK_SIZE_KB': sys_config.max_chunk_size_kb,
+        'PREALLOCATE_MIN_MB': sys_config.preallocate_min_mb,
+        'CONNECT_TIMEOUT': sys_config.connect_timeout,
+        'READ_TIMEOUT': sys_config.read_timeout,
+        'MIN_TRANSFER_RATE_KB': sys_config.min_transfer_rate_kb,
+        'STALL_WINDOW': sys_config.stall_window,
+        'MAX_RETRIES': sys_config.max_retries,
+        'RETRY_BASE_DELAY': sys_config.retry_base_delay,
+        'RETRY_MAX_DELAY': sys_config.retry_max_delay,
+        'ADAPTIVE_CONCURRENCY': sys_config.adaptive_concurrency,
+        'MIN_CONCURRENCY': sys_config.min_concurrency,
+        'SHARD_BY': sys_config.shard_by,
+        'SCHEDULING_POLICY': sys_config.scheduling_policy,
+        'SCHEDULING_WINDOW': sys_config.scheduling_window,
+        'HEDGED_REQUESTS': sys_config.hedged_requests,
+        'HEDGE_PERCENTILE': sys_config.hedge_percentile,
+        'HEDGE_BUDGET': sys_config.hedge_budget,
+        'CONCURRENCY_ADJUST_INTERVAL': sys_config.concurrency_adjust_interval,
+        'DOWNLOAD_API_RATE': sys_config.download_api_rate,
+        'FILE_LIST_API_RATE': sys_config.file_list_api_rate,
+        'MAX_DOWNLOAD_RATE_MB': sys_config.max_download_rate_mb,
+        'SEGMENT_THRESHOLD_MB': sys_config.segment_threshold_mb,
+        'MAX_SEGMENTS': sys_config.max_segments,
+        'URL_RESOLVER_THREADS': sys_config.url_resolver_threads,
+        'SIGNED_URL_MIN_TTL': sys_config.signed_url_min_ttl,
+        'SIGNED_URL_DEFAULT_TTL': sys_config.signed_url_default_ttl,
+        'SIGNED_URL_CACHE_SIZE': sys_config.signed_url_cache_size,
+        'PERSIST_SIGNED_URL_CACHE': sys_config.persist_signed_url_cache,
+        'INVENTORY_PREFLIGHT': sys_config.inventory_preflight,
+        'INVENTORY_SCAN_THREADS': sys_config.inventory_scan_threads,
+        'REHASH_WORKERS': sys_config.rehash_workers,
+        'ENUMERATION_THREADS': sys_config.enumeration_threads,
+        'FILE_LIST_API_CONCURRENCY': sys_config.file_list_api_concurrency,
+        'FILE_LIST_CACHE_TTL_HOURS': sys_config.file_list_cache_ttl_hours,
         'BASE_URL': sys_config.base_url,
         'CATALOG_API': sys_config.catalog_api,
         'FILE_LIST_API': sys_config.file_list_api,
@@ -1,20 +1,108 @@
 import requests
 import json
 import getpass
+import threading
 from iearth_downloader.utils.encrypt_utils import encrypt_auth
 import os
 from iearth_downloader.system.const import sys_config
+from iearth_downloader.utils import http_client
+
+# File the authenticated user info is persisted to between runs
+AUTH_FILE = "auth.json"
+
+
+class AuthenticationError(Exception):
+    """Raised when the API rejects a request because the token is invalid or expired."""
+
+    def __init__(self, message: str, token: str | None = None):
+        super().__init__(message)
+        # Token the rejected request was sent with, used to avoid redundant refreshes
+        self.token = token
+
+
+class CredentialStore:
+    """
+    Thread-safe in-memory store for the authenticated user's credentials.
+
+    Credentials are read from auth.json once and served from memory afterwards.
+    Updates are written through to auth.json before update() returns, one
+    writer at a time, so the file always holds the latest credentials.
+    """
+
+    def __init__(self, auth_file: str = AUTH_FILE):
+        self.auth_file = auth_file
+        self._lock = threading.Lock()
+        # Serializes token refreshes so only one login runs at a time
+        self._refresh_lock = threading.Lock()
+        # Serializes updates with their write to the auth file, so writes land in order
+        self._write_lock = threading.Lock()
+        self._info = {"username": None, "user_account": None, "token": None}
+        self.refresh_count = 0
+        if os.path.exists(auth_file):
+            try:
+                with open(auth_file, "r", encoding="utf-8") as f:
+                    self._info.update(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error reading {auth_file}: {e}")
+
+    def get(self, key: str) -> str | None:
+        """Get a credential value from memory."""
+        with self._lock:
+            return self._info.get(key)
+
+    def update(self, username, user_account, token) -> None:
+        """Replace the stored credentials and write them to the auth file."""
+        with self._write_lock:
+            with self._lock:
+                self._info = {
+                    "username": username,
+                    "user_account": user_account,
+                    "token": token,
+                }
+                snapshot = dict(self._info)
+            self._write(snapshot)
+
+    def clear(self) -> None:
+        """Forget the stored credentials."""
+        self.update(None, None, None)
+
+    def _write(self, snapshot: dict) -> None:
+        """Write a credentials snapshot to the auth file. Called with _write_lock held."""
+        temp_path = self.auth_file + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=4)
+            os.replace(temp_path, self.auth_file)
+        except OSError as e:
+            print(f"Error writing {self.auth_file}: {e}")
+
+    def refresh(self, stale_token: str | None) -> str | None:
+        """
+        Log in again to replace a rejected token, at most once per stale token.
+
+        Threads that call this while a refresh is running wait for it and reuse
+        its token instead of logging in themselves.
+
+        Args:
+            stale_token: The token that was rejected by the API
+
+        Returns:
+            The current token, or None if the login failed
+        """
+        with self._refresh_lock:
+            current_token = self.get("token")
+            if current_token and current_token != stale_token:
+                # Another thread already refreshed the token
+                return current_token
+            print("Authentication token rejected, logging in again...")
+            self.refresh_count += 1
+            if login():
+                return self.get("token")
+            return None
+
 
 # Session state for authenticated user - to be populated after successful login
-authenticated_user_info = (
-    json.load(open("auth.json"))
-    if os.path.exists("auth.json")
-    else {
-        "username": None,
-        "user_account": None,
-        "token": None,
-    }
-)
+_store = CredentialStore()
 
 
 def get_credentials():
@@ -67,7 +155,7 @@ def login() -> bool:
 
     try:
         print("Sending login request...")
-        response = requests.post(
+        response = http_client.get_session().post(
             sys_config.login_api_url, headers=headers, json=request_data
         )
         response.raise_for_status()
@@ -77,55 +165,61 @@ def login() -> bool:
             print("Login successful!")
             user_data = login_result.get("data", {})
 
-            # Store in memory
-            authenticated_user_info["username"] = user_data.get("userName")
-            authenticated_user_info["user_account"] = user_data.get("email")
-            authenticated_user_info["token"] = user_data.get("token")
-
-            json.dump(authenticated_user_info, open("auth.json", "w"), indent=4)
+            # Store in memory and write auth.json before continuing
+            _store.update(
+                user_data.get("userName"),
+                user_data.get("email"),
+                user_data.get("token"),
+            )
 
-            print(f"Username: {authenticated_user_info['username']}")
-            print(f"Email: {authenticated_user_info['user_account']}")
+            print(f"Username: {get_username()}")
+            print(f"Email: {get_user_account()}")
             return True
         else:
             fail_reason = login_result.get("failReason", "Unknown error")
             print(f"Login failed: {fail_reason}")
-            authenticated_user_info.update(
-                {"username": None, "user_account": None, "token": None}
-            )
-            json.dump(authenticated_user_info, open("auth.json", "w"), indent=4)
+            _store.clear()
             return False
 
     except requests.exceptions.RequestException as e:
         print(f"Login request failed: {e}")
-        authenticated_user_info.update(
-            {"username": None, "user_account": None, "token": None}
-        )
-        json.dump(authenticated_user_info, open("auth.json", "w"), indent=4)
+        _store.clear()
         return False
     except json.JSONDecodeError:
         print("Failed to parse login response.")
-        authenticated_user_info.update(
-            {"username": None, "user_account": None, "token": None}
-        )
-        json.dump(authenticated_user_info, open("auth.json", "w"), indent=4)
+        _store.clear()
         return False
 
 
 # Getter functions for other modules to access authenticated user info
 def get_username() -> str | None:
-    authenticated_user_info = json.load(open("auth.json"))
-    return authenticated_user_info["username"]
+    return _store.get("username")
 
 
 def get_user_account() -> str | None:
-    authenticated_user_info = json.load(open("auth.json"))
-    return authenticated_user_info["user_account"]
+    return _store.get("user_account")
 
 
 def get_token() -> str | None:
-    authenticated_user_info = json.load(open("auth.json"))
-    return authenticated_user_info["token"]
+    return _store.get("token")
+
+
+def refresh_token(stale_token: str | None) -> str | None:
+    """
+    Replace a token the API rejected, sharing a single login between all threads.
+
+    Args:
+        stale_token: The token that was rejected
+
+    Returns:
+        The new token, or None if the login failed
+    """
+    return _store.refresh(stale_token)
+
+
+def get_refresh_count() -> int:
+    """Get the number of token refreshes performed by refresh_token."""
+    return _store.refresh_count
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""
+Checksum helpers for hashing downloads while they are written and re-hashing files on disk.
+"""
+
+import hashlib
+from typing import Mapping, Optional
+
+# Name of the digest computed for every download
+CHECKSUM_ALGORITHM = "sha256"
+# Bytes read per call when hashing a file on disk
+HASH_READ_SIZE = 1024 * 1024
+# Response headers in which storage servers return an ETag or checksum of the object
+SERVER_CHECKSUM_HEADERS = (
+    "ETag",
+    "Content-MD5",
+    "Digest",
+    "x-amz-checksum-sha256",
+    "x-goog-hash",
+    "x-oss-hash-crc64ecma",
+)
+
+
+def new_hasher():
+    """Create an incremental hasher for CHECKSUM_ALGORITHM."""
+    return hashlib.new(CHECKSUM_ALGORITHM)
+
+
+def update_from_file(
+    hasher, file_path: str, length: Optional[int] = None, offset: int = 0
+) -> None:
+    """
+    Feed the start of a file into a hasher, e.g. the part already on disk when a download resumes.
+
+    Args:
+        hasher: Hasher from new_hasher
+        file_path: File to read
+        length: Number of bytes to read, None for the rest of the file
+        offset: Position in the file to start reading at
+    """
+    remaining = length
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        while remaining is None or remaining > 0:
+            size = HASH_READ_SIZE if remaining is None else min(HASH_READ_SIZE, remaining)
+            data = f.read(size)
+            if not data:
+                break
+            hasher.update(data)
+            if remaining is not None:
+                remaining -= len(data)
+
+
+def file_sha256(file_path: str) -> Optional[str]:
+    """
+    Hash a file on disk. A module-level function so it can run in a process pool.
+
+    Returns:
+        Hex digest, or None if the file cannot be read
+    """
+    hasher = new_hasher()
+    try:
+        update_from_file(hasher, file_path)
+    except OSError as e:
+        print(f"Error hashing {file_path}: {e}")
+        return None
+    return hasher.hexdigest()
+
+
+def server_checksum(headers: Mapping[str, str]) -> Optional[str]:
+    """
+    Collect the ETag and checksum headers of a storage response.
+
+    Returns:
+        'header=value' pairs joined by '; ', or None if the server sent none
+    """
+    values = []
+    for name in SERVER_CHECKSUM_HEADERS:
+        value = headers.get(name)
+        if value:
+            values.append(f"{name}={value}")
+    return "; ".join(values) or None
@@ -0,0 +1,125 @@
+"""
+Read-size and buffer helpers for the transfer loops.
+
+Transfers read into a buffer kept per thread instead of allocating a new bytes
+object per chunk, and the read size follows the file size and the measured
+throughput instead of a single fixed chunk size.
+"""
+
+import threading
+import time
+from typing import Iterator, Optional
+
+import requests
+import urllib3
+
+# Read size of a transfer before any throughput has been measured
+INITIAL_CHUNK_SIZE = 64 * 1024
+# Aim for one read per this many seconds, so the stall watchdog and the
+# bandwidth limit see regular updates even on fast connections
+TARGET_READ_SECONDS = 0.05
+# Weight of the newest measurement in the throughput average
+RATE_SMOOTHING = 0.3
+
+_local = threading.local()
+
+
+def _power_of_two_at_most(value: float) -> int:
+    """Round down to a power of two, at least 1."""
+    return 1 << max(0, int(value).bit_length() - 1)
+
+
+class ChunkSizer:
+    """
+    Chooses the read size of one transfer.
+
+    Small files are read in a single call. Larger transfers start at
+    INITIAL_CHUNK_SIZE and then read about TARGET_READ_SECONDS worth of data
+    per call at the measured throughput, between min_size and max_size.
+    """
+
+    def __init__(self, min_size: int, max_size: int, expected_size: Optional[int] = None):
+        """
+        Args:
+            min_size: Smallest read size in bytes
+            max_size: Largest read size in bytes
+            expected_size: Bytes left to transfer, if known
+        """
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        initial = INITIAL_CHUNK_SIZE
+        if expected_size:
+            initial = min(initial, expected_size)
+        self.size = self._clamp(initial)
+        self._rate: Optional[float] = None
+        self._last = time.monotonic()
+
+    def _clamp(self, size: float) -> int:
+        return int(min(self.max_size, max(self.min_size, size)))
+
+    def update(self, nbytes: int) -> None:
+        """Record a finished read and adjust the read size to the throughput."""
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        if nbytes <= 0 or elapsed <= 0:
+            return
+        rate = nbytes / elapsed
+        if self._rate is None:
+            self._rate = rate
+        else:
+            self._rate += RATE_SMOOTHING * (rate - self._rate)
+        target = _power_of_two_at_most(self._rate * TARGET_READ_SECONDS)
+        # Change gradually, a single slow or fast read says little
+        self.size = self._clamp(min(self.size * 4, max(self.size // 4, target)))
+
+
+def get_buffer(size: int) -> memoryview:
+    """
+    Get a writable buffer of at least size bytes, reused by all transfers of the calling thread.
+
+    The buffer is overwritten by the next read of the thread, so data must be
+    written or copied before then.
+    """
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        buffer = bytearray(size)
+        _local.buffer = buffer
+    return memoryview(buffer)
+
+
+def read_chunks(response: requests.Response, sizer: ChunkSizer) -> Iterator[memoryview]:
+    """
+    Read the body of a streamed requests response into the thread's reused buffer.
+
+    Each yielded view is only valid until the next one is requested. Bodies
+    with a Content-Encoding are decoded by urllib3 and cannot be read in place;
+    they are read with the same adaptive read size.
+
+    Raises:
+        requests.exceptions.ConnectionError: On read timeouts and lost connections,
+            as raised by Response.iter_content
+        requests.exceptions.ChunkedEncodingError: On malformed chunked bodies
+    """
+    raw = response.raw
+    encoding = response.headers.get("Content-Encoding", "identity").lower()
+    buffer = get_buffer(sizer.max_size)
+    while True:
+        size = sizer.size
+        try:
+            if encoding in ("", "identity"):
+                nbytes = raw.readinto(buffer[:size])
+                chunk = buffer[:nbytes]
+            else:
+                chunk = memoryview(raw.read(size, decode_content=True))
+                nbytes = len(chunk)
+        except urllib3.exceptions.ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except urllib3.exceptions.ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        except urllib3.exceptions.DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+        if not nbytes:
+            return
+        sizer.update(nbytes)
+        yield chunk
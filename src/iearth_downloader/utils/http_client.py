@@ -0,0 +1,145 @@
+"""
+Shared HTTP session module providing pooled keep-alive connections.
+
+All API calls and file transfers go through a single requests.Session so that
+TCP/TLS connections are reused across files instead of being re-established
+for every request. The underlying urllib3 pools are thread-safe, so the
+session can be shared by all download worker threads.
+
+Every request sent through the session gets connect and read timeouts unless
+the caller passes its own, so a stuck connection cannot pin a worker forever.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Number of distinct hosts (API host + storage hosts) to keep pools for
+POOL_CONNECTIONS = 16
+# Default number of keep-alive connections kept per host
+DEFAULT_POOL_SIZE = 10
+# Extra connections reserved for the producer and other non-worker callers
+POOL_HEADROOM = 2
+# Default seconds to establish a connection and to wait for data on it
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+_session: requests.Session | None = None
+_adapter: HTTPAdapter | None = None
+_pool_size = DEFAULT_POOL_SIZE
+_session_lock = threading.Lock()
+_timeouts: Tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter applying the module's connect/read timeouts to requests sent without one."""
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = _timeouts
+        return super().send(request, **kwargs)
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    """Create a session whose adapters keep up to pool_size connections per host."""
+    global _adapter
+
+    session = requests.Session()
+    _adapter = TimeoutHTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=pool_size,
+        pool_block=False,  # Never deadlock a worker; overflow connections are discarded
+    )
+    session.mount("https://", _adapter)
+    session.mount("http://", _adapter)
+    return session
+
+
+def configure(max_threads: int) -> None:
+    """
+    Size the shared connection pool for the given number of concurrent workers.
+
+    Recreates the session if the pool size changes. Should be called once
+    before worker threads are started.
+
+    Args:
+        max_threads: Number of threads that will use the session concurrently
+    """
+    global _session, _pool_size
+
+    pool_size = max(1, max_threads) + POOL_HEADROOM
+    with _session_lock:
+        if _session is not None and pool_size == _pool_size:
+            return
+        old_session = _session
+        _pool_size = pool_size
+        _session = _create_session(pool_size)
+    if old_session is not None:
+        old_session.close()
+
+
+def set_timeouts(connect_timeout: float, read_timeout: float) -> None:
+    """
+    Set the connect and read timeouts applied to every request of the shared session.
+
+    Args:
+        connect_timeout: Seconds to establish a connection
+        read_timeout: Seconds to wait for the next bytes of a response
+    """
+    global _timeouts
+
+    _timeouts = (connect_timeout, read_timeout)
+
+
+def get_timeouts() -> Tuple[float, float]:
+    """Get the (connect, read) timeouts in seconds, for clients outside the shared session."""
+    return _timeouts
+
+
+def get_session() -> requests.Session:
+    """Get the shared session, creating it with the default pool size if needed."""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session(_pool_size)
+    return _session
+
+
+def pool_stats() -> Dict[str, int]:
+    """
+    Report connection reuse for the shared session.
+
+    Returns:
+        dict with 'requests' (requests sent), 'misses' (new connections opened),
+        'hits' (requests served over a reused connection) and 'pools' (live host pools)
+    """
+    stats = {"requests": 0, "misses": 0, "hits": 0, "pools": 0}
+    adapter = _adapter
+    if adapter is None:
+        return stats
+
+    pools = adapter.poolmanager.pools
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        stats["pools"] += 1
+        stats["requests"] += pool.num_requests
+        stats["misses"] += pool.num_connections
+    stats["hits"] = max(0, stats["requests"] - stats["misses"])
+    return stats
+
+
+def close() -> None:
+    """Close the shared session and release all pooled connections."""
+    global _session, _adapter
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _adapter = None
@@ -0,0 +1,28 @@
+"""
+Resident memory of the current process, for reporting.
+"""
+
+import os
+import sys
+
+
+def current_rss_mb() -> float:
+    """
+    Get the resident set size of this process in MB.
+
+    Reads /proc/self/statm where available; elsewhere falls back to the peak
+    resident size reported by getrusage, or 0.0 if neither is available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
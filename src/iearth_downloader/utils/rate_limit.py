@@ -0,0 +1,155 @@
+"""
+Shared rate limiter module providing token buckets for API requests and transfer bandwidth.
+
+One bucket limits requests to the download API, one limits requests to the
+file-list API and one caps the bytes per second read by all transfers. The
+buckets are shared by every worker thread (and the asyncio engine), so the
+limits hold for the whole process regardless of the number of workers.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+# Seconds of traffic a bucket may accumulate while idle
+BURST_SECONDS = 1.0
+
+DOWNLOAD_API = "download_api"
+FILE_LIST_API = "file_list_api"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at a fixed rate.
+
+    Callers reserve tokens before they act. A reservation is granted at once and
+    may leave the bucket in debt; the caller then waits until the debt would have
+    been refilled. This keeps the long-run rate exact without a waiter queue and
+    lets a single reservation exceed the bucket capacity.
+    """
+
+    def __init__(self, rate: float, burst_seconds: float = BURST_SECONDS):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second, 0 or less disables the limit
+            burst_seconds: Seconds of tokens the bucket holds when full
+        """
+        self.rate = rate
+        self.capacity = max(1.0, rate * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the bucket limits anything."""
+        return self.rate > 0
+
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Take tokens from the bucket.
+
+        Returns:
+            Seconds the caller must wait before acting, 0 if the tokens were available
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= amount
+            self.acquired += amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited_seconds += delay
+        return delay
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Take tokens from the bucket, sleeping until they are available.
+
+        Returns:
+            Seconds slept
+        """
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+_buckets: Dict[str, TokenBucket] = {
+    DOWNLOAD_API: TokenBucket(0),
+    FILE_LIST_API: TokenBucket(0),
+}
+_byte_bucket = TokenBucket(0)
+
+
+def configure(
+    download_api_rate: float = 0,
+    file_list_api_rate: float = 0,
+    max_bytes_per_second: float = 0,
+) -> None:
+    """
+    Set the shared limits. Should be called once before worker threads are started.
+
+    Args:
+        download_api_rate: Maximum requests per second to the download API, 0 = unlimited
+        file_list_api_rate: Maximum requests per second to the file-list API, 0 = unlimited
+        max_bytes_per_second: Maximum bytes per second over all transfers, 0 = unlimited
+    """
+    global _byte_bucket
+
+    _buckets[DOWNLOAD_API] = TokenBucket(download_api_rate)
+    _buckets[FILE_LIST_API] = TokenBucket(file_list_api_rate)
+    _byte_bucket = TokenBucket(max_bytes_per_second)
+
+
+def acquire_request(api: str) -> None:
+    """Wait for a request slot of the given API (DOWNLOAD_API or FILE_LIST_API)."""
+    _buckets[api].acquire()
+
+
+def reserve_request(api: str) -> float:
+    """Reserve a request slot of the given API and return the seconds to wait (asyncio callers)."""
+    return _buckets[api].reserve()
+
+
+def throttle_bytes(amount: int) -> float:
+    """
+    Account for bytes read by a transfer, sleeping if the byte rate is exceeded.
+
+    Returns:
+        Seconds slept, which the caller's stall watchdog must not count
+    """
+    return _byte_bucket.acquire(amount)
+
+
+def reserve_bytes(amount: int) -> float:
+    """Account for bytes read by a transfer and return the seconds to wait (asyncio callers)."""
+    return _byte_bucket.reserve(amount)
+
+
+def limiter_stats() -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Report the configured limits and the time spent waiting on each.
+
+    Returns:
+        dict keyed by limiter name with 'rate' (None if unlimited), 'acquired'
+        and 'waited_seconds'
+    """
+    limiters = dict(_buckets)
+    limiters["bytes"] = _byte_bucket
+    return {
+        name: {
+            "rate": bucket.rate if bucket.enabled else None,
+            "acquired": bucket.acquired,
+            "waited_seconds": bucket.waited_seconds,
+        }
+        for name, bucket in limiters.items()
+    }
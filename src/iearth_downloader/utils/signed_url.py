@@ -0,0 +1,195 @@
+"""
+Signed URL utilities for reading the expiry of signed download URLs and caching them.
+"""
+
+import calendar
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+def _parse_amz_date(value: str) -> Optional[float]:
+    """Parse a compact ISO8601 timestamp such as 20240102T030405Z into epoch seconds."""
+    try:
+        return float(calendar.timegm(time.strptime(value, "%Y%m%dT%H%M%SZ")))
+    except ValueError:
+        return None
+
+
+def parse_signed_url_expiry(signed_url: str) -> Optional[float]:
+    """
+    Read the expiry time from the query parameters of a signed URL.
+
+    Supports the 'Expires' epoch parameter (OSS / S3 signature v2) and the
+    date-plus-lifetime pairs used by S3 and OSS signature v4.
+
+    Args:
+        signed_url: Signed URL as returned by the download API
+
+    Returns:
+        Expiry as epoch seconds, or None if the URL carries no known expiry
+    """
+    if "?" not in signed_url:
+        return None
+    params = {
+        key.lower(): value
+        for key, value in parse_qsl(urlsplit(signed_url).query, keep_blank_values=True)
+    }
+
+    expires = params.get("expires")
+    if expires and expires.isdigit():
+        return float(expires)
+
+    for date_key, lifetime_key in (
+        ("x-amz-date", "x-amz-expires"),
+        ("x-oss-date", "x-oss-expires"),
+    ):
+        signed_at = params.get(date_key)
+        lifetime = params.get(lifetime_key)
+        if signed_at and lifetime and lifetime.isdigit():
+            signed_at_epoch = _parse_amz_date(signed_at)
+            if signed_at_epoch is not None:
+                return signed_at_epoch + int(lifetime)
+    return None
+
+
+def signed_url_expiry(signed_url: str, default_ttl: float) -> float:
+    """
+    Get the expiry of a signed URL, assuming default_ttl seconds if it carries none.
+
+    Returns:
+        Expiry as epoch seconds
+    """
+    expires_at = parse_signed_url_expiry(signed_url)
+    if expires_at is None:
+        expires_at = time.time() + default_ttl
+    return expires_at
+
+
+class SignedUrlCache:
+    """
+    Thread-safe cache of signed URLs keyed by object key.
+
+    Entries are evicted when they come close to expiry or, once the cache is
+    full, in least-recently-used order. The cache can be persisted to a JSON
+    file so a restart can reuse URLs that are still valid.
+    """
+
+    # Persist the cache after this many new entries when a file is configured
+    SAVE_EVERY_PUTS = 200
+
+    def __init__(self, max_entries: int = 10000, cache_file: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of URLs kept before LRU eviction
+            cache_file: Optional JSON file to load from and persist to
+        """
+        self.max_entries = max_entries
+        self.cache_file = cache_file
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_save = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, key: str, min_ttl: float = 0) -> Optional[Tuple[str, float]]:
+        """
+        Get a cached URL that stays valid for at least min_ttl seconds.
+
+        Returns:
+            Tuple of (signed_url, expires_at), or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] - time.time() < min_ttl:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, signed_url: str, expires_at: float) -> None:
+        """Store a signed URL with its expiry, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (signed_url, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+            self._puts_since_save += 1
+            save_now = (
+                self.cache_file is not None
+                and self._puts_since_save >= self.SAVE_EVERY_PUTS
+            )
+        if save_now:
+            self.save()
+
+    def discard_url(self, signed_url: str) -> None:
+        """Drop a URL the storage server rejected so the next request resolves a new one."""
+        with self._lock:
+            for key, (cached_url, _) in list(self._entries.items()):
+                if cached_url == signed_url:
+                    del self._entries[key]
+
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def load(self) -> int:
+        """
+        Load unexpired entries from the cache file.
+
+        Returns:
+            int: Number of entries loaded
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return 0
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading signed URL cache {self.cache_file}: {e}")
+            return 0
+
+        now = time.time()
+        with self._lock:
+            for key, (signed_url, expires_at) in saved.items():
+                if expires_at > now:
+                    self._entries[key] = (signed_url, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return len(self._entries)
+
+    def save(self) -> None:
+        """Write the unexpired entries to the cache file."""
+        if not self.cache_file:
+            return
+        now = time.time()
+        with self._lock:
+            snapshot = {
+                key: [signed_url, expires_at]
+                for key, (signed_url, expires_at) in self._entries.items()
+                if expires_at > now
+            }
+            self._puts_since_save = 0
+        tmp_path = f"{self.cache_file}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Error saving signed URL cache {self.cache_file}: {e}")
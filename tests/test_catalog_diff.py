@@ -0,0 +1,41 @@
+from iearth_downloader.core.catalog_manager import diff_catalog_paths
+
+
+def test_unchanged_catalog_has_no_changes():
+    paths = ["A/2009/x", "A/2010/y"]
+    diff = diff_catalog_paths(paths, iter(paths))
+    assert diff == {
+        "added": [],
+        "removed": [],
+        "added_subtrees": {},
+        "removed_subtrees": {},
+    }
+
+
+def test_added_and_removed_paths_keep_catalog_order():
+    old = ["A/2009/x", "A/2009/y", "A/2010/z"]
+    new = ["A/2009/y", "A/2009/w", "A/2010/z", "A/2009/v"]
+    diff = diff_catalog_paths(old, iter(new))
+    assert diff["added"] == ["A/2009/w", "A/2009/v"]
+    assert diff["removed"] == ["A/2009/x"]
+
+
+def test_subtrees_are_reported_at_their_root():
+    old = ["A/2009/x", "A/2009/y", "B/2009/x"]
+    new = ["A/2009/x", "A/2010/x", "A/2010/y", "C/2009/x"]
+    diff = diff_catalog_paths(old, iter(new))
+    assert diff["added_subtrees"] == {"A/2010": 2, "C": 1}
+    assert diff["removed_subtrees"] == {"A/2009/y": 1, "B": 1}
+
+
+def test_new_paths_are_consumed_once():
+    consumed = []
+
+    def new_paths():
+        for path in ["A/x", "A/y"]:
+            consumed.append(path)
+            yield path
+
+    diff = diff_catalog_paths(["A/x"], new_paths())
+    assert consumed == ["A/x", "A/y"]
+    assert diff["added"] == ["A/y"]
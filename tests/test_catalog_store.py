@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from iearth_downloader.core.catalog_store import (
+    CompactCatalog,
+    paths_to_tree,
+    write_compact_catalog,
+)
+from iearth_downloader.core.path_index import PathIndex
+
+PATHS = [
+    "MODISwater2001-2022/2009/h20v05.tif",
+    "MODISwater2001-2022/2009/h21v05.tif",
+    "MODISwater2001-2022/2010/h20v05.tif",
+    "MODISwater2001-2022/2010/h21v05.tif",
+    "Other/données/ü.tif",
+    "readme.txt",
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    file_path = str(tmp_path / "catalog.bin")
+    assert write_compact_catalog(file_path, paths_to_tree(PATHS), "modis", "raster") == len(PATHS)
+    compact = CompactCatalog(file_path)
+    yield compact
+    compact.close()
+
+
+def test_round_trip(catalog):
+    assert len(catalog) == len(PATHS)
+    assert catalog.paths == PATHS
+    assert catalog.table == "modis"
+    assert catalog.data_type == "raster"
+
+
+def test_subtree_reads(catalog):
+    node = catalog.find("MODISwater2001-2022/2010")
+    assert list(catalog.iter_paths(node)) == PATHS[2:4]
+    assert list(catalog.iter_paths(catalog.find("readme.txt"))) == ["readme.txt"]
+    assert catalog.find("MODISwater2001-2022/2011") is None
+
+
+@pytest.mark.parametrize(
+    "include, exclude",
+    [
+        (["MODISwater2001-2022/2009"], None),
+        (["*/20{09..10}/h20*"], None),
+        (["re:^Other|readme"], None),
+        (None, ["**/h21v05.tif"]),
+    ],
+)
+def test_select_matches_path_index(catalog, include, exclude):
+    assert catalog.select(include, exclude) == PathIndex(PATHS).select(include, exclude)
+
+
+def test_export_json(catalog, tmp_path):
+    json_file = tmp_path / "catalog.json"
+    assert catalog.export_json(str(json_file)) == len(PATHS)
+    data = json.loads(json_file.read_text(encoding="utf-8"))
+    assert data == {"path": PATHS, "table": "modis", "type": "raster"}
+
+
+def test_rejects_other_files(tmp_path):
+    file_path = tmp_path / "catalog.json"
+    file_path.write_text('{"path": []}')
+    with pytest.raises(ValueError):
+        CompactCatalog(str(file_path))
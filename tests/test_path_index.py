@@ -0,0 +1,77 @@
+import pytest
+
+from iearth_downloader.core.path_index import (
+    PathIndex,
+    _regex_literal_prefix,
+    expand_braces,
+)
+
+PATHS = [
+    "MODISwater2001-2022/2008/h20v05.tif",
+    "MODISwater2001-2022/2009/h20v05.tif",
+    "MODISwater2001-2022/2009/h21v05.tif",
+    "MODISwater2001-2022/2010/h20v05.tif",
+    "MODISwater2001-2022/2012/h20v06.tif",
+    "Other/2009/x",
+    "b/zz",
+]
+
+
+@pytest.mark.parametrize(
+    "pattern, expanded",
+    [
+        ("plain", ["plain"]),
+        ("{a,b}/x", ["a/x", "b/x"]),
+        ("20{08..10}", ["2008", "2009", "2010"]),
+        ("{3..1}", ["3", "2", "1"]),
+        ("{a,{b,c}}{1,2}", ["a1", "a2", "b1", "b2", "c1", "c2"]),
+        ("{x}/{a,b}", ["{x}/a", "{x}/b"]),
+        ("{a,b", ["{a,b"]),
+    ],
+)
+def test_expand_braces(pattern, expanded):
+    assert expand_braces(pattern) == expanded
+
+
+@pytest.mark.parametrize(
+    "pattern, prefix",
+    [
+        ("^Other/2009", "Other/2009"),
+        ("^Other/20(09|10)", ""),
+        ("^Other|b/", ""),
+        ("^Oth[|]er", "Oth"),
+        (r"^Oth\|er", "Oth"),
+        ("^Other/2009?", "Other/200"),
+        ("^Other.*", "Other"),
+    ],
+)
+def test_regex_literal_prefix(pattern, prefix):
+    assert _regex_literal_prefix(pattern) == prefix
+
+
+@pytest.mark.parametrize(
+    "selector, selected",
+    [
+        ("MODISwater2001-2022/2009", [1, 2]),
+        ("MODISwater2001-2022/201", [3, 4]),
+        ("MODISwater2001-2022/20{08..09}/h20*", [0, 1]),
+        ("**/h21v05.tif", [2]),
+        ("*/2009", [1, 2, 5]),
+        ("re:^MODISwater2001-2022/20(08|12)/", [0, 4]),
+        ("re:v06", [4]),
+        # A branch after "|" does not share the literal prefix of the first one
+        ("re:^Other|b/", [5, 6]),
+    ],
+)
+def test_select(selector, selected):
+    assert PathIndex(PATHS).select([selector]) == [PATHS[i] for i in selected]
+
+
+def test_select_with_exclude_keeps_catalog_order():
+    index = PathIndex(PATHS)
+    assert index.select() == PATHS
+    assert index.select(["b/", "MODISwater2001-2022/"], ["*/20{09,10}"]) == [
+        PATHS[0],
+        PATHS[4],
+        PATHS[6],
+    ]
@@ -0,0 +1,23 @@
+import pytest
+
+from iearth_downloader.core.retry import (
+    PERMANENT_STATUS_CODES,
+    compute_backoff,
+    is_retryable,
+)
+
+
+@pytest.mark.parametrize("status_code", PERMANENT_STATUS_CODES)
+def test_permanent_statuses_are_not_retried(status_code):
+    assert not is_retryable(status_code)
+
+
+@pytest.mark.parametrize("status_code", [None, 403, 408, 429, 500, 503])
+def test_transient_failures_are_retried(status_code):
+    assert is_retryable(status_code)
+
+
+@pytest.mark.parametrize("attempt, delay", [(1, 1.0), (2, 2.0), (3, 4.0), (10, 30.0)])
+def test_backoff_doubles_up_to_the_maximum_with_half_jitter(attempt, delay):
+    for _ in range(100):
+        assert delay / 2 <= compute_backoff(attempt, 1.0, 30.0) <= delay
@@ -0,0 +1,7 @@
+from iearth_downloader.core.scheduling import SCHEDULING_POLICIES
+from iearth_downloader.main import SchedulePolicy
+
+
+def test_cli_choices_match_the_scheduling_policies():
+    # main.py lists the policies itself to keep the CLI imports lazy
+    assert [policy.value for policy in SchedulePolicy] == list(SCHEDULING_POLICIES)
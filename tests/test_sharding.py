@@ -0,0 +1,36 @@
+import pytest
+
+from iearth_downloader.core.sharding import in_shard, parse_shard, shard_of
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (1, 4)
+    assert parse_shard("4/4") == (4, 4)
+
+
+@pytest.mark.parametrize("value", ["", "1", "1/", "a/4", "1/4/2", "0/4", "5/4", "1/0"])
+def test_parse_shard_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7])
+def test_shards_partition_the_keys(count):
+    keys = [
+        f"MODISwater2001-2022/{year}/h{tile:02d}v05.tif"
+        for year in range(2001, 2023)
+        for tile in range(40)
+    ]
+    owners = [
+        [index for index in range(1, count + 1) if in_shard(key, (index, count))]
+        for key in keys
+    ]
+    # Every key belongs to exactly one shard, and every shard gets some keys
+    assert all(len(owner) == 1 for owner in owners)
+    assert {owner[0] for owner in owners} == set(range(1, count + 1))
+
+
+def test_shard_assignment_is_stable():
+    # Machines must agree on the shard of a key, so it cannot depend on hash()
+    assert shard_of("MODISwater2001-2022/2009/h20v05.tif", 4) == 4
+    assert in_shard("any/key", None)
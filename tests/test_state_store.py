@@ -0,0 +1,67 @@
+import hashlib
+
+from iearth_downloader.core.state_store import (
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    DownloadStateStore,
+)
+
+
+def _statuses(store):
+    return {row[0]: (row[1], row[5]) for row in store.iter_objects()}
+
+
+def _md5(path):
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def test_merge_never_replaces_completed_objects(tmp_path):
+    main = DownloadStateStore(str(tmp_path / "state.sqlite"))
+    shard_path = str(tmp_path / "state.shard1of2.sqlite")
+    shard = DownloadStateStore(shard_path)
+
+    # Completed here, failed later in the shard: stays completed
+    main.record_completed("a", 10, 10)
+    main.flush()
+    shard.record_failed("a", 10, 0, "timeout")
+    # Completed in the shard before failing here: becomes completed
+    shard.record_completed("b", 20, 20)
+    shard.flush()
+    main.record_failed("b", 20, 0, "timeout")
+    # Failed in both: the newer failure wins
+    main.record_failed("c", 30, 0, "old error")
+    main.flush()
+    shard.record_failed("c", 30, 0, "new error")
+    # Only in the shard
+    shard.record_completed("d", 40, 40)
+    shard.close()
+    main.flush()
+
+    assert main.merge_from(shard_path) == 4
+    assert _statuses(main) == {
+        "a": (STATUS_COMPLETED, None),
+        "b": (STATUS_COMPLETED, None),
+        "c": (STATUS_FAILED, "new error"),
+        "d": (STATUS_COMPLETED, None),
+    }
+    main.close()
+
+
+def test_merge_is_idempotent_and_leaves_the_shard_unchanged(tmp_path):
+    main = DownloadStateStore(str(tmp_path / "state.sqlite"))
+    shard_path = str(tmp_path / "state.shard2of2.sqlite")
+    shard = DownloadStateStore(shard_path)
+    shard.record_completed("a", 10, 10, checksum="abc")
+    shard.record_failed("b", 20, 5, "reset")
+    shard.close()
+    digest = _md5(shard_path)
+
+    main.merge_from(shard_path)
+    merged = list(main.iter_objects())
+    main.merge_from(shard_path)
+
+    assert list(main.iter_objects()) == merged
+    assert main.status_counts() == {STATUS_COMPLETED: 1, STATUS_FAILED: 1}
+    assert _md5(shard_path) == digest
+    main.close()